@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from unittest import mock
+
+import psutil
+
+FAKE_BIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_bin")
+
+# Well above any real pid_max, so pidfd_open() on them fails harmlessly.
+FAKE_PID_BASE = 50_000_000
+
+
+def write_taskbook(home: str, items: int) -> str:
+    """Write a taskbook storage file with `items` tasks and notes spread over boards."""
+    directory = os.path.join(home, ".taskbook", "storage")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "storage.json")
+    data = {}
+    for item_id in range(1, items + 1):
+        data[str(item_id)] = {
+            "_id": item_id,
+            "_date": "Sun Oct 18 2026",
+            "_timestamp": 0,
+            "_isTask": item_id % 4 != 0,
+            "description": f"Item {item_id}: review the weekly report for board {item_id % 7}",
+            "isStarred": item_id % 11 == 0,
+            "boards": [f"Board {item_id % 7}"],
+            "isComplete": item_id % 3 == 0,
+            "inProgress": False,
+            "priority": 1,
+        }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return path
+
+
+@contextmanager
+def sandbox(items: int, tb_latency: float, gcalcli_latency: float, events: int):
+    """Run with a throwaway HOME/XDG tree, a generated taskbook and fake CLIs on PATH."""
+    with tempfile.TemporaryDirectory(prefix="dashboard-bench-") as home:
+        write_taskbook(home, items)
+        env = {
+            "HOME": home,
+            "XDG_CACHE_HOME": os.path.join(home, ".cache"),
+            "XDG_CONFIG_HOME": os.path.join(home, ".config"),
+            "XDG_DATA_HOME": os.path.join(home, ".local", "share"),
+            # Never attach to a collector the user has running.
+            "XDG_RUNTIME_DIR": os.path.join(home, ".run"),
+            "PATH": FAKE_BIN + os.pathsep + os.environ.get("PATH", ""),
+            "BENCH_TB_LATENCY": str(tb_latency),
+            "BENCH_GCALCLI_LATENCY": str(gcalcli_latency),
+            "BENCH_GCALCLI_EVENTS": str(events),
+        }
+        with mock.patch.dict(os.environ, env):
+            yield home
+
+
+class FakeProcess:
+    """Just enough of psutil.Process for the process watcher."""
+
+    def __init__(self, table: "FakeProcessTable", pid: int) -> None:
+        if pid not in table.processes:
+            raise psutil.NoSuchProcess(pid)
+        self.pid = pid
+        self._name, self._cmdline = table.processes[pid]
+        self._created = table.created[pid]
+
+    @contextmanager
+    def oneshot(self):
+        yield
+
+    def create_time(self) -> float:
+        return self._created
+
+    def name(self) -> str:
+        return self._name
+
+    def cmdline(self) -> list[str]:
+        return self._cmdline
+
+
+class FakeProcessTable:
+    """A synthetic process table patched over psutil.pids()/psutil.Process."""
+
+    def __init__(self, count: int) -> None:
+        self.processes: dict[int, tuple[str, list[str]]] = {}
+        self.created: dict[int, float] = {}  # pid -> start time
+        self._spawned = 0
+        for index in range(count):
+            self.spawn(f"worker-{index % 50}", ["/usr/bin/worker", f"--id={index}"])
+
+    def spawn(self, name: str, cmdline: list[str]) -> int:
+        pid = FAKE_PID_BASE + len(self.processes) + 1
+        while pid in self.processes:
+            pid += 1
+        self.processes[pid] = (name, cmdline)
+        self._spawned += 1
+        self.created[pid] = float(self._spawned)  # distinct even for a reused pid
+        return pid
+
+    def kill(self, pid: int) -> None:
+        self.processes.pop(pid, None)
+        self.created.pop(pid, None)
+
+    @contextmanager
+    def installed(self):
+        with mock.patch.object(psutil, "pids", lambda: list(self.processes)), mock.patch.object(
+            psutil, "Process", lambda pid: FakeProcess(self, pid)
+        ):
+            yield self
@@ -0,0 +1,245 @@
+"""Headless dashboard benchmarks.
+
+Drives DashboardApp through Textual's pilot with stand-in `tb` and
+`gcalcli` executables (see fake_bin/) and a synthetic process table, and
+writes the timings as JSON so runs can be compared.
+
+    python -m benchmarks --items 10000 --processes 2000 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from benchmarks.fixtures import FakeProcessTable, sandbox
+
+
+class LagProbe:
+    """Measures how late the event loop wakes a short sleep, i.e. loop stalls."""
+
+    def __init__(self, period: float = 0.005) -> None:
+        self.period = period
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.period)
+            self.lags.append(max(time.perf_counter() - started - self.period, 0.0))
+
+    def stop(self) -> dict:
+        if self._task is not None:
+            self._task.cancel()
+        lags = sorted(self.lags) or [0.0]
+        return {
+            "samples": len(self.lags),
+            "max_stall_ms": lags[-1] * 1000,
+            "p99_stall_ms": lags[int(len(lags) * 0.99) - 1 if len(lags) > 1 else 0] * 1000,
+            "mean_stall_ms": statistics.fmean(lags) * 1000,
+        }
+
+
+async def timed(coro) -> float:
+    started = time.perf_counter()
+    await coro
+    return time.perf_counter() - started
+
+
+def ms(seconds: float) -> float:
+    return round(seconds * 1000, 3)
+
+
+async def wait_for(pilot, predicate, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark condition not reached")
+        await pilot.pause(0.005)
+
+
+async def bench_app(args: argparse.Namespace) -> dict:
+    import main
+
+    results: dict = {}
+    probe = LagProbe()
+    probe.start()
+
+    main._STARTED = time.perf_counter()
+    app = main.DashboardApp()
+    # Tab underline animations would otherwise dominate switch latency.
+    app.animation_level = "none"
+    async with app.run_test(size=(160, 50)) as pilot:
+        await wait_for(pilot, lambda: app.first_frame_seconds is not None)
+        results["startup"] = {"first_frame_ms": ms(app.first_frame_seconds)}
+
+        from widgets.calendar import CalendarPane
+        from widgets.taskbook import TaskbookPane
+
+        calendar = app.query_one(CalendarPane)
+        await wait_for(pilot, lambda: calendar.fetched_at is not None)
+        results["startup"]["calendar_ready_ms"] = ms(
+            time.perf_counter() - main._STARTED
+        )
+
+        # Tab switches: the first visit builds the tab, the second is warm.
+        switches: dict = {}
+        keys = [
+            ("b", "taskbook-tab"),
+            ("s", "services-tab"),
+            ("l", "tools-tab"),
+            ("f", "disk-management-tab"),
+            ("h", "home-tab"),
+        ]
+        for visit in ("cold", "warm"):
+            for key, tab_id in keys:
+                started = time.perf_counter()
+                await pilot.press(key)
+                await pilot.pause()
+                switches.setdefault(tab_id, {})[f"{visit}_ms"] = ms(
+                    time.perf_counter() - started
+                )
+        results["tab_switch"] = switches
+
+        from textual.widgets import DataTable
+        from widgets.disk_usage import DufDisplay
+        from widgets.command_runner import get_command_runner
+        from widgets.taskbook_interactive import InteractiveTaskbook
+
+        taskbook = app.query_one(TaskbookPane)
+        interactive = app.query_one(InteractiveTaskbook)
+        table = interactive.query_one(DataTable)
+        store = taskbook.store
+        refresh: dict = {}
+
+        # Measure a real gcalcli run, not the runner's cached result.
+        get_command_runner().invalidate()
+        refresh["calendar_fetch_ms"] = ms(await timed(calendar.fetch_gcal_data()))
+        started = time.perf_counter()
+        calendar.render_agenda()
+        refresh["calendar_render_ms"] = ms(time.perf_counter() - started)
+
+        refresh["taskbook_unchanged_check_ms"] = ms(
+            await timed(asyncio.to_thread(store.refresh))
+        )
+        os.utime(store.path)
+        refresh["taskbook_reload_ms"] = ms(await timed(asyncio.to_thread(store.refresh)))
+        started = time.perf_counter()
+        taskbook.render_store()
+        refresh["taskbook_pane_render_ms"] = ms(time.perf_counter() - started)
+        refresh["taskbook_table_noop_diff_ms"] = ms(
+            await timed(interactive.populate(table))
+        )
+
+        refresh["disk_sample_ms"] = ms(
+            await timed(app.query_one(DufDisplay).fetch_duf_output())
+        )
+
+        # Bulk triage: ten checks in a row, coalesced into one `tb` call.
+        ids = list(store.items)[:10]
+        started = time.perf_counter()
+        for item_id in ids:
+            interactive.mutations.check(item_id)
+        refresh["taskbook_check10_optimistic_ms"] = ms(time.perf_counter() - started)
+        await interactive.mutations.drain()
+        refresh["taskbook_check10_settled_ms"] = ms(time.perf_counter() - started)
+        results["refresh"] = refresh
+
+        await pilot.pause(0.2)
+
+    results["event_loop"] = probe.stop()
+    return results
+
+
+def bench_process_checks(processes: int) -> dict:
+    from widgets.process_watcher import ProcessWatcher
+
+    table = FakeProcessTable(processes)
+    with table.installed():
+        watcher = ProcessWatcher()
+        started = time.perf_counter()
+        watcher.is_running("copyparty")
+        cold = time.perf_counter() - started
+
+        rounds = 10_000
+        started = time.perf_counter()
+        for _ in range(rounds):
+            watcher.is_running("copyparty")
+        warm = (time.perf_counter() - started) / rounds
+
+        for index in range(20):
+            watcher.watch(f"service-{index}")
+        started = time.perf_counter()
+        watcher.refresh()
+        idle_tick = time.perf_counter() - started
+
+        for index in range(20):
+            table.spawn(f"service-{index}", [f"service-{index}"])
+        table.kill(next(iter(table.processes)))
+        started = time.perf_counter()
+        watcher.refresh()
+        busy_tick = time.perf_counter() - started
+        started = time.perf_counter()
+        found = sum(watcher.is_running(f"service-{index}") for index in range(20))
+        twenty = time.perf_counter() - started
+
+    return {
+        "processes": processes,
+        "is_process_running_cold_ms": ms(cold),
+        "is_process_running_warm_us": round(warm * 1e6, 3),
+        "tick_no_changes_ms": ms(idle_tick),
+        "tick_20_new_1_exited_ms": ms(busy_tick),
+        "query_20_names_us": round(twenty * 1e6, 3),
+        "query_20_names_found": found,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10_000, help="taskbook items")
+    parser.add_argument("--processes", type=int, default=2_000, help="fake processes")
+    parser.add_argument("--events", type=int, default=50, help="calendar events")
+    parser.add_argument("--tb-latency", type=float, default=0.3, help="seconds per tb call")
+    parser.add_argument(
+        "--gcalcli-latency", type=float, default=2.0, help="seconds per gcalcli call"
+    )
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    with sandbox(args.items, args.tb_latency, args.gcalcli_latency, args.events):
+        with FakeProcessTable(args.processes).installed():
+            results = asyncio.run(bench_app(args))
+        results["process_checks"] = bench_process_checks(args.processes)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "items": args.items,
+            "processes": args.processes,
+            "events": args.events,
+            "tb_latency": args.tb_latency,
+            "gcalcli_latency": args.gcalcli_latency,
+        },
+        **results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
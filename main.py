@@ -1,71 +1,62 @@
-import subprocess
-import psutil
+import time
+
+# Measured from here, before Textual itself is imported.
+_STARTED = time.perf_counter()
+
+import argparse
+import json
+import sys
 from textual.app import App, ComposeResult
-from textual.containers import Vertical, Container
+from textual.message import Message
+from textual.timer import Timer
 from textual.widgets import (
-    Button,
-    Header,
     Footer,
     Static,
     TabbedContent,
     TabPane,
-    Label,
 )
 
-# --- Custom Widget Imports ---
-# Make sure this file is in the correct directory so it can find the 'widgets' folder.
-from widgets.calendar import CalendarPane
-from widgets.taskbook import TaskbookPane
-from widgets.task_manager import TaskbookManager
-from widgets.taskbook_interactive import InteractiveTaskbook
+# --- Widget Registry ---
+# The tabs, the widgets in each and their keys come from the config (see
+# widgets/registry.py). A widget's module is imported when a tab holding it
+# is built: the first tab at startup, every other tab when first opened. A
+# widget no tab holds is never imported and never polls.
+from widgets.registry import Layout, TabSpec, load_layout
 
 # ----------------------------
 
+from widgets.collector_client import SOURCES, CollectorClient, set_collector_client
+from widgets.config import config_path, config_signature, get_config, reload_config
+from widgets.log_tail import FileWatcher
+from widgets.perf import PERF
+from widgets.scheduler import RefreshScheduler
 
-# --- NEW CUSTOM WIDGET FOR DISK USAGE ---
-class DufDisplay(Static):
-    """A widget to display the output of the 'duf' command."""
-
-    def on_mount(self) -> None:
-        """Event handler called when widget is added to the DOM."""
-        self.update("⏳ Fetching disk usage information...")
-        self.run_worker(self.fetch_duf_output, exclusive=True)
+# Time from startup to the first interactive frame we aim to stay under.
+STARTUP_TARGET_SECONDS = 0.5
 
-    def get_duf_output(self) -> str:
-        """Runs the 'duf' command and returns its output as a string."""
-        try:
-            result = subprocess.run(
-                ["duf", "-style", "ascii", "-width", "120"],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=10,  # Add a timeout to prevent indefinite hanging
-            )
-            return result.stdout
-        except FileNotFoundError:
-            return "[bold red]Error: The 'duf' command was not found.\nPlease make sure it's installed and in your system's PATH.[/]"
-        except subprocess.CalledProcessError as e:
-            return f"[bold red]An error occurred while running 'duf':\n{e.stderr}[/]"
-        except subprocess.TimeoutExpired:
-            return "[bold red]Error: The 'duf' command timed out after 10 seconds.[/]"
-        except Exception as e:
-            return f"[bold red]An unexpected error occurred: {e}[/]"
-
-    async def fetch_duf_output(self) -> None:
-        """Worker task that runs the duf command and updates the content."""
-        output = self.get_duf_output()
-        self.update(output)
+# Seconds to wait after the config file changes before reading it, so an
+# editor's save (often several writes) is applied once.
+CONFIG_RELOAD_DELAY = 0.2
 
 
 def is_process_running(process_name: str) -> bool:
-    """Check if a process with the given name is running (cross-platform)."""
-    for proc in psutil.process_iter(["name", "cmdline"]):
-        if process_name.lower() in proc.info.get("name", "").lower():
-            return True
-        cmdline = proc.info.get("cmdline")
-        if cmdline and process_name.lower() in " ".join(cmdline).lower():
-            return True
-    return False
+    """Check if a process with the given name is running (cross-platform).
+
+    Answered from the shared ProcessWatcher index rather than a full scan.
+    """
+    from widgets.process_watcher import get_process_watcher
+
+    return get_process_watcher().is_running(process_name)
+
+
+def placeholder_pane(tab: TabSpec) -> TabPane:
+    """A tab that isn't built yet."""
+    return TabPane(tab.title, Static("Loading...", classes="tab-message"), id=tab.id)
+
+
+def tab_content(layout: Layout, tab: TabSpec) -> tuple:
+    """What a tab is built from; if this changes, a built tab is rebuilt."""
+    return tab.layout, tuple(layout.widgets[name] for name in tab.widgets)
 
 
 class DashboardApp(App):
@@ -73,64 +64,40 @@ class DashboardApp(App):
 
     CSS_PATH = "style.css"
 
-    # --- BINDINGS MODIFIED HERE ---
-    BINDINGS = [
-        ("d", "toggle_dark", "Toggle dark mode"),
-        ("q", "quit", "Quit"),
-        # Home row keys to switch tabs
-        ("h", "switch_tab('home-tab')", "Home"),
-        ("b", "switch_tab('taskbook-tab')", "Taskbook"),
-        ("s", "switch_tab('services-tab')", "Services"),
-        ("l", "switch_tab('tools-tab')", "Launch Tools"),
-        ("f", "switch_tab('disk-management-tab')", "Disk Mngmt"),
-    ]
-    # --------------------------
+    def __init__(self, use_collector: bool = True) -> None:
+        super().__init__()
+        # Owns the refresh timing of every pane; see widgets/scheduler.py.
+        self.scheduler = RefreshScheduler(self)
+        # With a collector daemon running (see widgets/collector.py), panes are
+        # pushed its data instead of polling every source themselves.
+        self.collector = None
+        if use_collector and get_config().get("collector", {}).get("enabled", True):
+            self.collector = CollectorClient.connect()
+        set_collector_client(self.collector)
+        # Tabs, widgets and keys; replaced when the config file changes.
+        self.tab_layout = load_layout(get_config())
+        self.apply_bindings()
+        self.built_tabs: set[str] = set()
+        self.watching_processes = False
+        self.config_watcher: FileWatcher | None = None
+        self._config_signature = config_signature()
+        self._reload_timer: Timer | None = None
 
     def compose(self) -> ComposeResult:
         """Create child widgets for the app."""
         # yield Header()
         yield Footer()
 
-        with TabbedContent(initial="home-tab"):
-            # Tab 1: Home
-            with TabPane("Home", id="home-tab"):
-                with Container(id="home-grid"):
-                    yield Container(
-                        Label("[b]🗓️ Calendar[/b]"), CalendarPane(), id="calendar"
-                    )
-                    yield Container(
-                        Label("[b]✔ Tasks & Notes[/b]"), TaskbookPane(), id="taskbook"
-                    )
-
-            # Tab 2: Interactive Taskbook
-            with TabPane("Taskbook", id="taskbook-tab"):
-                yield InteractiveTaskbook()
-
-            # Tab 3: Service Dashboard
-            with TabPane("Services", id="services-tab"):
-                with Vertical(classes="pane"):
-                    yield Static("Services Status", classes="pane-title")
-                    yield Static(
-                        "▶ copyparty: [bold green]...[/]", id="copyparty-status"
-                    )
-
-            # Tab 4: Tool Launcher
-            with TabPane("Launch Tools", id="tools-tab"):
-                with Vertical(classes="pane"):
-                    yield Static("Launch External Tools", classes="pane-title")
-                    yield Static(id="tool-status", classes="status-message")
-                    yield Button(
-                        "Task Manager (btop)", id="btn-btop", variant="primary"
-                    )
-                    yield Button(
-                        "File Explorer (superfile)",
-                        id="btn-superfile",
-                        variant="success",
-                    )
-
-            # Tab 5: Disk Management now uses our custom widget
-            with TabPane("Disk Management", id="disk-management-tab"):
-                yield DufDisplay(classes="pane-content")
+        first, *rest = self.tab_layout.tabs
+        with TabbedContent(initial=first.id):
+            # The first tab (Home by default) is built straight away...
+            with TabPane(first.title, id=first.id):
+                yield from self.tab_layout.build_tab(first)
+            self.built_tabs.add(first.id)
+            # ...the others start as placeholders and are built on first
+            # activation.
+            for tab in rest:
+                yield placeholder_pane(tab)
 
     # --- NEW ACTION METHOD ADDED ---
     def action_switch_tab(self, tab_id: str) -> None:
@@ -139,50 +106,239 @@ class DashboardApp(App):
 
     # -------------------------------
 
+    def apply_bindings(self) -> None:
+        """Bind the layout's keys, dropping any bound by an earlier layout."""
+        # bind() can only add, so start again from the class bindings.
+        # `_bindings` and `_merge_bindings()` are Textual internals (as of
+        # 8.2); re-check this when upgrading Textual.
+        self._bindings = self._merge_bindings()
+        for key, action, description in self.tab_layout.keys:
+            self.bind(key, action, description=description)
+
     def on_mount(self) -> None:
-        """Called when the app is first mounted to start the status checker."""
-        self.update_copyparty_status()
-        self.set_interval(5, self.update_copyparty_status)
+        """Record how long it took to get the first frame on screen."""
+        self.first_frame_seconds: float | None = None
+        self.call_after_refresh(self._record_first_frame)
+        self.tab_built(self.tab_layout.tabs[0])
+        self.report_problems(self.tab_layout)
+        if PERF.enabled:
+            self.run_worker(PERF.monitor_lag(), name="perf-lag", group="perf")
+        if self.collector is not None:
+            self.log(f"Using the collector at {self.collector.path}")
+            self.collector.on_state_change = self._on_collector_state_change
+            self.run_worker(self.collector.run(), name="collector", group="collector")
+        # Through inotify where available; otherwise a stat() a second.
+        self.config_watcher = FileWatcher(config_path(), self.config_changed)
+        self.config_watcher.start()
+
+    def _on_collector_state_change(self, connected: bool) -> None:
+        if connected:
+            self.notify("Reconnected to the collector.")
+        else:
+            self.notify(
+                "Lost the collector; data is stale until it is back.", severity="warning"
+            )
+
+    def _record_first_frame(self) -> None:
+        self.first_frame_seconds = time.perf_counter() - _STARTED
+        PERF.record("startup first frame", self.first_frame_seconds)
+        self.log(f"First interactive frame after {self.first_frame_seconds:.3f}s")
+        if self.first_frame_seconds > STARTUP_TARGET_SECONDS:
+            self.log.warning(
+                f"Startup exceeded the {STARTUP_TARGET_SECONDS}s target "
+                f"({self.first_frame_seconds:.3f}s)"
+            )
+
+    def report_problems(self, layout: Layout) -> None:
+        for problem in layout.problems:
+            self.notify(problem, title="Config", severity="warning")
 
-    def on_taskbook_manager_refresh_data(
-        self, message: TaskbookManager.RefreshData
+    # --- Tabs ---
+
+    async def on_tabbed_content_tab_activated(
+        self, event: TabbedContent.TabActivated
     ) -> None:
-        """Catches custom message to refresh the home screen's taskbook pane."""
-        taskbook_pane = self.query_one(TaskbookPane)
-        taskbook_pane.update_taskbook()
-
-    def update_copyparty_status(self) -> None:
-        """Update the status of the copyparty service in the Dashboard tab."""
-        if self.is_mounted(self.query_one("#copyparty-status")):
-            status_widget = self.query_one("#copyparty-status")
-            if is_process_running("copyparty"):
-                status_widget.update("▶ copyparty: [bold green]UP[/]")
+        """Build a lazy tab the first time it is shown."""
+        # Once the switch has been drawn, pause/slow the panes that went out
+        # of view and refresh the ones that came into view.
+        self.call_after_refresh(self.scheduler.update_visibility)
+        await self.build_tab(event.pane)
+
+    async def build_tab(self, pane: TabPane) -> None:
+        tab = next((tab for tab in self.tab_layout.tabs if tab.id == pane.id), None)
+        if tab is None or tab.id in self.built_tabs:
+            return
+        self.built_tabs.add(tab.id)
+        await pane.remove_children()
+        await pane.mount_all(self.tab_layout.build_tab(tab))
+        self.tab_built(tab)
+
+    def tab_built(self, tab: TabSpec) -> None:
+        if "services" in tab.widgets and self.collector is None:
+            self.start_process_watcher()
+
+    def start_process_watcher(self) -> None:
+        """Start the background process watcher that feeds the Services tab."""
+        from widgets.process_watcher import ProcessWatcher, get_process_watcher
+        from widgets.services import ServicesPane
+
+        watcher = get_process_watcher()
+        for pane in self.query(ServicesPane):
+            for name in pane.process_names():
+                watcher.watch(name)
+                # Names watched before are only reported again on a change,
+                # so a rebuilt pane starts from the last reported status.
+                running = watcher.reported_status(name)
+                if running is not None:
+                    pane.update_process_status(name, running)
+        if not self.watching_processes:
+            self.watching_processes = True
+            # The watcher runs on its own thread; post_message is thread-safe.
+            watcher.subscribe(
+                lambda name, running: self.post_message(
+                    ProcessWatcher.StatusChanged(name, running)
+                )
+            )
+        watcher.start()
+
+    def stop_process_watcher(self) -> None:
+        if self.watching_processes and self.collector is None:
+            from widgets.process_watcher import get_process_watcher
+
+            get_process_watcher().stop()
+
+    # --- Config Reloading ---
+
+    def config_changed(self) -> None:
+        if self._reload_timer is None:
+            self._reload_timer = self.set_timer(CONFIG_RELOAD_DELAY, self.check_config)
+
+    def check_config(self) -> None:
+        self._reload_timer = None
+        signature = config_signature()
+        if signature != self._config_signature:
+            self._config_signature = signature
+            self.run_worker(self.apply_config, exclusive=True, group="config")
+
+    async def apply_config(self) -> None:
+        """Re-read the config file and apply what changed, without a restart."""
+        old = get_config()
+        try:
+            config = reload_config()
+        except ValueError as e:  # tomllib.TOMLDecodeError
+            self.notify(f"Kept the old config: {e}", title="Config", severity="error")
+            return
+        changed = {key for key in old.keys() | config.keys() if old.get(key) != config.get(key)}
+        if not changed:
+            return
+        self.scheduler.configure(config)
+        layout = load_layout(config)
+        await self.apply_layout(layout, changed)
+        self.report_problems(layout)
+        self.notify("Config reloaded.", title="Config")
+
+    async def apply_layout(self, layout: Layout, changed: set[str]) -> None:
+        """Add, remove and rebuild tabs to match a reloaded layout.
+
+        Built tabs whose widgets changed, or whose widgets read a config
+        key that changed, go back to placeholders and are built again when
+        next shown; removed tabs take their widgets, and so their
+        refreshes, with them.
+        """
+        tabbed = self.query_one(TabbedContent)
+        old = {tab.id: tab for tab in self.tab_layout.tabs}
+        stale = layout.tabs_reading(changed)
+        for tab_id in old.keys() - {tab.id for tab in layout.tabs}:
+            self.built_tabs.discard(tab_id)
+            await tabbed.remove_pane(tab_id)
+
+        kept = [tab.id for tab in layout.tabs if tab.id in old]
+        previous = None
+        for tab in layout.tabs:
+            if tab.id not in old:
+                if previous is not None:
+                    await tabbed.add_pane(placeholder_pane(tab), after=previous)
+                else:
+                    await tabbed.add_pane(placeholder_pane(tab), before=kept[0] if kept else None)
             else:
-                status_widget.update("▶ copyparty: [bold red]DOWN[/]")
-
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """Handle button press events from the Tools tab."""
-        command = None
-        status_widget = self.query_one("#tool-status")
-        status_widget.update()
-
-        if event.button.id == "btn-btop":
-            command = "btop4win"
-        elif event.button.id == "btn-superfile":
-            command = "spf"
-
-        if command:
-            try:
-                with self.suspend():
-                    subprocess.run(command, shell=True, check=True)
-            except FileNotFoundError:
-                status_widget.update(
-                    f"[bold red]Error: Command '{command}' not found.[/]"
+                if tab.title != old[tab.id].title:
+                    tabbed.get_tab(tab.id).label = tab.title
+                rebuild = tab.id in stale or tab_content(layout, tab) != tab_content(
+                    self.tab_layout, old[tab.id]
                 )
-            except Exception as e:
-                status_widget.update(f"[bold red]An error occurred: {e}[/bold red]")
+                if rebuild and tab.id in self.built_tabs:
+                    self.built_tabs.discard(tab.id)
+                    pane = tabbed.get_pane(tab.id)
+                    await pane.remove_children()
+                    await pane.mount(Static("Loading...", classes="tab-message"))
+            previous = tab.id
+
+        self.tab_layout = layout
+        self.apply_bindings()
+        self.refresh_bindings()
+        if not any("services" in tab.widgets for tab in layout.tabs if tab.id in self.built_tabs):
+            self.stop_process_watcher()
+        if tabbed.active_pane is not None:
+            await self.build_tab(tabbed.active_pane)
+        self.call_after_refresh(self.scheduler.update_visibility)
+
+    def on_app_focus(self) -> None:
+        self.scheduler.set_focused(True)
+
+    def on_app_blur(self) -> None:
+        self.scheduler.set_focused(False)
+
+    def on_unmount(self) -> None:
+        PERF.flush()
+        if self.config_watcher is not None:
+            self.config_watcher.close()
+        if self.collector is not None:
+            self.collector.close()
+        else:
+            self.stop_process_watcher()
+
+    def on_process_watcher_status_changed(self, message: Message) -> None:
+        """Push process status changes from the watcher into the Services tab."""
+        from widgets.services import ServicesPane
+
+        for pane in self.query(ServicesPane):
+            pane.update_process_status(message.name, message.running)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="A TUI dashboard.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--collector",
+        action="store_true",
+        help="run the shared collector daemon that dashboards connect to",
+    )
+    mode.add_argument(
+        "--dump",
+        nargs="*",
+        choices=SOURCES,
+        metavar="SOURCE",
+        help=f"print the current snapshot as JSON and exit ({', '.join(SOURCES)}; default all)",
+    )
+    mode.add_argument(
+        "--local",
+        action="store_true",
+        help="collect in-process even if a collector is running",
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    app = DashboardApp()
+    args = parse_args()
+    if args.collector:
+        from widgets.collector import run_collector
+
+        sys.exit(run_collector())
+    if args.dump is not None:
+        from widgets.collector import dump
+
+        json.dump(dump(args.dump), sys.stdout, indent=2)
+        print()
+        sys.exit(0)
+    app = DashboardApp(use_collector=not args.local)
     app.run()
@@ -0,0 +1,83 @@
+import os
+import time
+
+from widgets.dir_scanner import DirListing, DirScanner, DirSizeCache
+
+
+def make_tree(root):
+    for path in ("a/x", "a/y", "b"):
+        os.makedirs(root / path)
+    for path in ("top.txt", "a/one.txt", "a/x/two.txt", "b/three.txt"):
+        (root / path).write_bytes(b"z" * 5000)
+
+
+def scan(scanner, path, full=False):
+    root = scanner.scan(str(path), full=full)
+    deadline = time.monotonic() + 10
+    while scanner.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert root.done
+    # The listings are saved just after the tree is done, under the lock.
+    listings = scanner._scan.listings
+    while not listings.keys() <= scanner.cache.listings.keys() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with scanner.cache._lock:
+        return root
+
+
+def test_the_cache_round_trips_through_sqlite(tmp_path):
+    path = str(tmp_path / "dirs.sqlite3")
+    listings = {
+        (1, 2): DirListing(123, 4096, 3, ("a", "b")),
+        (1, 3): DirListing(456, 0, 0, ()),
+    }
+    DirSizeCache(path).save(listings)
+
+    cache = DirSizeCache(path)
+    cache.load()
+    assert cache.loaded
+    assert cache.listings == listings
+
+
+def test_a_scan_sizes_the_tree_and_rolls_totals_up(tmp_path):
+    make_tree(tmp_path / "tree")
+    scanner = DirScanner(DirSizeCache(str(tmp_path / "dirs.sqlite3")), workers=3)
+    root = scan(scanner, tmp_path / "tree")
+
+    assert root.files == 4
+    children = {child.name: child for child in root.children}
+    assert set(children) == {"a", "b"}
+    assert children["a"].files == 2 and children["b"].files == 1
+    assert root.bytes > children["a"].bytes > 0
+    assert scanner.progress()[:2] == (5, 0)
+
+
+def test_a_rescan_reuses_unchanged_directories(tmp_path):
+    make_tree(tmp_path / "tree")
+    cache_path = str(tmp_path / "dirs.sqlite3")
+    first = scan(DirScanner(DirSizeCache(cache_path)), tmp_path / "tree")
+
+    (tmp_path / "tree/a/new.txt").write_bytes(b"z" * 5000)  # changes a's mtime
+    scanner = DirScanner(DirSizeCache(cache_path))  # as after a restart
+    root = scan(scanner, tmp_path / "tree")
+    assert root.files == first.files + 1
+    assert scanner.progress()[:2] == (5, 4)  # only "a" listed again
+
+    scan(scanner, tmp_path / "tree", full=True)
+    assert scanner.progress()[:2] == (5, 0)
+
+
+def test_an_unreadable_root_finishes_with_an_error(tmp_path):
+    scanner = DirScanner(DirSizeCache(str(tmp_path / "dirs.sqlite3")))
+    root = scan(scanner, tmp_path / "missing")
+    assert root.error and root.files == 0 and not root.children
+
+
+def test_a_corrupt_cache_is_reported_and_the_scan_goes_on(tmp_path):
+    make_tree(tmp_path / "tree")
+    cache_path = tmp_path / "dirs.sqlite3"
+    cache_path.write_bytes(b"not a database" * 100)
+    scanner = DirScanner(DirSizeCache(str(cache_path)))
+    root = scan(scanner, tmp_path / "tree")
+    assert root.files == 4
+    assert scanner.cache_error.startswith("can't read the cache")
@@ -0,0 +1,68 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import psutil
+import pytest
+
+from widgets.disk_usage import DiskUsageEngine, MountUsage
+
+
+@pytest.fixture
+def mounts(monkeypatch):
+    """Two fake mounts; calls for /hung block until `release` is set."""
+    release = threading.Event()
+    calls = []
+
+    def disk_usage(path):
+        calls.append(path)
+        if path == "/hung":
+            release.wait(5)
+        return SimpleNamespace(total=100, used=40, free=60, percent=40.0)
+
+    monkeypatch.setattr(
+        psutil,
+        "disk_partitions",
+        lambda all=False: [
+            SimpleNamespace(mountpoint="/ok", device="/dev/ok", fstype="ext4"),
+            SimpleNamespace(mountpoint="/hung", device="nfs:/hung", fstype="nfs"),
+        ],
+    )
+    monkeypatch.setattr(psutil, "disk_usage", disk_usage)
+    yield calls
+    release.set()
+
+
+def test_a_hung_mount_times_out_without_holding_up_the_others(mounts):
+    engine = DiskUsageEngine(timeout=0.2)
+    started = time.perf_counter()
+    ok, hung = engine.sample()
+    assert time.perf_counter() - started < 1
+    assert (ok.mountpoint, ok.status, ok.used) == ("/ok", "ok", 40)
+    assert (hung.mountpoint, hung.status) == ("/hung", "timeout")
+    engine.close()
+
+
+def test_a_mount_still_stuck_is_not_queried_again(mounts):
+    engine = DiskUsageEngine(timeout=0.1)
+    engine.sample()
+    engine.sample()
+    assert mounts.count("/hung") == 1
+    assert mounts.count("/ok") == 2
+    engine.close()
+
+
+def test_close_stops_the_stat_threads():
+    before = set(threading.enumerate())
+    engine = DiskUsageEngine(workers=3)
+    workers = set(threading.enumerate()) - before
+    assert len(workers) == 3
+    engine.close()
+    for thread in workers:
+        thread.join(2)
+    assert not any(thread.is_alive() for thread in workers)
+
+
+def test_a_mount_survives_the_trip_through_the_collector():
+    mount = MountUsage("/", "/dev/sda1", "ext4", 100, 40, 60, 40.0, 1.5, 2.5)
+    assert MountUsage(*mount.to_row()) == mount
@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+from widgets.notes_store import NotesStore
+
+
+def journal(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_the_journal_replays_to_the_latest_notes(tmp_path):
+    path = str(tmp_path / "notes.jsonl")
+
+    async def run():
+        store = NotesStore(path, delay=1000)
+        kept = store.add("first")
+        gone = store.add("second")
+        store.flush_sync()
+        store.put(kept.id, "first, edited")
+        store.delete(gone.id)
+        store.flush_sync()
+        return kept.id
+
+    kept = asyncio.run(run())
+    store = NotesStore(path)
+    store.load()
+    assert {note.id: note.text for note in store.notes.values()} == {kept: "first, edited"}
+
+
+def test_edits_in_a_pause_are_written_once(tmp_path):
+    path = str(tmp_path / "notes.jsonl")
+
+    async def run():
+        store = NotesStore(path, delay=0.05)
+        note = store.add("a")
+        for text in ("ab", "abc", "abcd"):
+            store.put(note.id, text)
+        await asyncio.sleep(0.3)
+
+    asyncio.run(run())
+    assert [record["text"] for record in journal(path)] == ["abcd"]
+
+
+def test_a_torn_last_line_is_skipped_and_not_glued_to_the_next(tmp_path):
+    path = tmp_path / "notes.jsonl"
+    path.write_text('{"op": "put", "id": "a", "text": "kept", "ts": 1.0}\n{"op": "put", "id"')
+
+    async def run():
+        store = NotesStore(str(path), delay=1000)
+        store.load()
+        assert [note.text for note in store.notes.values()] == ["kept"]
+        store.add("after the crash")
+        store.flush_sync()
+
+    asyncio.run(run())
+    store = NotesStore(str(path))
+    store.load()
+    assert sorted(note.text for note in store.notes.values()) == ["after the crash", "kept"]
+
+
+def test_superseded_records_are_compacted_away(tmp_path):
+    path = str(tmp_path / "notes.jsonl")
+
+    async def run():
+        store = NotesStore(path, delay=1000)
+        note = store.add("v0")
+        store.flush_sync()
+        for version in range(1, 150):
+            store.put(note.id, f"v{version}")
+            store.flush_sync()
+        return note.id
+
+    note_id = asyncio.run(run())
+    records = journal(path)
+    assert len(records) < 100
+    assert records[-1]["id"] == note_id and records[-1]["text"] == "v149"
+    store = NotesStore(path)
+    store.load()
+    assert store.notes[note_id].text == "v149"
+
+
+def test_notes_added_while_loading_are_kept(tmp_path):
+    path = str(tmp_path / "notes.jsonl")
+
+    async def run():
+        store = NotesStore(path, delay=1000)
+        store.add("on disk")
+        store.flush_sync()
+        restarted = NotesStore(path, delay=1000)
+        restarted.add("typed before the load finished")
+        restarted.load()
+        return restarted
+
+    store = asyncio.run(run())
+    assert sorted(note.text for note in store.notes.values()) == [
+        "on disk",
+        "typed before the load finished",
+    ]
+    assert len(store._pending) == 1  # still to be written
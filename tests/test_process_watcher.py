@@ -0,0 +1,86 @@
+import os
+import random
+import subprocess
+import sys
+
+import psutil
+import pytest
+
+from widgets.process_watcher import ProcessWatcher
+
+
+@pytest.fixture
+def sleeper():
+    """A process with an argument nothing else on the machine has."""
+    seconds = f"{random.randint(100, 999)}.{random.randint(10**8, 10**9)}"
+    proc = subprocess.Popen(["sleep", seconds])
+    yield proc, seconds
+    proc.kill()
+    proc.wait()
+
+
+def test_a_tick_adds_new_processes_and_drops_exited_ones(sleeper):
+    proc, seconds = sleeper
+    watcher = ProcessWatcher()
+    changes = []
+    watcher.subscribe(lambda name, running: changes.append((name, running)))
+    watcher.watch(seconds)
+    watcher.refresh()
+    assert watcher.is_running(seconds)
+    assert watcher.has_process_named("sleep")
+
+    proc.kill()
+    proc.wait()
+    watcher.refresh()
+    assert not watcher.is_running(seconds)
+    assert changes == [(seconds, True), (seconds, False)]
+
+
+def test_a_tick_only_inspects_pids_it_has_not_seen(monkeypatch):
+    watcher = ProcessWatcher()
+    own = os.getpid()
+    listing = [pid for pid in psutil.pids() if pid != own]
+    monkeypatch.setattr(psutil, "pids", lambda: listing)
+    watcher.refresh()
+    inspected = []
+    inspect = watcher._inspect
+    monkeypatch.setattr(watcher, "_inspect", lambda pid: inspected.append(pid) or inspect(pid))
+
+    watcher.refresh()
+    assert inspected == []
+    listing = listing + [own]
+    watcher.refresh()
+    assert inspected == [own]
+    assert own in watcher._snapshot
+
+
+def test_a_reused_pid_is_not_taken_for_the_process_that_had_it():
+    watcher = ProcessWatcher()
+    watcher.refresh()
+    pid = os.getpid()
+    created, _, _ = watcher._snapshot[pid]
+    # As if this PID had belonged to an older "ghostproc" at the last tick.
+    watcher._forget(pid)
+    watcher._snapshot[pid] = (created - 100, "ghostproc", "ghostproc")
+    watcher._by_name["ghostproc"] = {pid}
+    watcher.watch("ghostproc")
+    assert pid in watcher._matches["ghostproc"]
+
+    watcher.refresh()
+    assert pid not in watcher._matches["ghostproc"]
+    assert watcher._snapshot[pid][1] == psutil.Process(pid).name().lower()
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="counts /proc/self/fd")
+def test_stop_closes_the_wake_pipe_and_pidfds(sleeper):
+    _, seconds = sleeper
+    open_fds = lambda: len(os.listdir("/proc/self/fd"))
+    watcher = ProcessWatcher(interval=0.1)
+    watcher.watch(seconds)
+    before = open_fds()
+    for _ in range(3):
+        watcher.start()
+        watcher.refresh()
+        assert watcher.is_running(seconds)
+        watcher.stop()
+    assert open_fds() == before
@@ -0,0 +1,48 @@
+import math
+
+from widgets.system_metrics import RingBuffer, lttb
+
+
+def test_the_buffer_keeps_the_newest_values_oldest_first():
+    ring = RingBuffer(4)
+    assert list(ring.last()) == [] and ring.latest == 0.0
+    for value in range(1, 4):
+        ring.append(value)
+    assert list(ring.last()) == [1, 2, 3]
+
+    for value in range(4, 11):
+        ring.append(value)
+    assert ring.count == 4
+    assert list(ring.last()) == [7, 8, 9, 10]
+    assert ring.latest == 10
+    assert len(ring._data) == 4  # never grows
+
+
+def test_last_n_reads_across_the_wrap():
+    ring = RingBuffer(5)
+    for value in range(7):  # the head is now at index 2
+        ring.append(value)
+    assert list(ring.last(3)) == [4, 5, 6]
+    assert list(ring.last(4)) == [3, 4, 5, 6]
+    assert list(ring.last(50)) == [2, 3, 4, 5, 6]
+
+
+def test_lttb_returns_threshold_points_with_both_ends():
+    values = [math.sin(x / 10) for x in range(1000)]
+    sampled = lttb(values, 60)
+    assert len(sampled) == 60
+    assert sampled[0] == values[0] and sampled[-1] == values[-1]
+    assert set(sampled) <= set(values)
+
+
+def test_lttb_keeps_a_spike_that_averaging_would_flatten():
+    values = [1.0] * 600
+    values[333] = 100.0
+    values[444] = -50.0
+    sampled = lttb(values, 30)
+    assert 100.0 in sampled and -50.0 in sampled
+
+
+def test_lttb_passes_short_series_through():
+    assert lttb([1.0, 2.0, 3.0], 10) == [1.0, 2.0, 3.0]
+    assert lttb([1.0, 2.0, 3.0, 4.0], 2) == [1.0, 2.0, 3.0, 4.0]
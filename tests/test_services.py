@@ -0,0 +1,145 @@
+import asyncio
+import socket
+import time
+
+import pytest
+
+from widgets.services import ServiceProber, ServiceSpec
+
+
+async def start_http(delay: float = 0.0, status: int = 200, chunked: bool = False):
+    """A stand-in HTTP/1.1 server; counts connections and concurrent requests."""
+    stats = {"connections": 0, "active": 0, "peak": 0, "hosts": []}
+
+    async def handle(reader, writer):
+        stats["connections"] += 1
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                for line in request.split(b"\r\n"):
+                    if line.lower().startswith(b"host:"):
+                        stats["hosts"].append(line[5:].strip().decode())
+                stats["active"] += 1
+                stats["peak"] = max(stats["peak"], stats["active"])
+                await asyncio.sleep(delay)
+                stats["active"] -= 1
+                if chunked:
+                    body = b"Transfer-Encoding: chunked\r\n\r\n2\r\nok\r\n0\r\n\r\n"
+                else:
+                    body = b"Content-Length: 2\r\n\r\nok"
+                writer.write(b"HTTP/1.1 %d X\r\n" % status + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    return server, server.sockets[0].getsockname()[1], stats
+
+
+def test_http_probe_reuses_its_connection():
+    async def run():
+        server, port, stats = await start_http()
+        async with server:
+            prober = ServiceProber([ServiceSpec("web", "http", f"http://127.0.0.1:{port}/health")])
+            first = await prober.probe_all()
+            second = await prober.probe_all()
+            prober.close()
+        return first + second, stats
+
+    results, stats = asyncio.run(run())
+    assert [result.ok for result in results] == [True, True]
+    assert stats["connections"] == 1
+    assert stats["hosts"][0].startswith("127.0.0.1:")
+
+
+def test_http_probe_reads_chunked_bodies_and_checks_the_status():
+    async def run():
+        server, port, _ = await start_http(status=503, chunked=True)
+        async with server:
+            url = f"http://127.0.0.1:{port}/"
+            prober = ServiceProber(
+                [
+                    ServiceSpec("down", "http", url),
+                    ServiceSpec("expected", "http", url, expect_status=503),
+                ]
+            )
+            results = await prober.probe_all()
+            results += await prober.probe_all()
+            prober.close()
+        return results
+
+    down, expected, down_again, expected_again = asyncio.run(run())
+    assert (down.ok, down.detail) == (False, "HTTP 503")
+    assert expected.ok and expected_again.ok and not down_again.ok
+
+
+def test_slow_probe_times_out():
+    async def run():
+        server, port, _ = await start_http(delay=5)
+        async with server:
+            spec = ServiceSpec("slow", "http", f"http://127.0.0.1:{port}/", timeout=0.2)
+            prober = ServiceProber([spec])
+            started = time.perf_counter()
+            (result,) = await prober.probe_all()
+            prober.close()
+        return result, time.perf_counter() - started
+
+    result, elapsed = asyncio.run(run())
+    assert not result.ok and result.detail == "timed out after 0.2s"
+    assert elapsed < 1
+
+
+def test_probes_are_bounded_by_the_concurrency_limit():
+    async def run():
+        server, port, stats = await start_http(delay=0.1)
+        async with server:
+            specs = [ServiceSpec(f"web{i}", "http", f"http://127.0.0.1:{port}/") for i in range(6)]
+            prober = ServiceProber(specs, concurrency=2)
+            started = time.perf_counter()
+            results = await prober.probe_all()
+            prober.close()
+        return results, stats, time.perf_counter() - started
+
+    results, stats, elapsed = asyncio.run(run())
+    assert all(result.ok for result in results)
+    assert stats["peak"] == 2
+    assert elapsed >= 0.3
+
+
+def test_tcp_probe_accepts_bracketed_ipv6_targets():
+    if not socket.has_ipv6:
+        pytest.skip("no IPv6")
+
+    async def run():
+        try:
+            server = await asyncio.start_server(lambda r, w: w.close(), "::1", 0)
+        except OSError:
+            pytest.skip("no IPv6 loopback")
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            prober = ServiceProber(
+                [
+                    ServiceSpec("v6", "tcp", f"[::1]:{port}"),
+                    ServiceSpec("no-port", "tcp", "[::1]"),
+                ]
+            )
+            return await prober.probe_all()
+
+    v6, no_port = asyncio.run(run())
+    assert v6.ok
+    assert not no_port.ok and "host:port" in no_port.detail
+
+
+def test_tcp_probe_reports_a_refused_connection():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]  # nothing listens once it is closed
+
+    async def run():
+        prober = ServiceProber([ServiceSpec("db", "tcp", f"127.0.0.1:{port}")])
+        return await prober.probe_all()
+
+    (result,) = asyncio.run(run())
+    assert not result.ok and result.latency is None
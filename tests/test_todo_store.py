@@ -0,0 +1,109 @@
+import asyncio
+from datetime import date
+
+from widgets.todo_store import TodoStore
+
+TODAY = date(2024, 5, 15)
+
+
+def day(offset: int) -> date:
+    return date.fromordinal(TODAY.toordinal() + offset)
+
+
+def reloaded(path) -> TodoStore:
+    store = TodoStore(path)
+    store.load()
+    return store
+
+
+def test_edits_are_saved_and_read_back(tmp_path):
+    path = str(tmp_path / "todo.sqlite3")
+
+    async def run():
+        store = TodoStore(path, delay=0.05)
+        store.load()
+        first = store.add("write tests", due=TODAY)
+        second = store.add("ship it")
+        store.set_done(first.id, True)
+        store.set_due(second.id, day(1))
+        await asyncio.sleep(0.3)  # the debounced flush
+
+    asyncio.run(run())
+    todos = reloaded(path).todos
+    assert [(t.text, t.done, t.due) for t in todos.values()] == [
+        ("write tests", True, TODAY),
+        ("ship it", False, day(1)),
+    ]
+
+
+def test_todos_added_before_the_read_are_renumbered_after_it(tmp_path):
+    path = str(tmp_path / "todo.sqlite3")
+
+    async def run():
+        store = TodoStore(path, delay=1000)
+        store.load()
+        store.add("on disk 1")
+        store.add("on disk 2")
+        store.flush_sync()
+
+        restarted = TodoStore(path, delay=1000)
+        early = restarted.add("typed early", due=TODAY)  # id 1, like "on disk 1"
+        rows = restarted.read()
+        restarted.apply(rows)
+        later = restarted.add("added after")
+        return restarted, early, later
+
+    store, early, later = asyncio.run(run())
+    assert early.id == 1
+    assert {t.id: t.text for t in store.todos.values()} == {
+        1: "on disk 1",
+        2: "on disk 2",
+        3: "typed early",
+        4: "added after",
+    }
+    assert later.id == 4
+    assert store.by_due == [(TODAY, 3)]
+    store.flush_sync()
+    assert [t.text for t in reloaded(path).todos.values()] == [
+        "on disk 1",
+        "on disk 2",
+        "typed early",
+        "added after",
+    ]
+
+
+def test_due_queries_skip_completed_todos(tmp_path):
+    async def run():
+        store = TodoStore(str(tmp_path / "todo.sqlite3"), delay=1000)
+        store.load()
+        late = store.add("late", due=day(-3))
+        late_done = store.add("late but done", due=day(-1))
+        today = store.add("today", due=TODAY)
+        soon = store.add("soon", due=day(2))
+        store.add("someday")
+        store.set_done(late_done.id, True)
+        return store, late, today, soon
+
+    store, late, today, soon = asyncio.run(run())
+    assert store.overdue(TODAY) == [late.id]
+    assert store.due_today(TODAY) == [today.id]
+    assert store.due_between(TODAY, day(7)) == [today.id, soon.id]
+    assert store.due_between(None, day(7)) == [late.id, today.id, soon.id]
+
+
+def test_the_indexes_follow_edits_and_removals(tmp_path):
+    async def run():
+        store = TodoStore(str(tmp_path / "todo.sqlite3"), delay=1000)
+        store.load()
+        moved = store.add("moved", due=day(-1))
+        done = store.add("done", due=TODAY)
+        store.set_due(moved.id, day(3))
+        store.set_done(done.id, True)
+        removed = store.remove_completed()
+        return store, moved, done, removed
+
+    store, moved, done, removed = asyncio.run(run())
+    assert removed == [done.id]
+    assert store.by_due == [(day(3), moved.id)]
+    assert store.completed == set()
+    assert store.overdue(TODAY) == [] and store.open_ids() == [moved.id]
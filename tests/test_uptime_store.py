@@ -0,0 +1,75 @@
+import asyncio
+import sqlite3
+
+from widgets.uptime_store import HOUR, UptimeStore
+
+T0 = 1_700_000_000.0
+
+
+def test_timeline_merges_flushed_and_pending_transitions(tmp_path):
+    async def run():
+        store = UptimeStore(str(tmp_path / "uptime.sqlite3"), delay=1000)
+        store.record("svc", True, T0)
+        store.record("svc", False, T0 + 100)
+        store.flush_sync()
+        store.record("svc", True, T0 + 200)
+        store.record("svc", False, T0 + 300)
+        return await store.timeline("svc")
+
+    _, transitions = asyncio.run(run())
+    assert transitions == [
+        (T0 + 300, False),
+        (T0 + 200, True),
+        (T0 + 100, False),
+        (T0, True),
+    ]
+
+
+def test_timeline_drops_a_pending_repeat_of_the_stored_state(tmp_path):
+    async def run():
+        store = UptimeStore(str(tmp_path / "uptime.sqlite3"), delay=1000)
+        store.record("svc", True, T0)
+        store.flush_sync()
+        # A new run starts with the state the last one ended in.
+        restarted = UptimeStore(store.path, delay=1000)
+        restarted.record("svc", True, T0 + 50)
+        restarted.record("svc", False, T0 + 60)
+        return await restarted.timeline("svc")
+
+    _, transitions = asyncio.run(run())
+    assert transitions == [(T0 + 60, False), (T0, True)]
+
+
+def test_a_steady_service_is_saved_without_further_checks(tmp_path):
+    path = str(tmp_path / "uptime.sqlite3")
+
+    async def run():
+        store = UptimeStore(path, delay=0.05)
+        # One check, and nothing since: a process that stays up.
+        store.record("svc", True)
+        await asyncio.sleep(0.5)
+        return store
+
+    store = asyncio.run(run())
+    with sqlite3.connect(path) as db:
+        (known,) = db.execute(
+            "SELECT TOTAL(known_seconds) FROM rollups WHERE service = 'svc' AND span = ?",
+            (HOUR,),
+        ).fetchone()
+        transitions = db.execute("SELECT up FROM transitions WHERE service = 'svc'").fetchall()
+    # Saved well past the first flush, 0.05s in.
+    assert known >= 0.3
+    assert transitions == [(1,)]
+    assert store.state  # still monitored, so the next flush is already scheduled
+    assert store._flush_handle is not None
+
+
+def test_close_forgets_the_current_states(tmp_path):
+    async def run():
+        store = UptimeStore(str(tmp_path / "uptime.sqlite3"), delay=1000)
+        store.record("svc", True, T0)
+        store.close()
+        return store
+
+    store = asyncio.run(run())
+    assert store.state == {} and store._flush_handle is None
@@ -1,11 +1,347 @@
-import sys
 import asyncio
+import bisect
+import hashlib
+import heapq
+import json
+import os
+import re
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Callable
+
+from rich.color import Color, ColorParseError
+from rich.markup import escape
 from textual.message import Message
 from textual.widgets import Static
 
+from widgets.collector_client import get_collector_client
+from widgets.command_runner import get_command_runner
+from widgets.config import get_config
+from widgets.paths import cache_path, write_atomic
+from widgets.perf import PERF
+from widgets.scheduler import report_refresh, schedule_refresh
+
+GCALCLI_COMMAND = ["gcalcli", "--nocolor", "agenda", "--tsv"]
+
+# Seconds a gcalcli run's output is reused, and after which a run is killed.
+AGENDA_TTL = 60
+GCALCLI_TIMEOUT = 120
+
+# The last good agenda, under the cache directory. Sources other than the
+# default one each get a "calendar-<name>.json" of their own.
+CACHE_FILE = "calendar.json"
+
+# Marker colors of sources that don't set one, in config order.
+SOURCE_COLORS = ("cyan", "magenta", "green", "yellow", "blue", "red")
+
+
+@dataclass(frozen=True)
+class CalendarEvent:
+    """A single agenda entry."""
+
+    start: datetime
+    end: datetime
+    title: str
+    all_day: bool = False
+    source: str = ""  # the CalendarSource it came from
+
+    @property
+    def key(self) -> bytes:
+        """A hash identifying the event across calendars (e.g. a shared invite)."""
+        title = " ".join(self.title.casefold().split())
+        text = f"{self.start.isoformat()}\0{self.end.isoformat()}\0{title}"
+        return hashlib.blake2b(text.encode(), digest_size=8).digest()
+
+    def to_json(self) -> dict:
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "title": self.title,
+            "all_day": self.all_day,
+            "source": self.source,
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "CalendarEvent":
+        return cls(
+            start=datetime.fromisoformat(data["start"]),
+            end=datetime.fromisoformat(data["end"]),
+            title=data["title"],
+            all_day=data.get("all_day", False),
+            source=data.get("source", ""),
+        )
+
+
+@dataclass(frozen=True)
+class CalendarSource:
+    """One gcalcli account: an entry of the `[[calendars]]` config list."""
+
+    name: str
+    argv: tuple[str, ...]
+    color: str = "cyan"  # a Rich color; "" for none
+    timeout: float = GCALCLI_TIMEOUT
+
+    @classmethod
+    def from_config(cls, entry: dict, default_color: str = "cyan") -> "CalendarSource":
+        name = str(entry.get("name") or "").strip()
+        if not name:
+            raise ValueError(f"calendar entry has no name: {entry}")
+        options = []
+        if entry.get("config_folder"):
+            options += ["--config-folder", os.path.expanduser(str(entry["config_folder"]))]
+        options += [str(arg) for arg in entry.get("args", ())]
+        return cls(
+            name=name,
+            argv=(GCALCLI_COMMAND[0], *options, *GCALCLI_COMMAND[1:]),
+            color=str(entry.get("color") or default_color),
+            timeout=float(entry.get("timeout", GCALCLI_TIMEOUT)),
+        )
+
+    @property
+    def cache_file(self) -> str:
+        if self.name == DEFAULT_SOURCE.name:
+            return CACHE_FILE
+        safe_name = re.sub(r"[^\w.-]", "_", self.name)
+        return f"calendar-{safe_name}.json"
+
+
+# What the calendar showed before sources were configurable: gcalcli's own config.
+DEFAULT_SOURCE = CalendarSource("default", tuple(GCALCLI_COMMAND))
+
+
+def load_calendar_sources(config: dict | None = None) -> tuple[list[CalendarSource], list[str]]:
+    """Parse `[[calendars]]` from the config; returns (sources, errors)."""
+    entries = (config if config is not None else get_config()).get("calendars")
+    if not entries:
+        return [DEFAULT_SOURCE], []
+    # Sources without a color take the palette's next one not set explicitly.
+    taken = {entry.get("color") for entry in entries if isinstance(entry, dict)}
+    palette = [color for color in SOURCE_COLORS if color not in taken] or list(SOURCE_COLORS)
+    sources, errors, names = [], [], set()
+    for entry in entries:
+        try:
+            default_color = palette[len(sources) % len(palette)]
+            source = CalendarSource.from_config(entry, default_color)
+        except (TypeError, ValueError) as e:
+            errors.append(str(e))
+            continue
+        if source.name in names:
+            errors.append(f"duplicate calendar name: {source.name}")
+            continue
+        try:
+            Color.parse(source.color)  # it goes into markup
+        except ColorParseError:
+            errors.append(f"calendar {source.name}: unknown color {source.color!r}")
+            source = replace(source, color="")
+        names.add(source.name)
+        sources.append(source)
+    return sources or [DEFAULT_SOURCE], errors
+
+
+def parse_tsv_agenda(text: str, source: str = "") -> list[CalendarEvent]:
+    """Parse `gcalcli agenda --tsv` output into events, sorted by start time.
+
+    Columns are start_date, start_time, end_date, end_time, title, followed
+    by any `--details` columns. Newer gcalcli versions print a header row.
+    """
+    events = []
+    for line in text.splitlines():
+        fields = line.split("\t")
+        if len(fields) < 5 or fields[0] == "start_date":
+            continue
+        start_date, start_time, end_date, end_time, title = fields[:5]
+        all_day = not start_time
+        try:
+            start = datetime.fromisoformat(f"{start_date} {start_time or '00:00'}")
+            end = datetime.fromisoformat(f"{end_date} {end_time or '00:00'}")
+        except ValueError:
+            continue
+        events.append(CalendarEvent(start, end, title.strip(), all_day, source))
+    events.sort(key=lambda event: (event.start, event.title))
+    return events
+
+
+async def fetch_agenda(
+    source: CalendarSource = DEFAULT_SOURCE,
+) -> tuple[list[CalendarEvent] | None, str | None]:
+    """Run gcalcli for one source; returns (events, None) or (None, error markup).
+
+    Goes through the shared CommandRunner, so the pane and a collector in
+    the same process share one gcalcli run, and a run less than
+    AGENDA_TTL seconds old is reused.
+    """
+    result = await get_command_runner().run(source.argv, ttl=AGENDA_TTL, timeout=source.timeout)
+    if result.error == "not found":
+        return None, "[red]Error: `gcalcli` not found.\n\nPlease run `pip install gcalcli`.[/]"
+    if result.error is not None:
+        return None, f"[red]Error: `gcalcli` {escape(result.error)}.[/]"
+
+    error_message = result.stderr
+    if result.ok:
+        return parse_tsv_agenda(result.stdout, source.name), None
+    # FIX: Add specific check for ModuleNotFoundError from gcalcli
+    if "ModuleNotFoundError" in error_message and "pydantic" in error_message:
+        return None, (
+            "[red]Error: `gcalcli` is missing a dependency.[/]\n\n"
+            "Please run the following command in your terminal:\n"
+            "[bold yellow]pip install --upgrade --force-reinstall gcalcli[/]"
+        )
+    return None, f"[red]Error:\n{escape(error_message)}[/]"
+
+
+def load_agenda_cache(
+    source: CalendarSource = DEFAULT_SOURCE,
+) -> tuple[list[CalendarEvent], datetime] | None:
+    """A source's last good agenda and when it was fetched, if one is cached."""
+    try:
+        with open(cache_path(source.cache_file), encoding="utf-8") as f:
+            data = json.load(f)
+        events = [CalendarEvent.from_json(entry) for entry in data["events"]]
+        return events, datetime.fromisoformat(data["fetched_at"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def save_agenda_cache(
+    events: list[CalendarEvent], fetched_at: datetime, source: CalendarSource = DEFAULT_SOURCE
+) -> None:
+    data = {
+        "fetched_at": fetched_at.isoformat(),
+        "events": [event.to_json() for event in events],
+    }
+    write_atomic(cache_path(source.cache_file), json.dumps(data))
+
+
+def merge_agendas(agendas: list[list[CalendarEvent]]) -> list[CalendarEvent]:
+    """Merge sorted agendas into one, keeping the first copy of each event.
+
+    Agendas are given in source order, so an event in several calendars
+    is shown as part of the first.
+    """
+    merged, seen = [], set()
+    for event in heapq.merge(*agendas, key=lambda event: (event.start, event.title)):
+        key = event.key
+        if key not in seen:
+            seen.add(key)
+            merged.append(event)
+    return merged
+
+
+@dataclass
+class SourceState:
+    """The latest result of one calendar source."""
+
+    events: list[CalendarEvent] = field(default_factory=list)
+    fetched_at: datetime | None = None  # of the last good result
+    error: str | None = None  # of the last attempt
+
+
+class Agenda:
+    """Several calendar sources, fetched concurrently and merged.
+
+    `fetch()` runs at most `concurrency` gcalcli processes at a time, each
+    with its source's own timeout, and calls back as each one finishes, so
+    a slow or failing calendar never holds up showing the others. Every
+    source keeps its own last good result, cached on disk separately.
+    """
+
+    def __init__(self, sources: list[CalendarSource], concurrency: int = 4) -> None:
+        self.sources = sources
+        self.states = {source.name: SourceState() for source in sources}
+        self.events: list[CalendarEvent] = []
+        self._slots = asyncio.Semaphore(max(int(concurrency), 1))
+
+    @property
+    def fetched_at(self) -> datetime | None:
+        """When the newest result arrived; None until any source has one."""
+        times = [state.fetched_at for state in self.states.values() if state.fetched_at]
+        return max(times) if times else None
+
+    @property
+    def ok(self) -> bool:
+        return not any(state.error for state in self.states.values())
+
+    def color(self, name: str) -> str:
+        return next((source.color for source in self.sources if source.name == name), "")
+
+    def load_cache(self) -> None:
+        """Read every source's last good agenda from disk. Blocking, but small."""
+        for source in self.sources:
+            cached = load_agenda_cache(source)
+            if cached is not None:
+                state = self.states[source.name]
+                state.events, state.fetched_at = cached
+        self._merge()
+
+    async def fetch(self, on_update: Callable[[str], None] | None = None) -> None:
+        """Fetch every source; `on_update(name)` runs as each one finishes."""
+        await asyncio.gather(*(self._fetch(source, on_update) for source in self.sources))
+
+    async def _fetch(self, source: CalendarSource, on_update) -> None:
+        async with self._slots:
+            events, error = await fetch_agenda(source)
+        state = self.states[source.name]
+        state.error = error
+        if events is not None:
+            state.events, state.fetched_at = events, datetime.now()
+            await asyncio.to_thread(save_agenda_cache, events, state.fetched_at, source)
+        self._merge()
+        if on_update is not None:
+            on_update(source.name)
+
+    def _merge(self) -> None:
+        self.events = merge_agendas([self.states[source.name].events for source in self.sources])
+
+    # --- Collector ---
+
+    def to_json(self) -> list[dict]:
+        data = []
+        for source in self.sources:
+            state = self.states[source.name]
+            data.append(
+                {
+                    "name": source.name,
+                    "color": source.color,
+                    "fetched_at": state.fetched_at.isoformat() if state.fetched_at else None,
+                    "events": [event.to_json() for event in state.events],
+                    "error": state.error,
+                }
+            )
+        return data
+
+    def apply_json(self, data: list[dict]) -> None:
+        """Take over the sources and results sent by a collector."""
+        self.sources = [CalendarSource(entry["name"], (), entry["color"]) for entry in data]
+        self.states = {
+            entry["name"]: SourceState(
+                [CalendarEvent.from_json(event) for event in entry["events"]],
+                datetime.fromisoformat(entry["fetched_at"]) if entry["fetched_at"] else None,
+                entry["error"],
+            )
+            for entry in data
+        }
+        self._merge()
+
+
+def format_countdown(delta: timedelta) -> str:
+    minutes = max(int(delta.total_seconds() // 60), 0)
+    if minutes < 60:
+        return f"{minutes} min"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}h {minutes:02d}m"
+    return f"{hours // 24}d {hours % 24}h"
+
 
 class CalendarPane(Static):
-    """A widget to display the gcalcli agenda."""
+    """A widget to display the gcalcli agenda of one or more calendars.
+
+    Each `[[calendars]]` source is fetched on its own and the agenda is
+    redrawn as each arrives. The last good agenda of every source is
+    cached on disk, so the pane renders instantly at startup and keeps
+    showing a source (marked as stale) if its refresh fails. When a
+    collector is running, it runs gcalcli and pushes the agenda here.
+    """
 
     class UpdateCalendar(Message):
         """A message to update the calendar content."""
@@ -14,41 +350,140 @@ class CalendarPane(Static):
             self.content = content
             super().__init__()
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        sources, self.config_errors = load_calendar_sources()
+        self.agenda = Agenda(sources, get_config().get("calendars_concurrency", 4))
+        self.events: list[CalendarEvent] = []
+        self._starts: list[datetime] = []
+        self.collector = get_collector_client()
+
+    @property
+    def fetched_at(self) -> datetime | None:
+        return self.agenda.fetched_at
+
     def on_mount(self) -> None:
-        self.update_calendar()
-        self.set_interval(1800, self.update_calendar)
+        self.load_cache()
+        self.render_agenda()
+        if self.collector is not None:
+            self.collector.subscribe("agenda", self.apply_collected)
+        else:
+            # Revalidate once the first frame (with the cached agenda) is up.
+            self.call_after_refresh(self.update_calendar)
+            schedule_refresh(self, "calendar", self.update_calendar, 1800)
+        # Countdown ticks come from the in-memory events, not gcalcli.
+        schedule_refresh(
+            self, "calendar-countdown", self.render_agenda, 30, pause_when_hidden=True
+        )
+
+    def on_unmount(self) -> None:
+        if self.collector is not None:
+            self.collector.unsubscribe("agenda", self.apply_collected)
 
     def update_calendar(self) -> None:
         self.run_worker(self.fetch_gcal_data, exclusive=True)
 
+    # --- Data ---
+
+    def show_merged(self) -> None:
+        """Take the agenda's merged events, after any source changed."""
+        self.events = self.agenda.events
+        self._starts = [event.start for event in self.events]
+
+    def load_cache(self) -> None:
+        """Show the last good agendas from disk while gcalcli revalidates them."""
+        self.agenda.load_cache()
+        self.show_merged()
+
+    def apply_collected(self, message: dict) -> None:
+        """Show an agenda pushed by the collector."""
+        self.agenda.apply_json(message["d"])
+        self.show_merged()
+        self.render_agenda()
+
+    def next_event(self, now: datetime) -> CalendarEvent | None:
+        """The first timed event that hasn't started yet."""
+        index = bisect.bisect_right(self._starts, now)
+        for event in self.events[index:]:
+            if not event.all_day:
+                return event
+        return None
+
+    def current_event(self, now: datetime) -> CalendarEvent | None:
+        index = bisect.bisect_right(self._starts, now)
+        for event in reversed(self.events[:index]):
+            if not event.all_day and event.end > now:
+                return event
+        return None
+
+    @PERF.timed("worker fetch_gcal_data")
     async def fetch_gcal_data(self) -> None:
-        try:
-            process = await asyncio.create_subprocess_shell(
-                "gcalcli --nocolor agenda",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await process.communicate()
-
-            error_message = stderr.decode()
-            if process.returncode == 0:
-                self.post_message(self.UpdateCalendar(stdout.decode()))
-            # FIX: Add specific check for ModuleNotFoundError from gcalcli
-            elif "ModuleNotFoundError" in error_message and "pydantic" in error_message:
-                friendly_error = (
-                    "[red]Error: `gcalcli` is missing a dependency.[/]\n\n"
-                    "Please run the following command in your terminal:\n"
-                    "[bold yellow]pip install --upgrade --force-reinstall gcalcli[/]"
-                )
-                self.post_message(self.UpdateCalendar(friendly_error))
+        await self.agenda.fetch(self.on_source_fetched)
+        report_refresh(self, "calendar", self.agenda.ok)
+
+    def on_source_fetched(self, name: str) -> None:
+        self.show_merged()
+        self.render_agenda()
+
+    # --- Rendering ---
+
+    def render_agenda(self) -> None:
+        now = datetime.now()
+        lines = [f"[red]{escape(error)}[/]" for error in self.config_errors]
+        sources = self.agenda.sources
+        states = self.agenda.states
+        several = len(sources) > 1
+
+        if self.fetched_at is None:
+            errors = [states[source.name].error for source in sources]
+            if all(errors):
+                self.post_message(self.UpdateCalendar("\n\n".join(lines + errors)))
             else:
-                self.post_message(
-                    self.UpdateCalendar(f"[red]Error:\n{error_message}[/]")
-                )
+                self.post_message(self.UpdateCalendar("⏳ Fetching agenda..."))
+            return
+        for source in sources:
+            state = states[source.name]
+            if not state.error:
+                continue
+            label = f"{escape(source.name)}: " if several else ""
+            if state.fetched_at is not None:
+                status = f"Stale: last updated {state.fetched_at:%a %H:%M}"
+            else:
+                status = "No data yet"
+            lines.append(f"[yellow]⚠ {label}{status}[/]\n[dim]{state.error}[/]\n")
+
+        current = self.current_event(now)
+        upcoming = self.next_event(now)
+        if current is not None:
+            lines.append(
+                f"[b green]Now:[/] {escape(current.title)} "
+                f"[dim](ends in {format_countdown(current.end - now)})[/]"
+            )
+        if upcoming is not None:
+            lines.append(
+                f"[b]Next:[/] {escape(upcoming.title)} "
+                f"in [b cyan]{format_countdown(upcoming.start - now)}[/]"
+            )
+
+        # With several calendars, a colored bar shows which one an event is from.
+        markers = {
+            source.name: (f"[{source.color}]▍[/]" if source.color else "▍") if several else ""
+            for source in sources
+        }
+        day = None
+        for event in self.events:
+            if event.end <= now:
+                continue
+            if event.start.date() != day:
+                day = event.start.date()
+                lines.append(f"\n[b u]{event.start:%a %b %d}[/]")
+            when = "all day" if event.all_day else f"{event.start:%H:%M}"
+            marker = markers.get(event.source, "")
+            lines.append(f"  [dim]{when:>7}[/]  {marker}{escape(event.title)}")
 
-        except FileNotFoundError:
-            msg = "[red]Error: `gcalcli` not found.\n\nPlease run `pip install gcalcli`.[/]"
-            self.post_message(self.UpdateCalendar(msg))
+        if not self.events:
+            lines.append("[dim]No upcoming events.[/]")
+        self.post_message(self.UpdateCalendar("\n".join(lines)))
 
     def on_calendar_pane_update_calendar(self, message: UpdateCalendar) -> None:
         self.update(message.content)
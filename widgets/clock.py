@@ -1,13 +1,15 @@
 from datetime import datetime
 from textual.widgets import Static
 
+from widgets.scheduler import schedule_refresh
+
 
 class Clock(Static):
     """A widget to display the current date and time."""
 
     def on_mount(self) -> None:
-        """Event handler that starts a timer to update the time every second."""
-        self.set_interval(1, self.update_time)
+        """Event handler that asks the scheduler to update the time every second."""
+        schedule_refresh(self, "clock", self.update_time, 1, pause_when_hidden=True)
         self.update_time()
 
     def update_time(self) -> None:
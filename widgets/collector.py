@@ -0,0 +1,524 @@
+"""The shared collector daemon.
+
+    python main.py --collector
+
+One collector owns every data source (gcalcli, the taskbook file, mounts,
+system metrics, the process table and service probes) and keeps their
+latest state. Dashboards started while it is running connect to its unix
+socket and are pushed changes instead of polling everything themselves;
+see widgets/collector_client.py for the client side and the protocol.
+"""
+
+import asyncio
+import contextlib
+import functools
+import json
+import os
+import signal
+import sys
+import time
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from typing import Callable
+
+from widgets.calendar import Agenda, load_calendar_sources
+from widgets.collector_client import (
+    LINE_LIMIT,
+    connect_socket,
+    encode,
+    request_snapshot,
+    socket_path,
+)
+from widgets.config import get_config
+from widgets.disk_usage import DiskUsageEngine, MountUsage
+from widgets.network import get_network_sampler
+from widgets.process_table import ProcessInfo, ProcessSampler
+from widgets.process_watcher import get_process_watcher
+from widgets.services import ProbeResult, ServiceProber, load_services
+from widgets.system_metrics import get_system_sampler
+from widgets.taskbook_store import TaskbookStore
+from widgets.uptime_store import get_uptime_store
+
+# Bytes a client may fall behind by before it is dropped (it reconnects and
+# gets full data), so one stalled dashboard can't grow the collector's memory.
+MAX_BACKLOG = 16 * 1024 * 1024
+
+
+def _interval(name: str, default: float) -> float:
+    """A source's interval, overridable in the `[refresh]` config table."""
+    value = get_config().get("refresh", {}).get(name, default)
+    return float(value) if isinstance(value, (int, float)) else default
+
+
+class Source(ABC):
+    """One data source owned by the collector.
+
+    `collect()` takes a sample and returns what to send to subscribers:
+    `{"d": full data}`, `{"p": change since the last sample}`, or None if
+    nothing changed. New subscribers are first sent `full()`.
+    """
+
+    name = ""
+    # Sampled only while a client is subscribed, instead of all the time.
+    on_demand = False
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.version = 0
+        # Set to collect before the interval is up.
+        self.wake = asyncio.Event()
+        # Set by the collector: sends a body to subscribers straight away,
+        # for sources that have news before `collect()` returns.
+        self.publish: Callable[[dict], None] | None = None
+
+    def start(self) -> None:
+        """Called once, on the event loop, before the first `collect()`."""
+
+    @abstractmethod
+    async def collect(self) -> dict | None:
+        """Take a sample; what to send subscribers, if anything changed."""
+
+    @abstractmethod
+    def full(self) -> object:
+        """All of the source's current data, compactly."""
+
+    def describe(self) -> object:
+        """The data with named fields, for `--dump`."""
+        return self.full()
+
+    def close(self) -> None:
+        pass
+
+
+class AgendaSource(Source):
+    """Every `[[calendars]]` source; each is pushed as soon as it arrives."""
+
+    name = "agenda"
+
+    def __init__(self) -> None:
+        super().__init__(_interval("calendar", 1800))
+        sources, _ = load_calendar_sources()
+        self.agenda = Agenda(sources, get_config().get("calendars_concurrency", 4))
+        # Dashboards started without the collector read the same caches.
+        self.agenda.load_cache()
+
+    async def collect(self) -> dict | None:
+        await self.agenda.fetch(self._fetched)
+        return None  # already published, one calendar at a time
+
+    def _fetched(self, name: str) -> None:
+        if self.publish is not None:
+            self.publish({"d": self.full()})
+
+    def full(self) -> list:
+        return self.agenda.to_json()
+
+
+class TaskbookSource(Source):
+    name = "taskbook"
+
+    def __init__(self) -> None:
+        super().__init__(_interval("taskbook", 2))
+        self.store = TaskbookStore()
+
+    async def collect(self) -> dict | None:
+        # A stat() unless the file changed.
+        if await asyncio.to_thread(self.store.refresh):
+            return {"d": self.full()}
+        return None
+
+    def full(self) -> dict:
+        return {
+            "error": self.store.error,
+            "items": [item.to_row() for item in self.store.items.values()],
+        }
+
+    def describe(self) -> dict:
+        return {
+            "error": self.store.error,
+            "items": [asdict(item) for item in self.store.items.values()],
+        }
+
+
+class DiskSource(Source):
+    name = "disk"
+    on_demand = True
+
+    def __init__(self) -> None:
+        super().__init__(_interval("disk", 5))
+        self.engine = DiskUsageEngine()
+        self.mounts: list[MountUsage] = []
+
+    async def collect(self) -> dict | None:
+        self.mounts = await asyncio.to_thread(self.engine.sample)
+        return {"d": self.full()}
+
+    def full(self) -> list:
+        return [mount.to_row() for mount in self.mounts]
+
+    def describe(self) -> list:
+        return [asdict(mount) for mount in self.mounts]
+
+    def close(self) -> None:
+        self.engine.close()
+
+
+class MetricsSource(Source):
+    """Always sampled, so clients opening the System tab get the history."""
+
+    name = "metrics"
+
+    def __init__(self) -> None:
+        self.sampler = get_system_sampler()
+        super().__init__(self.sampler.interval)
+
+    def start(self) -> None:
+        self.sampler.prime()
+
+    async def collect(self) -> dict | None:
+        return {"p": await asyncio.to_thread(self.sampler.sample)}
+
+    def full(self) -> dict:
+        return self.sampler.history()
+
+    def describe(self) -> dict:
+        return {name: self.sampler.snapshot(name, 0)[1] for name in self.sampler.names()}
+
+
+class NetworkSource(Source):
+    """Interface rates every interval; the socket table at its own, slower pace."""
+
+    name = "network"
+    on_demand = True
+
+    def __init__(self) -> None:
+        self.sampler = get_network_sampler()
+        super().__init__(self.sampler.interval)
+
+    async def collect(self) -> dict | None:
+        return {"p": await asyncio.to_thread(self.sampler.sample)}
+
+    def full(self) -> dict:
+        return self.sampler.full()
+
+    def describe(self) -> dict:
+        rates, totals = self.sampler.snapshot()
+        interfaces = {}
+        for nic, (rx_bytes, tx_bytes) in totals.items():
+            rx, tx = rates.get(nic, ([], []))
+            interfaces[nic] = {
+                "rx_rate": rx[-1] if rx else None,
+                "tx_rate": tx[-1] if tx else None,
+                "rx_bytes": rx_bytes,
+                "tx_bytes": tx_bytes,
+            }
+        return {
+            "interfaces": interfaces,
+            "sockets": self.sampler.sockets.to_json() if self.sampler.sockets else None,
+            "error": self.sampler.sockets_error,
+        }
+
+
+class ProcessesSource(Source):
+    """Sends only the processes that changed.
+
+    The sampler hands back the same ProcessInfo for a process that was
+    idle, so the change is found by identity rather than by comparing.
+    """
+
+    name = "processes"
+    on_demand = True
+
+    def __init__(self) -> None:
+        super().__init__(_interval("processes", 1))
+        self.sampler = ProcessSampler()
+        self.processes: dict[int, ProcessInfo] = {}
+
+    async def collect(self) -> dict | None:
+        processes = await asyncio.to_thread(self.sampler.sample)
+        changed = [
+            info.to_row()
+            for pid, info in processes.items()
+            if self.processes.get(pid) is not info
+        ]
+        removed = [pid for pid in self.processes if pid not in processes]
+        self.processes = processes
+        if changed or removed:
+            return {"p": {"set": changed, "del": removed}}
+        return None
+
+    def full(self) -> list:
+        return [info.to_row() for info in self.processes.values()]
+
+    def describe(self) -> list:
+        return [asdict(info) for info in self.processes.values()]
+
+
+class ServicesSource(Source):
+    """Network probes every interval; process probes whenever one changes.
+
+    Always polled, like metrics, so the uptime history has no gaps while
+    the collector runs.
+    """
+
+    name = "services"
+    on_demand = False
+
+    def __init__(self, record_uptime: bool = True) -> None:
+        super().__init__(_interval("services", 10))
+        self.specs, _ = load_services()
+        self.prober = ServiceProber(self.specs, get_config().get("services_concurrency", 8))
+        self.watcher = get_process_watcher()
+        self.results: dict[str, ProbeResult] = {}
+        # The collector keeps the uptime history while it runs; a one-off
+        # `--dump` only looks.
+        self.uptime = get_uptime_store() if record_uptime else None
+        self._probe_due = 0.0
+
+    def start(self) -> None:
+        for spec in self.specs:
+            if spec.kind == "process":
+                self.watcher.watch(spec.target)
+        loop = asyncio.get_running_loop()
+        # Called on the watcher's thread.
+        self.watcher.subscribe(lambda name, running: loop.call_soon_threadsafe(self.wake.set))
+        self.watcher.refresh()
+        self.watcher.start()
+
+    async def collect(self) -> dict | None:
+        results = dict(self.results)
+        for spec in self.specs:
+            if spec.kind == "process":
+                running = self.watcher.is_running(spec.target)
+                results[spec.name] = ProbeResult(
+                    spec.name, running, None, "" if running else "not running"
+                )
+        # Woken early by the watcher: only the process rows can have changed.
+        if time.monotonic() >= self._probe_due:
+            self._probe_due = time.monotonic() + self.interval
+            for result in await self.prober.probe_all():
+                results[result.name] = result
+        if self.uptime is not None:
+            for result in results.values():
+                self.uptime.record(result.name, result.ok)
+        if results == self.results:
+            return None
+        self.results = results
+        return {"d": self.full()}
+
+    def full(self) -> list:
+        return [result.to_row() for result in self.results.values()]
+
+    def describe(self) -> list:
+        return [asdict(result) for result in self.results.values()]
+
+    def close(self) -> None:
+        self.prober.close()
+        self.watcher.stop()
+        if self.uptime is not None:
+            self.uptime.close()
+
+
+def default_sources(
+    record_uptime: bool = True, names: list[str] | None = None
+) -> list[Source]:
+    """Every source, or only those in `names`; the rest aren't even created."""
+    factories: dict[str, Callable[[], Source]] = {
+        "agenda": AgendaSource,
+        "taskbook": TaskbookSource,
+        "disk": DiskSource,
+        "metrics": MetricsSource,
+        "network": NetworkSource,
+        "processes": ProcessesSource,
+        "services": functools.partial(ServicesSource, record_uptime),
+    }
+    return [
+        factory() for name, factory in factories.items() if names is None or name in names
+    ]
+
+
+class Collector:
+    """Polls every source on its own interval and serves the results.
+
+    Clients send one JSON line per request: `{"op": "subscribe" |
+    "unsubscribe" | "snapshot", "sources": [...]}` (all sources if omitted).
+    Subscribers get each source's full data, then every change as it is
+    collected; a snapshot is answered with one JSON document of every
+    source's data, with named fields, and the connection is closed.
+    """
+
+    def __init__(self, sources: list[Source] | None = None, path: str | None = None) -> None:
+        self.sources = {
+            source.name: source
+            for source in (sources if sources is not None else default_sources())
+        }
+        self.path = path or socket_path()
+        # client -> names of the sources it is subscribed to
+        self._clients: dict[asyncio.StreamWriter, set[str]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._started: set[str] = set()
+
+    async def serve(self) -> None:
+        """Listen on the socket until cancelled."""
+        existing = connect_socket(self.path)
+        if existing is not None:
+            existing.close()
+            raise RuntimeError(f"a collector is already listening on {self.path}")
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.path)  # left behind by a collector that crashed
+        server = await asyncio.start_unix_server(self._handle, self.path, limit=LINE_LIMIT)
+        os.chmod(self.path, 0o600)
+        print(f"collector: listening on {self.path}", file=sys.stderr)
+        with contextlib.suppress(NotImplementedError):
+            # Stop cleanly (removing the socket) when a service manager stops us.
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, asyncio.current_task().cancel
+            )
+        for source in self.sources.values():
+            if not source.on_demand:
+                self._poll_in_background(source)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.close()
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+
+    async def snapshot(self, names: list[str] | None = None) -> dict:
+        """Every source's data; sources that aren't being polled are collected once."""
+        snapshot = {}
+        for name in names or self.sources:
+            source = self.sources[name]
+            if name not in self._tasks:
+                self._start(source)
+                await source.collect()
+            snapshot[name] = source.describe()
+        return snapshot
+
+    def close(self) -> None:
+        for task in self._tasks.values():
+            task.cancel()
+        for source in self.sources.values():
+            source.close()
+
+    # --- Internals ---
+
+    def _start(self, source: Source) -> None:
+        if source.name not in self._started:
+            self._started.add(source.name)
+            source.publish = functools.partial(self._publish, source)
+            source.start()
+
+    def _poll_in_background(self, source: Source) -> None:
+        task = self._tasks.get(source.name)
+        if task is None or task.done():
+            self._tasks[source.name] = asyncio.get_running_loop().create_task(
+                self._poll(source)
+            )
+
+    def _wanted(self, source: Source) -> bool:
+        return not source.on_demand or any(
+            source.name in names for names in self._clients.values()
+        )
+
+    async def _poll(self, source: Source) -> None:
+        self._start(source)
+        errors = 0
+        while self._wanted(source):
+            source.wake.clear()
+            try:
+                body = await source.collect()
+                errors = 0
+            except Exception as e:  # one broken source mustn't stop the others
+                print(f"collector: {source.name}: {e!r}", file=sys.stderr)
+                body = None
+                errors += 1
+            if body is not None:
+                self._publish(source, body)
+            # Failing sources back off exponentially.
+            delay = source.interval * min(2**errors, 64)
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(source.wake.wait(), delay)
+        del self._tasks[source.name]
+
+    def _publish(self, source: Source, body: dict) -> None:
+        source.version += 1
+        line = encode({"s": source.name, "v": source.version, **body})
+        for writer, names in list(self._clients.items()):
+            if source.name in names:
+                self._write(writer, line)
+
+    def _write(self, writer: asyncio.StreamWriter, line: bytes) -> None:
+        if writer.transport.get_write_buffer_size() > MAX_BACKLOG:
+            writer.close()  # _handle forgets it once its read fails
+            self._clients.pop(writer, None)
+            return
+        writer.write(line)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._clients[writer] = set()
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                names = [
+                    name for name in request.get("sources") or self.sources
+                    if name in self.sources
+                ]
+                op = request.get("op")
+                if op == "snapshot":
+                    writer.write(encode(await self.snapshot(names)))
+                    await writer.drain()
+                    break
+                subscribed = self._clients.get(writer)
+                if subscribed is None:
+                    break  # dropped for falling behind
+                if op == "subscribe":
+                    for name in names:
+                        source = self.sources[name]
+                        subscribed.add(name)
+                        self._write(
+                            writer, encode({"s": name, "v": source.version, "d": source.full()})
+                        )
+                        self._poll_in_background(source)
+                elif op == "unsubscribe":
+                    subscribed.difference_update(names)
+        except (OSError, ValueError):
+            pass  # the client went away, or sent garbage
+        finally:
+            self._clients.pop(writer, None)
+            writer.close()
+
+
+def run_collector(path: str | None = None) -> int:
+    """Run the collector daemon in the foreground until interrupted."""
+    collector = Collector(path=path)
+    try:
+        asyncio.run(collector.serve())
+    except RuntimeError as e:
+        print(f"collector: {e}", file=sys.stderr)
+        return 1
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    return 0
+
+
+def dump(names: list[str] | None = None) -> dict:
+    """The current snapshot, from the collector if one is running.
+
+    Without one, the requested sources (and only those) are created and
+    collected once in-process.
+    """
+    names = names or None
+    snapshot = request_snapshot(sources=names)
+    if snapshot is not None:
+        return snapshot
+
+    async def collect_once() -> dict:
+        collector = Collector(default_sources(record_uptime=False, names=names))
+        try:
+            return await collector.snapshot(names)
+        finally:
+            collector.close()
+
+    return asyncio.run(collect_once())
@@ -0,0 +1,167 @@
+import asyncio
+import json
+import socket
+from typing import Callable
+
+from widgets.config import get_config
+from widgets.paths import runtime_path
+
+# Every source the collector serves, in `--dump` order.
+SOURCES = ("agenda", "taskbook", "disk", "metrics", "network", "processes", "services")
+
+# Seconds between attempts to reach a collector that went away.
+RECONNECT_DELAY = 5.0
+
+# Longest protocol line; a full process list or an hour of metrics fits easily.
+LINE_LIMIT = 64 * 1024 * 1024
+
+
+def socket_path() -> str:
+    """The collector's socket: `[collector] socket` in the config, or the runtime dir."""
+    return get_config().get("collector", {}).get("socket") or runtime_path("collector.sock")
+
+
+def encode(message: dict) -> bytes:
+    """One protocol message: a line of compact JSON."""
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def connect_socket(path: str) -> socket.socket | None:
+    """A socket connected to the collector at `path`, or None if none is listening."""
+    if not hasattr(socket, "AF_UNIX"):
+        return None  # e.g. Windows: always collect in-process
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(1.0)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request_snapshot(path: str | None = None, sources: list[str] | None = None) -> dict | None:
+    """Ask a running collector for its snapshot; None if none is reachable."""
+    sock = connect_socket(path or socket_path())
+    if sock is None:
+        return None
+    with sock:
+        sock.settimeout(30)
+        sock.sendall(encode({"op": "snapshot", "sources": sources}))
+        chunks = []
+        while chunk := sock.recv(65536):
+            chunks.append(chunk)
+    return json.loads(b"".join(chunks))
+
+
+class CollectorClient:
+    """A dashboard's connection to the collector daemon (widgets/collector.py).
+
+    Widgets subscribe to a source with a callback, which is called on the
+    event loop with every message for it: `{"s": source, "v": version}`
+    plus either "d", the source's full data, or "p", a change to the data
+    seen so far. The first message after subscribing is always full. If the
+    collector goes away the client keeps trying to reconnect, and
+    re-subscribes (so callbacks get full data again) once it is back.
+    """
+
+    def __init__(self, sock: socket.socket, path: str) -> None:
+        self.path = path
+        self.connected = True
+        # Called with the new state when the connection is lost or regained.
+        self.on_state_change: Callable[[bool], None] | None = None
+        self._sock: socket.socket | None = sock
+        self._callbacks: dict[str, list[Callable[[dict], None]]] = {}
+        self._writer: asyncio.StreamWriter | None = None
+
+    @classmethod
+    def connect(cls, path: str | None = None) -> "CollectorClient | None":
+        """Connect if a collector is listening, else None. Doesn't wait either way."""
+        path = path or socket_path()
+        sock = connect_socket(path)
+        return cls(sock, path) if sock is not None else None
+
+    def subscribe(self, source: str, callback: Callable[[dict], None]) -> None:
+        self._callbacks.setdefault(source, []).append(callback)
+        # Sent now if connected, else with every other source on (re)connect.
+        self._send({"op": "subscribe", "sources": [source]})
+
+    def unsubscribe(self, source: str, callback: Callable[[dict], None]) -> None:
+        callbacks = self._callbacks.get(source, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks and self._callbacks.pop(source, None) is not None:
+            self._send({"op": "unsubscribe", "sources": [source]})
+
+    async def run(self) -> None:
+        """Read messages and hand them to subscribers, reconnecting as needed.
+
+        Run this as a worker for the lifetime of the app.
+        """
+        while True:
+            try:
+                if self._sock is not None:
+                    self._sock.setblocking(False)
+                    sock, self._sock = self._sock, None
+                    reader, writer = await asyncio.open_unix_connection(
+                        sock=sock, limit=LINE_LIMIT
+                    )
+                else:
+                    reader, writer = await asyncio.open_unix_connection(
+                        self.path, limit=LINE_LIMIT
+                    )
+            except OSError:
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+
+            self._writer = writer
+            self._set_connected(True)
+            if self._callbacks:
+                self._send({"op": "subscribe", "sources": list(self._callbacks)})
+            try:
+                while message := await self._read(reader):
+                    for callback in list(self._callbacks.get(message["s"], ())):
+                        callback(message)
+            finally:
+                self._writer = None
+                writer.close()
+            self._set_connected(False)
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._sock is not None:
+            self._sock.close()
+
+    @staticmethod
+    async def _read(reader: asyncio.StreamReader) -> dict | None:
+        """The next message, or None once the collector has gone away."""
+        try:
+            line = await reader.readline()
+            return json.loads(line) if line else None
+        except (OSError, ValueError):
+            return None  # the collector exited, or sent garbage
+
+    def _send(self, message: dict) -> None:
+        if self._writer is not None:
+            self._writer.write(encode(message))
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected != self.connected:
+            self.connected = connected
+            if self.on_state_change is not None:
+                self.on_state_change(connected)
+
+
+_client: CollectorClient | None = None
+
+
+def get_collector_client() -> CollectorClient | None:
+    """The app's connection to the collector, or None when collecting in-process."""
+    return _client
+
+
+def set_collector_client(client: CollectorClient | None) -> None:
+    global _client
+    _client = client
@@ -0,0 +1,134 @@
+import asyncio
+import time
+from dataclasses import dataclass
+
+from widgets.config import get_config
+from widgets.perf import PERF
+
+Argv = tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class CommandResult:
+    """The outcome of one external command."""
+
+    argv: Argv
+    returncode: int | None  # None if it never ran to completion
+    stdout: str = ""
+    stderr: str = ""
+    error: str | None = None  # "not found", "timed out after 30s", ...
+    finished_at: float = 0.0  # time.monotonic()
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0
+
+
+class CommandRunner:
+    """Runs every external command the dashboard needs, off the event loop.
+
+    Commands are argv tuples executed directly, never through a shell. At
+    most `max_processes` children run at once and each gets a timeout,
+    after which it is killed. Reads can be shared:
+
+    - concurrent `run()` calls for the same argv wait on one process
+      (single-flight) instead of each spawning their own;
+    - with a `ttl`, a successful result is reused for that many seconds,
+      until `invalidate()` drops it.
+
+    Writes pass `share=False`, so every call spawns its own process.
+    """
+
+    def __init__(self, max_processes: int = 4, timeout: float = 60.0) -> None:
+        self.timeout = timeout
+        self._slots = asyncio.Semaphore(max_processes)
+        self._cache: dict[Argv, tuple[CommandResult, float]] = {}  # argv -> (result, expiry)
+        self._in_flight: dict[Argv, asyncio.Task] = {}
+
+    async def run(
+        self,
+        argv: list[str] | Argv,
+        ttl: float = 0.0,
+        timeout: float | None = None,
+        share: bool = True,
+    ) -> CommandResult:
+        """Run `argv` (or reuse a shared run of it) and return the result."""
+        argv = tuple(argv)
+        if not share:
+            return await self._execute(argv, timeout)
+
+        cached = self._cache.get(argv)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        task = self._in_flight.get(argv)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._run_shared(argv, ttl, timeout))
+            self._in_flight[argv] = task
+        # shield(): a caller that gives up mustn't cancel everyone else's run.
+        return await asyncio.shield(task)
+
+    def invalidate(self, prefix: list[str] | Argv = ()) -> None:
+        """Forget cached results of every argv starting with `prefix` (all by default)."""
+        prefix = tuple(prefix)
+        for argv in [argv for argv in self._cache if argv[: len(prefix)] == prefix]:
+            del self._cache[argv]
+
+    # --- Internals ---
+
+    async def _run_shared(self, argv: Argv, ttl: float, timeout: float | None) -> CommandResult:
+        try:
+            result = await self._execute(argv, timeout)
+        finally:
+            del self._in_flight[argv]
+        if result.ok and ttl > 0:
+            self._cache[argv] = (result, time.monotonic() + ttl)
+        return result
+
+    async def _execute(self, argv: Argv, timeout: float | None) -> CommandResult:
+        timeout = self.timeout if timeout is None else timeout
+        async with self._slots:
+            with PERF.span(f"spawn {' '.join(argv[:2])}"):
+                return await self._spawn(argv, timeout)
+
+    @staticmethod
+    async def _spawn(argv: Argv, timeout: float) -> CommandResult:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+        except FileNotFoundError:
+            return CommandResult(argv, None, error="not found", finished_at=time.monotonic())
+        except OSError as e:
+            return CommandResult(argv, None, error=str(e), finished_at=time.monotonic())
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            process.kill()
+            await process.wait()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            return CommandResult(
+                argv, None, error=f"timed out after {timeout:g}s", finished_at=time.monotonic()
+            )
+        return CommandResult(
+            argv,
+            process.returncode,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace"),
+            finished_at=time.monotonic(),
+        )
+
+
+_runner: CommandRunner | None = None
+
+
+def get_command_runner() -> CommandRunner:
+    """Return the command runner shared by every pane (and the collector)."""
+    global _runner
+    if _runner is None:
+        options = get_config().get("commands", {})
+        _runner = CommandRunner(
+            max_processes=int(options.get("max_processes", 4)),
+            timeout=float(options.get("timeout", 60)),
+        )
+    return _runner
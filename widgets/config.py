@@ -0,0 +1,64 @@
+import os
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    tomllib = None
+
+
+def config_path() -> str:
+    """Path of the dashboard's config file, under $XDG_CONFIG_HOME/dashboard."""
+    base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.environ.get("DASHBOARD_CONFIG") or os.path.join(
+        base, "dashboard", "config.toml"
+    )
+
+
+def load_config(path: str | None = None) -> dict:
+    """Read the TOML config file. A missing or unreadable file means defaults."""
+    if tomllib is None:
+        return {}
+    try:
+        with open(path or config_path(), "rb") as f:
+            return tomllib.load(f)
+    except (OSError, tomllib.TOMLDecodeError):
+        return {}
+
+
+_config: dict | None = None
+
+
+def get_config() -> dict:
+    """Return the config shared by the whole app, loading it on first use."""
+    global _config
+    if _config is None:
+        _config = load_config()
+    return _config
+
+
+def reload_config() -> dict:
+    """Read the config file again and share the new settings.
+
+    Unlike `load_config`, a file that isn't valid TOML raises
+    (tomllib.TOMLDecodeError) and leaves the current config in place, so
+    a half-saved edit never resets everything to the defaults.
+    """
+    global _config
+    if tomllib is None:
+        return get_config()
+    try:
+        with open(config_path(), "rb") as f:
+            config = tomllib.load(f)
+    except OSError:
+        config = {}
+    _config = config
+    return config
+
+
+def config_signature() -> tuple[int, int] | None:
+    """The config file's (mtime, size), to tell cheaply whether it changed."""
+    try:
+        stat = os.stat(config_path())
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,296 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+
+from widgets.paths import cache_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dirs (
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    bytes INTEGER NOT NULL,
+    files INTEGER NOT NULL,
+    subdirs TEXT NOT NULL,
+    seen REAL NOT NULL,
+    PRIMARY KEY (dev, ino)
+)
+"""
+
+# Cache rows for directories not seen by any scan for this long are dropped.
+CACHE_MAX_AGE = 30 * 24 * 3600
+
+
+@dataclass(frozen=True)
+class DirListing:
+    """What a directory held directly, as of its mtime."""
+
+    mtime_ns: int
+    bytes: int  # disk usage of the files directly inside it
+    files: int
+    subdirs: tuple[str, ...]
+
+
+class DirSizeCache:
+    """Directory listings keyed by (device, inode), persisted to SQLite.
+
+    A directory's mtime changes whenever an entry is added, removed or
+    renamed in it, so while the mtime matches, its cached listing (the
+    size of its own files and the names of its subdirectories) is still
+    right and the directory needn't be listed again. Files rewritten in
+    place don't touch the mtime; a full rescan picks those up.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or cache_path("dirsizes.sqlite3")
+        self.listings: dict[tuple[int, int], DirListing] = {}
+        self.loaded = False
+        self._lock = threading.Lock()
+
+    def load(self) -> None:
+        """Read the whole cache into memory. Blocking.
+
+        Raises sqlite3.Error or OSError if it can't be read (corrupt,
+        locked); it then counts as loaded, but empty.
+        """
+        with self._lock:
+            if self.loaded:
+                return
+            try:
+                with sqlite3.connect(self.path) as db:
+                    db.execute(SCHEMA)
+                    rows = db.execute(
+                        "SELECT dev, ino, mtime_ns, bytes, files, subdirs FROM dirs"
+                    ).fetchall()
+                self.listings = {
+                    (dev, ino): DirListing(mtime_ns, size, files, tuple(json.loads(subdirs)))
+                    for dev, ino, mtime_ns, size, files, subdirs in rows
+                }
+            finally:
+                # Only now, so a worker that finds it loaded (without taking
+                # the lock) never scans against a half-loaded cache.
+                self.loaded = True
+
+    def save(self, listings: dict[tuple[int, int], DirListing]) -> None:
+        """Store one scan's listings in a single transaction. Blocking."""
+        now = time.time()
+        with self._lock:
+            self.listings.update(listings)
+            with sqlite3.connect(self.path) as db:
+                db.execute(SCHEMA)
+                db.executemany(
+                    "INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (dev, ino, l.mtime_ns, l.bytes, l.files, json.dumps(l.subdirs), now)
+                        for (dev, ino), l in listings.items()
+                    ],
+                )
+                db.execute("DELETE FROM dirs WHERE seen < ?", (now - CACHE_MAX_AGE,))
+
+
+@dataclass(eq=False)
+class DirNode:
+    """One directory of a scan; sizes include everything below it."""
+
+    path: str
+    parent: "DirNode | None" = None
+    bytes: int = 0  # so far; final once `done`
+    files: int = 0
+    children: list["DirNode"] = field(default_factory=list)
+    done: bool = False
+    error: str | None = None
+    # Own listing plus unfinished children; the node is done at zero.
+    _pending: int = field(default=1, repr=False)
+
+    @property
+    def name(self) -> str:
+        return os.path.basename(self.path) or self.path
+
+
+def _disk_usage(stat: os.stat_result) -> int:
+    blocks = getattr(stat, "st_blocks", None)
+    return blocks * 512 if blocks is not None else stat.st_size
+
+
+class _Scan:
+    """The state of one scan, shared by its workers."""
+
+    def __init__(self, root: DirNode, full: bool) -> None:
+        self.root = root
+        self.device: int | None = None  # set once the root is stat'd
+        self.full = full
+        self.jobs: queue.Queue = queue.Queue()
+        self.cancelled = threading.Event()
+        self.lock = threading.Lock()
+        self.seen: set[tuple[int, int]] = set()
+        self.listings: dict[tuple[int, int], DirListing] = {}
+        self.dirs = 0
+        self.cache_hits = 0
+        self.cache_error: str | None = None
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+
+class DirScanner:
+    """Sizes a directory tree with `os.scandir` on a pool of threads.
+
+    Each directory is a job on a shared queue: a worker lists it (or takes
+    its listing from the cache), adds its files to the node, and queues
+    its subdirectories. When a directory and everything below it are done,
+    its total is added to its parent, so the tree can be shown while the
+    scan is still running, with finished subtrees already exact.
+
+    Symlinks are never followed and directories on another device are
+    skipped, like `du -x`; a directory reached twice (e.g. through a bind
+    mount) is only counted once. The workers are daemon threads, so a scan
+    stuck on a dead network mount never holds up quitting.
+    """
+
+    def __init__(self, cache: DirSizeCache, workers: int = 8) -> None:
+        self.cache = cache
+        self.workers = workers
+        self._scan: _Scan | None = None
+
+    @property
+    def root(self) -> DirNode | None:
+        return self._scan.root if self._scan is not None else None
+
+    @property
+    def running(self) -> bool:
+        scan = self._scan
+        return scan is not None and not scan.root.done and not scan.cancelled.is_set()
+
+    def progress(self) -> tuple[int, int, float]:
+        """(directories scanned, of those taken from the cache, seconds so far)."""
+        scan = self._scan
+        if scan is None:
+            return 0, 0, 0.0
+        elapsed = scan.elapsed if scan.root.done else time.monotonic() - scan.started
+        return scan.dirs, scan.cache_hits, elapsed
+
+    @property
+    def cache_error(self) -> str | None:
+        """Why the current scan couldn't use or update the cache, if it couldn't."""
+        return self._scan.cache_error if self._scan is not None else None
+
+    def scan(self, path: str, full: bool = False) -> DirNode:
+        """Start scanning `path` in the background and return its node.
+
+        With `full`, every directory is listed again instead of trusting
+        the cache. Nothing here touches the filesystem, so a hung mount
+        can't block the caller; if `path` itself can't be read, the root
+        node finishes with an `error`.
+        """
+        self.cancel()
+        scan = self._scan = _Scan(DirNode(os.path.abspath(path)), full)
+        scan.jobs.put((scan.root, None))
+        for index in range(self.workers):
+            threading.Thread(
+                target=self._work, args=(scan,), name=f"dirscan-{index}", daemon=True
+            ).start()
+        return scan.root
+
+    def cancel(self) -> None:
+        if self._scan is not None:
+            self._scan.cancelled.set()
+            self._stop_workers(self._scan)
+
+    # --- Internals ---
+
+    def _work(self, scan: _Scan) -> None:
+        if not self.cache.loaded:
+            try:
+                self.cache.load()
+            except (sqlite3.Error, OSError) as e:
+                # Scan without it; every directory is listed.
+                scan.cache_error = f"can't read the cache: {e}"
+        while not scan.cancelled.is_set():
+            job = scan.jobs.get()
+            if job is None or scan.cancelled.is_set():
+                break
+            node, stat = job
+            try:
+                if stat is None:  # the root
+                    stat = os.lstat(node.path)
+                    scan.device = stat.st_dev
+                self._scan_dir(scan, node, stat)
+            except OSError as e:
+                node.error = e.strerror or str(e)
+            self._finish(scan, node)
+
+    def _scan_dir(self, scan: _Scan, node: DirNode, stat: os.stat_result) -> None:
+        key = (stat.st_dev, stat.st_ino)
+        with scan.lock:
+            if key in scan.seen:
+                return  # reached twice; count it once
+            scan.seen.add(key)
+            scan.dirs += 1
+
+        listing = self.cache.listings.get(key)
+        if listing is not None and listing.mtime_ns == stat.st_mtime_ns and not scan.full:
+            with scan.lock:
+                scan.cache_hits += 1
+        else:
+            listing = self._list(node.path, stat)
+        scan.listings[key] = listing
+
+        children = []
+        for name in listing.subdirs:
+            path = os.path.join(node.path, name)
+            try:
+                child_stat = os.lstat(path)
+            except OSError:
+                continue  # removed since it was cached or listed
+            if child_stat.st_dev == scan.device:
+                children.append((DirNode(path, node), child_stat))
+        with scan.lock:
+            node.bytes += listing.bytes + _disk_usage(stat)
+            node.files += listing.files
+            node._pending += len(children)
+            node.children.extend(child for child, _ in children)
+        for job in children:
+            scan.jobs.put(job)
+
+    @staticmethod
+    def _list(path: str, stat: os.stat_result) -> DirListing:
+        size = files = 0
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                    else:
+                        size += _disk_usage(entry.stat(follow_symlinks=False))
+                        files += 1
+                except OSError:
+                    pass  # vanished, or no permission
+        return DirListing(stat.st_mtime_ns, size, files, tuple(subdirs))
+
+    def _finish(self, scan: _Scan, node: DirNode | None) -> None:
+        """Mark one unit of `node`'s work done, rolling totals up as subtrees finish."""
+        with scan.lock:
+            while node is not None:
+                node._pending -= 1
+                if node._pending:
+                    return
+                node.done = True
+                if node.parent is not None:
+                    node.parent.bytes += node.bytes
+                    node.parent.files += node.files
+                node = node.parent
+            scan.elapsed = time.monotonic() - scan.started
+        # The whole tree is done: stop the workers and keep the listings.
+        self._stop_workers(scan)
+        try:
+            self.cache.save(scan.listings)
+        except (sqlite3.Error, OSError) as e:
+            scan.cache_error = scan.cache_error or f"can't update the cache: {e}"
+
+    def _stop_workers(self, scan: _Scan) -> None:
+        for _ in range(self.workers):
+            scan.jobs.put(None)
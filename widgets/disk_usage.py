@@ -0,0 +1,457 @@
+import asyncio
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, wait
+from dataclasses import astuple, dataclass
+
+import psutil
+from rich.markup import escape
+from rich.text import Text
+from textual.app import ComposeResult
+from textual.timer import Timer
+from textual.widgets import DataTable, Label, Static
+from textual.widgets.data_table import CellDoesNotExist
+
+from widgets.collector_client import get_collector_client
+from widgets.config import get_config
+from widgets.dir_scanner import DirNode, DirScanner, DirSizeCache
+from widgets.perf import PERF
+from widgets.scheduler import schedule_refresh
+
+
+@dataclass(frozen=True)
+class MountUsage:
+    """Usage and throughput of one mounted filesystem."""
+
+    mountpoint: str
+    device: str
+    fstype: str
+    total: int = 0
+    used: int = 0
+    free: int = 0
+    percent: float = 0.0
+    read_rate: float = 0.0
+    write_rate: float = 0.0
+    status: str = "ok"  # "ok", "timeout" or an error message
+
+    def to_row(self) -> list:
+        """The mount as a compact list of field values, for the collector."""
+        return list(astuple(self))
+
+
+class _StatPool:
+    """A small pool of daemon threads for `statvfs` calls.
+
+    concurrent.futures joins its (non-daemon) workers at interpreter exit,
+    so a statvfs stuck on a dead NFS server would also hang quitting the
+    dashboard. These threads are daemons and are simply abandoned instead.
+    """
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self._queue: queue.Queue = queue.Queue()
+        for index in range(workers):
+            threading.Thread(
+                target=self._work, name=f"statvfs-{index}", daemon=True
+            ).start()
+
+    def submit(self, fn, *args) -> Future:
+        future: Future = Future()
+        self._queue.put((future, fn, args))
+        return future
+
+    def close(self) -> None:
+        """Let the workers exit; one stuck in a call exits once it returns."""
+        for _ in range(self.workers):
+            self._queue.put(None)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            future, fn, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+def _io_key(device: str) -> str:
+    """Map a partition's device path to its disk_io_counters() key."""
+    return os.path.basename(os.path.realpath(device))
+
+
+class DiskUsageEngine:
+    """Samples mounted filesystems with psutil, without external binaries.
+
+    Every mount's usage is fetched on the stat pool, and a sample waits at
+    most `timeout` for all of them together; mounts still unanswered by
+    then are reported as timed out. A mount whose previous call is still
+    stuck is not queried again until that call returns, so one hung
+    network mount can never tie up more than one worker.
+    """
+
+    def __init__(self, timeout: float = 2.0, workers: int = 4) -> None:
+        self.timeout = timeout
+        self._pool = _StatPool(workers)
+        self._in_flight: dict[str, Future] = {}
+        self._last_io: dict[str, tuple[int, int]] = {}
+        self._last_time: float | None = None
+
+    def sample(self) -> list[MountUsage]:
+        """Collect one sample. Blocking; call it from a worker thread."""
+        partitions = psutil.disk_partitions(all=False)
+
+        futures: dict[str, Future] = {}
+        for part in partitions:
+            pending = self._in_flight.get(part.mountpoint)
+            if pending is not None and not pending.done():
+                futures[part.mountpoint] = pending
+                continue
+            future = self._pool.submit(psutil.disk_usage, part.mountpoint)
+            self._in_flight[part.mountpoint] = future
+            futures[part.mountpoint] = future
+        wait(futures.values(), timeout=self.timeout)
+
+        rates = self._io_rates()
+        results = []
+        for part in partitions:
+            future = futures[part.mountpoint]
+            read_rate, write_rate = rates.get(_io_key(part.device), (0.0, 0.0))
+            base = dict(
+                mountpoint=part.mountpoint,
+                device=part.device,
+                fstype=part.fstype,
+                read_rate=read_rate,
+                write_rate=write_rate,
+            )
+            if not future.done():
+                results.append(MountUsage(**base, status="timeout"))
+                continue
+            try:
+                usage = future.result()
+            except OSError as e:
+                results.append(MountUsage(**base, status=e.strerror or str(e)))
+                continue
+            results.append(
+                MountUsage(
+                    **base,
+                    total=usage.total,
+                    used=usage.used,
+                    free=usage.free,
+                    percent=usage.percent,
+                )
+            )
+        return results
+
+    def close(self) -> None:
+        """Stop the stat pool's threads; the engine can't sample afterwards."""
+        self._pool.close()
+
+    def _io_rates(self) -> dict[str, tuple[float, float]]:
+        """Per-device read/write bytes per second since the previous sample."""
+        now = time.monotonic()
+        try:
+            counters = psutil.disk_io_counters(perdisk=True) or {}
+        except (OSError, RuntimeError):
+            counters = {}
+        rates = {}
+        if self._last_time is not None:
+            elapsed = max(now - self._last_time, 1e-6)
+            for name, io in counters.items():
+                previous = self._last_io.get(name)
+                if previous is not None:
+                    rates[name] = (
+                        max(io.read_bytes - previous[0], 0) / elapsed,
+                        max(io.write_bytes - previous[1], 0) / elapsed,
+                    )
+        self._last_io = {
+            name: (io.read_bytes, io.write_bytes) for name, io in counters.items()
+        }
+        self._last_time = now
+        return rates
+
+
+def format_bytes(value: float) -> str:
+    for unit in ("B", "K", "M", "G", "T"):
+        if abs(value) < 1024 or unit == "T":
+            return f"{value:.1f}{unit}" if unit != "B" else f"{value:.0f}B"
+        value /= 1024
+    return f"{value:.1f}P"
+
+
+def usage_bar(percent: float, width: int = 10) -> Text:
+    filled = round(percent / 100 * width)
+    color = "green" if percent < 70 else "yellow" if percent < 90 else "red"
+    return Text.assemble(
+        ("█" * filled, color), ("░" * (width - filled), "dim"), f" {percent:5.1f}%"
+    )
+
+
+DIR_COLUMNS = ("Directory", "Size", "Share", "Files")
+
+# (column label, sort key)
+COLUMNS = (
+    ("Mount", lambda m: m.mountpoint),
+    ("Device", lambda m: m.device),
+    ("Type", lambda m: m.fstype),
+    ("Size", lambda m: m.total),
+    ("Used", lambda m: m.used),
+    ("Free", lambda m: m.free),
+    ("Use%", lambda m: m.percent),
+    ("Read/s", lambda m: m.read_rate),
+    ("Write/s", lambda m: m.write_rate),
+)
+
+
+# Most subdirectories listed at once in the "largest directories" view.
+MAX_DIR_ROWS = 100
+
+# Seconds between redraws of the directory view while a scan is running.
+SCAN_RENDER_INTERVAL = 0.5
+
+
+class DufDisplay(Static):
+    """A live, sortable view of disk usage and I/O throughput per mount.
+
+    When a collector is running, it samples the mounts and pushes them here.
+    Selecting a mount scans it (see widgets/dir_scanner.py) and lists its
+    largest directories below, filling in as subtrees finish; selecting a
+    directory drills into it.
+    """
+
+    BINDINGS = [
+        ("r", "rescan", "Rescan"),
+        ("R", "rescan(True)", "Full rescan"),
+        ("backspace", "dir_up", "Up"),
+    ]
+
+    REFRESH_INTERVAL = 5
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.collector = get_collector_client()
+        self.engine = DiskUsageEngine() if self.collector is None else None
+        self.mounts: list[MountUsage] = []
+        self.sort_column = 0
+        self.sort_reverse = False
+        self.scanner = DirScanner(
+            DirSizeCache(), int(get_config().get("disk_scan_workers", 8))
+        )
+        self.dir_node: DirNode | None = None  # the directory being listed
+        self._wanted_path: str | None = None
+        self._dir_cells: dict[str, tuple] = {}
+        self._scan_timer: Timer | None = None
+
+    def compose(self) -> ComposeResult:
+        yield DataTable(id="disk-table", cursor_type="row")
+        yield Label("[dim]Select a mount to find its largest directories.[/]", id="dir-status")
+        yield DataTable(id="dir-table", cursor_type="row")
+
+    def on_mount(self) -> None:
+        """Event handler called when widget is added to the DOM."""
+        table = self.query_one("#disk-table", DataTable)
+        for label, _ in COLUMNS:
+            table.add_column(label, key=label)
+        dirs = self.query_one("#dir-table", DataTable)
+        for label in DIR_COLUMNS:
+            dirs.add_column(label, key=label)
+        if self.collector is not None:
+            self.collector.subscribe("disk", self.apply_collected)
+            return
+        self.refresh_usage()
+        schedule_refresh(
+            self, "disk", self.refresh_usage, self.REFRESH_INTERVAL, pause_when_hidden=True
+        )
+
+    def on_unmount(self) -> None:
+        self.scanner.cancel()
+        if self.engine is not None:
+            self.engine.close()
+        if self.collector is not None:
+            self.collector.unsubscribe("disk", self.apply_collected)
+
+    def apply_collected(self, message: dict) -> None:
+        """Show mounts sampled by the collector."""
+        self.mounts = [MountUsage(*row) for row in message["d"]]
+        self.render_table()
+
+    def refresh_usage(self) -> None:
+        self.run_worker(self.fetch_duf_output, exclusive=True)
+
+    @PERF.timed("worker fetch_duf_output")
+    async def fetch_duf_output(self) -> None:
+        """Worker task that samples every mount off the event loop."""
+        self.mounts = await asyncio.to_thread(self.engine.sample)
+        self.render_table()
+
+    def on_data_table_header_selected(self, event: DataTable.HeaderSelected) -> None:
+        """Sort by the clicked column; clicking it again reverses the order."""
+        if event.column_index == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = event.column_index, False
+        self.render_table()
+
+    def render_table(self) -> None:
+        table = self.query_one("#disk-table", DataTable)
+        try:
+            cursor_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key
+        except CellDoesNotExist:
+            cursor_key = None
+
+        _, sort_key = COLUMNS[self.sort_column]
+        mounts = sorted(self.mounts, key=sort_key, reverse=self.sort_reverse)
+
+        # A handful of rows: rebuilding is cheaper than diffing, and keeps the
+        # sort order; the cursor is restored by mountpoint.
+        table.clear()
+        for mount in mounts:
+            if mount.status == "ok":
+                usage = (
+                    format_bytes(mount.total),
+                    format_bytes(mount.used),
+                    format_bytes(mount.free),
+                    usage_bar(mount.percent),
+                )
+            else:
+                status = "timed out" if mount.status == "timeout" else mount.status
+                usage = ("", "", "", Text(status, style="bold red"))
+            table.add_row(
+                escape(mount.mountpoint),
+                escape(mount.device),
+                mount.fstype,
+                *usage,
+                f"{format_bytes(mount.read_rate)}/s",
+                f"{format_bytes(mount.write_rate)}/s",
+                key=mount.mountpoint,
+            )
+        if cursor_key is not None and cursor_key in table.rows:
+            table.move_cursor(row=table.get_row_index(cursor_key), scroll=False)
+
+    # --- Largest directories ---
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        if event.data_table.id == "disk-table":
+            self.scan(event.row_key.value)
+        elif event.row_key.value == "..":
+            self.action_dir_up()
+        elif self.dir_node is not None:
+            child = next(
+                (c for c in self.dir_node.children if c.path == event.row_key.value), None
+            )
+            if child is not None:
+                self.show_dir(child)
+
+    def scan(self, path: str, full: bool = False) -> None:
+        self.show_dir(self.scanner.scan(path, full=full))
+        if self._scan_timer is None:
+            self._scan_timer = self.set_interval(SCAN_RENDER_INTERVAL, self.render_scan)
+
+    def action_rescan(self, full: bool = False) -> None:
+        """Scan the current mount again; cached directories are skipped unless `full`."""
+        if self.scanner.root is not None:
+            path = self.dir_node.path if self.dir_node is not None else self.scanner.root.path
+            self.scan(self.scanner.root.path, full=full)
+            # Stay in the same directory once the new tree reaches it.
+            self._wanted_path = path
+
+    def action_dir_up(self) -> None:
+        if self.dir_node is not None and self.dir_node.parent is not None:
+            self.show_dir(self.dir_node.parent)
+
+    def show_dir(self, node: DirNode) -> None:
+        self.dir_node = node
+        self._wanted_path = None
+        self.render_dirs(reset_cursor=True)
+
+    def render_scan(self) -> None:
+        """Redraw while scanning; stops itself once the scan is done."""
+        wanted = self._wanted_path
+        while wanted is not None and self.dir_node is not None and self.dir_node.path != wanted:
+            # After a rescan, walk back down to where the user was, as far
+            # as the new tree has got.
+            child = next(
+                (c for c in list(self.dir_node.children)
+                 if wanted == c.path or wanted.startswith(c.path + os.sep)),
+                None,
+            )
+            if child is None:
+                break
+            self.dir_node = child
+        if self.dir_node is not None and (self.dir_node.path == wanted or not self.scanner.running):
+            self._wanted_path = None
+        self.render_dirs()
+        if not self.scanner.running and self._scan_timer is not None:
+            self._scan_timer.stop()
+            self._scan_timer = None
+
+    @PERF.timed("render dirs")
+    def render_dirs(self, reset_cursor: bool = False) -> None:
+        node = self.dir_node
+        if node is None:
+            return
+        table = self.query_one("#dir-table", DataTable)
+        try:
+            cursor_key = table.coordinate_to_cell_key(table.cursor_coordinate).row_key
+        except CellDoesNotExist:
+            cursor_key = None
+
+        if node.error and node.parent is None:
+            self.query_one("#dir-status", Label).update(
+                f"[red]Can't scan {escape(node.path)}: {escape(node.error)}[/]"
+            )
+            table.clear()
+            self._dir_cells = {}
+            return
+
+        dirs, hits, elapsed = self.scanner.progress()
+        state = "scanning" if self.scanner.running else "scanned"
+        self.query_one("#dir-status", Label).update(
+            f"[b]{escape(node.path)}[/] {format_bytes(node.bytes)}"
+            f"{'' if node.done else '…'} in {node.files:,} files  "
+            f"[dim]({state} {dirs:,} directories, {hits:,} unchanged, in {elapsed:.1f}s;"
+            f" r rescan, R full rescan, backspace up)[/]"
+            + (f"\n[red]{escape(self.scanner.cache_error)}[/]" if self.scanner.cache_error else "")
+        )
+
+        children = sorted(list(node.children), key=lambda c: c.bytes, reverse=True)
+        total = max(node.bytes, 1)
+        rows: dict[str, tuple] = {}
+        sizes: dict[str, float] = {"..": float("inf")}
+        for child in children[:MAX_DIR_ROWS]:
+            if child.error:
+                share = Text(child.error, style="bold red")
+            else:
+                share = usage_bar(min(child.bytes / total * 100, 100))
+            name = escape(child.name) + ("" if child.done else " [dim]…[/]")
+            rows[child.path] = (name, format_bytes(child.bytes), share, f"{child.files:,}")
+            sizes[name] = child.bytes
+
+        keys = set(rows) | ({".."} if node.parent is not None else set())
+        if not reset_cursor and keys == {key.value for key in table.rows}:
+            # Same directories as last time (the common case while a scan
+            # fills in sizes): update the changed cells and re-sort, which
+            # is far cheaper than re-adding every row.
+            for key, values in rows.items():
+                for column, value, old in zip(DIR_COLUMNS, values, self._dir_cells[key]):
+                    if value != old:
+                        table.update_cell(key, column, value)
+        else:
+            table.clear()
+            if node.parent is not None:
+                table.add_row("..", "", "", "", key="..")
+            for key, values in rows.items():
+                table.add_row(*values, key=key)
+        self._dir_cells = rows
+        order = [row.key.value for row in table.ordered_rows]
+        wanted = ([".."] if node.parent is not None else []) + list(rows)
+        if order != wanted:
+            table.sort("Directory", key=lambda name: sizes.get(name, 0), reverse=True)
+        if not reset_cursor and cursor_key is not None and cursor_key in table.rows:
+            table.move_cursor(row=table.get_row_index(cursor_key), scroll=False)
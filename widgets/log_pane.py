@@ -0,0 +1,174 @@
+import asyncio
+import re
+from collections import deque
+
+from rich.markup import escape
+from textual.app import ComposeResult
+from textual.containers import Horizontal
+from textual.timer import Timer
+from textual.widgets import Input, Label, Log, Static
+
+from widgets.config import get_config
+from widgets.log_tail import FileWatcher, LogBuffer, LogTail, filter_lines
+from widgets.perf import PERF
+
+# Seconds to wait after a change before reading, so a burst of appends is
+# read in one go rather than one read per write.
+READ_DELAY = 0.05
+
+# Seconds between repaints of the log while lines are arriving.
+RENDER_INTERVAL = 0.1
+
+
+class LogPane(Static):
+    """Follows a service's log file, like `tail -F` with a filter box.
+
+    Only the last `[logs] max_lines` lines (default 5000) are kept. New
+    lines are read as soon as the FileWatcher reports a change, on a worker
+    thread that also decodes and filters them, and collected until the
+    next repaint, so the log is redrawn at most every RENDER_INTERVAL
+    however fast the service writes.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.max_lines = int(get_config().get("logs", {}).get("max_lines", 5000))
+        self.buffer = LogBuffer(self.max_lines)
+        self.name_shown: str | None = None
+        self.tail: LogTail | None = None
+        self.watcher: FileWatcher | None = None
+        self._pending: deque[str] = deque(maxlen=self.max_lines)
+        self._read_timer: Timer | None = None
+        self._reading = False  # a read is on its way
+        self._read_again = False  # and another is wanted after it
+        self._render_timer: Timer | None = None
+        self._title = ""
+
+    def compose(self) -> ComposeResult:
+        with Horizontal(id="log-header"):
+            yield Label(
+                "[dim]Add `log = \"path\"` to a service to tail it here.[/]", id="log-title"
+            )
+            yield Input(placeholder="Filter (regex)...", id="log-filter")
+        yield Log(id="log-view", max_lines=self.max_lines)
+
+    def on_unmount(self) -> None:
+        self.stop()
+
+    def follow(self, name: str, path: str) -> None:
+        """Show the log of service `name`, replacing the one shown before."""
+        if name == self.name_shown:
+            return
+        self.stop()
+        self.name_shown = name
+        self.tail = LogTail(path, self.max_lines)
+        self.watcher = FileWatcher(path, self.schedule_read)
+        self.watcher.start()
+        self.buffer.clear()
+        self._pending.clear()
+        self.query_one(Log).clear()
+        self.read_available()
+
+    def stop(self) -> None:
+        for timer in (self._read_timer, self._render_timer):
+            if timer is not None:
+                timer.stop()
+        self._read_timer = self._render_timer = None
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+        if self.tail is not None:
+            self.tail.close()
+            self.tail = None
+        self.name_shown = None
+
+    # --- Reading ---
+
+    def schedule_read(self, delay: float = READ_DELAY) -> None:
+        if self._read_timer is None:
+            # A Timer with a zero delay never fires (it divides by it).
+            self._read_timer = self.set_timer(max(delay, 0.001), self.read_available)
+
+    def read_available(self) -> None:
+        self._read_timer = None
+        if self.tail is None:
+            return
+        if self._reading:
+            # One read at a time, so lines are added in order.
+            self._read_again = True
+            return
+        self._reading = True
+        self.run_worker(self._read(self.tail), group="log-read")
+
+    @PERF.timed("worker log read")
+    async def _read(self, tail: LogTail) -> None:
+        """Read what was appended, and queue the matching lines for display."""
+        pattern = self.buffer.pattern
+        more = False
+        try:
+            lines, matches, more, error = await asyncio.to_thread(
+                self._read_lines, tail, pattern
+            )
+            if tail is not self.tail:
+                return  # another log is shown now
+            if error is not None:
+                self.show_title(f"[red]{escape(error)}[/]")
+                return
+            if lines:
+                if pattern is not self.buffer.pattern:
+                    matches = None  # the filter changed meanwhile
+                self._pending.extend(self.buffer.add(lines, matches))
+                if self._pending and self._render_timer is None:
+                    self._render_timer = self.set_timer(RENDER_INTERVAL, self.render_pending)
+            if tail.opened:
+                self.show_title("")
+            else:
+                self.show_title(f"[dim]({escape(tail.error or 'waiting for the file')})[/]")
+        finally:
+            # Cleared even when the read failed, so following goes on.
+            self._reading = False
+            if more or self._read_again:
+                self._read_again = False
+                self.schedule_read(0)  # the rest after the UI has had a turn
+
+    def _read_lines(
+        self, tail: LogTail, pattern: re.Pattern | None
+    ) -> tuple[list[str], list[str], bool, str | None]:
+        """(lines, those matching `pattern`, more to read, error). Blocking."""
+        try:
+            lines, skipped, more = tail.read_new()
+        except OSError as e:
+            tail.close()
+            return [], [], False, str(e)
+        if skipped:
+            marker = f"[... skipped {skipped / 1e6:.1f} MB ...]"
+            lines = [marker, *lines[-(self.max_lines - 1) :]]
+        return lines, filter_lines(lines, pattern), more, None
+
+    def render_pending(self) -> None:
+        self._render_timer = None
+        if self._pending:
+            self.query_one(Log).write_lines(self._pending)
+            self._pending.clear()
+
+    def show_title(self, status: str) -> None:
+        title = f"[b]{escape(self.name_shown or '')}[/] {escape(self.tail.path)} {status}".rstrip()
+        if title != self._title:
+            self._title = title
+            self.query_one("#log-title", Label).update(title)
+
+    # --- Filtering ---
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input.id != "log-filter":
+            return
+        try:
+            matches = self.buffer.set_filter(event.value)
+        except re.error:
+            event.input.add_class("-invalid")
+            return
+        event.input.remove_class("-invalid")
+        self._pending.clear()
+        log = self.query_one(Log)
+        log.clear()
+        log.write_lines(matches)
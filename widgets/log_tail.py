@@ -0,0 +1,366 @@
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import re
+import struct
+import threading
+from collections import deque
+from typing import Callable
+
+# Bytes read per step when scanning backwards for the last lines.
+BLOCK_SIZE = 64 * 1024
+
+# Never scan more than this far back for the initial lines (e.g. a file of
+# one enormous line).
+TAIL_LIMIT = 4 * 1024 * 1024
+
+# Most bytes read by one `read_new()` call, so a burst never stalls the UI.
+READ_LIMIT = 1024 * 1024
+
+# When more than this has been appended since the last read, skip ahead
+# instead of reading lines that would only be pushed out of the ring again.
+SKIP_THRESHOLD = 16 * 1024 * 1024
+
+# A "line" without a newline is cut here rather than buffered forever.
+MAX_LINE = 64 * 1024
+
+# Seconds between checks when inotify isn't available.
+POLL_INTERVAL = 1.0
+
+
+class LogTail:
+    """Reads the last lines of a log file, then whatever is appended to it.
+
+    The file is never read from the start: `open()` seeks to the end and
+    scans backwards block by block until it has `max_lines` lines, and
+    `read_new()` reads from the last position on. Between reads the file
+    may have been rotated (its path now names a new file), in which case
+    the rest of the old file is read before following the new one, or
+    truncated, in which case it is read again from the start.
+
+    Reads are blocking and may run on a worker thread, one at a time;
+    `close()` can be called from elsewhere meanwhile and takes effect
+    once the read in progress is done.
+    """
+
+    def __init__(self, path: str, max_lines: int) -> None:
+        self.path = os.path.expanduser(path)
+        self.max_lines = max_lines
+        self._file = None
+        self._ident: tuple[int, int] | None = None
+        self._position = 0
+        self._partial = b""
+        # Why the file couldn't be opened last time, if it couldn't.
+        self.error: str | None = None
+        self._lock = threading.Lock()
+        self._reading = False
+        self._closed = False
+
+    @property
+    def opened(self) -> bool:
+        return self._file is not None
+
+    def read_new(self) -> tuple[list[str], int, bool]:
+        """Lines appended since the last read.
+
+        Returns (lines, bytes skipped, more to read). Reads at most
+        READ_LIMIT bytes; call again while "more" is true. Opens the file
+        (returning its last lines) if it isn't open yet.
+        """
+        with self._lock:
+            if self._closed:
+                return [], 0, False
+            self._reading = True
+        try:
+            return self._read_new()
+        finally:
+            with self._lock:
+                self._reading = False
+                if self._closed:
+                    self._close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            if not self._reading:
+                self._close()
+
+    # --- Internals ---
+
+    def _open(self) -> list[str]:
+        """Open the file and return its last lines. Raises OSError if it can't."""
+        self._close()
+        self._file = open(self.path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._ident = (stat.st_dev, stat.st_ino)
+        self._position = stat.st_size
+        return self._decode(self._read_tail(stat.st_size))
+
+    def _read_new(self) -> tuple[list[str], int, bool]:
+        if self._file is None:
+            try:
+                lines = self._open()
+            except OSError as e:
+                self.error = e.strerror or str(e)
+                return [], 0, False
+            self.error = None
+            return lines, 0, False
+
+        size = os.fstat(self._file.fileno()).st_size
+        if size < self._position:  # truncated (e.g. copytruncate)
+            self._position = 0
+            self._partial = b""
+        elif size == self._position:
+            if self._replaced():
+                return self._reopen()
+            return [], 0, False
+
+        if size - self._position > SKIP_THRESHOLD:
+            # Only the last lines would survive in the ring anyway.
+            data = self._read_tail(size)
+            skipped = size - self._position - len(data) - len(self._partial)
+            self._position = size
+            return self._decode(data), skipped, False
+
+        self._file.seek(self._position)
+        data = self._file.read(min(size - self._position, READ_LIMIT))
+        self._position += len(data)
+        data = self._partial + data
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        if len(self._partial) > MAX_LINE:
+            end, self._partial = len(data), b""
+        lines = self._decode(data[:end])
+        if self._position == size and self._replaced():
+            # That was the end of a rotated file; carry on in the new one.
+            more_lines, skipped, more = self._reopen()
+            return (lines + more_lines)[-self.max_lines :], skipped, more
+        return lines, 0, self._position < size
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._partial = b""
+
+    def _read_tail(self, size: int) -> bytes:
+        """The bytes holding the file's last `max_lines` lines."""
+        start, data = size, b""
+        while start > 0 and data.count(b"\n") <= self.max_lines and size - start < TAIL_LIMIT:
+            step = min(BLOCK_SIZE, start)
+            start -= step
+            self._file.seek(start)
+            data = self._file.read(step) + data
+        if start > 0:
+            data = data[data.find(b"\n") + 1 :]  # drop the cut-off first line
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        return data[:end]
+
+    def _replaced(self) -> bool:
+        """Whether the path now names another file (the log was rotated)."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return False  # moved away and not recreated yet; keep the old one
+        return (stat.st_dev, stat.st_ino) != self._ident
+
+    def _reopen(self) -> tuple[list[str], int, bool]:
+        """Switch to the file now at the path, reading it from the start."""
+        leftover = self._decode(self._partial) if self._partial else []
+        self._close()
+        try:
+            self._file = open(self.path, "rb")
+        except OSError:
+            return leftover, 0, False
+        stat = os.fstat(self._file.fileno())
+        self._ident = (stat.st_dev, stat.st_ino)
+        self._position = 0
+        lines, skipped, more = self._read_new()
+        return leftover + lines, skipped, more
+
+    def _decode(self, data: bytes) -> list[str]:
+        if not data:
+            return []
+        return data.decode("utf-8", errors="replace").splitlines()[-self.max_lines :]
+
+
+class LogBuffer:
+    """A bounded ring of recent lines plus a live regex filter over them.
+
+    New lines are tested against the filter once, as they arrive (see
+    `filter_lines`, which can do that off the event loop); only changing
+    the filter re-scans the ring, which holds at most `max_lines`.
+    """
+
+    def __init__(self, max_lines: int) -> None:
+        self.lines: deque[str] = deque(maxlen=max_lines)
+        self.pattern: re.Pattern | None = None
+
+    def set_filter(self, text: str) -> list[str]:
+        """Filter by `text` (a regex; empty for none); returns the matching lines.
+
+        Raises re.error for an invalid pattern, leaving the filter as it was.
+        """
+        self.pattern = re.compile(text, re.IGNORECASE) if text else None
+        return self.matching(self.lines)
+
+    def add(self, lines: list[str], matches: list[str] | None = None) -> list[str]:
+        """Append lines to the ring; returns those matching the filter.
+
+        `matches` skips the filtering, for lines already filtered by the
+        current pattern.
+        """
+        self.lines.extend(lines)
+        return self.matching(lines) if matches is None else matches
+
+    def matching(self, lines) -> list[str]:
+        return filter_lines(lines, self.pattern)
+
+    def clear(self) -> None:
+        self.lines.clear()
+
+
+def filter_lines(lines, pattern: re.Pattern | None) -> list[str]:
+    """The lines `pattern` finds a match in; all of them without one."""
+    if pattern is None:
+        return list(lines)
+    search = pattern.search
+    return [line for line in lines if search(line)]
+
+
+# --- File Watching ---
+
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000  # the watch is gone (e.g. its directory was removed)
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+def _load_inotify():
+    if not hasattr(os, "O_NONBLOCK"):
+        return None  # not a POSIX system
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch, libc.inotify_rm_watch
+    except (OSError, AttributeError, TypeError):
+        return None
+    return libc
+
+
+class FileWatcher:
+    """Calls `callback` on the event loop whenever a file may have changed.
+
+    On Linux this watches the file's directory with inotify, so appends,
+    rotation (the file moved away and recreated) and deletion are all
+    noticed immediately without polling. While that directory doesn't
+    exist, its nearest existing parent is watched instead, moving down as
+    the missing directories are created. Elsewhere, or if inotify can't be
+    set up, it simply calls back every POLL_INTERVAL seconds.
+    """
+
+    def __init__(self, path: str, callback: Callable[[], None]) -> None:
+        self.path = os.path.expanduser(path)
+        self.directory = os.path.dirname(os.path.abspath(self.path))
+        self.callback = callback
+        self._libc = None
+        self._fd: int | None = None
+        self._wd: int | None = None
+        self._watched: str | None = None  # the directory being watched
+        self._poll: asyncio.TimerHandle | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._libc = _load_inotify()
+        if self._libc is not None:
+            fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0:
+                self._fd = fd
+                if self._watch():
+                    self._loop.add_reader(fd, self._on_events)
+                    return
+                os.close(fd)
+                self._fd = None
+        self._schedule_poll()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = self._wd = None
+        if self._poll is not None:
+            self._poll.cancel()
+            self._poll = None
+
+    @property
+    def using_inotify(self) -> bool:
+        return self._fd is not None
+
+    def _watch(self) -> bool:
+        """Watch the file's directory, or its nearest existing parent."""
+        while True:
+            directory = self.directory
+            while (wd := self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)) < 0:
+                parent = os.path.dirname(directory)
+                if parent == directory:
+                    return False
+                directory = parent
+            if self._wd is not None and self._wd != wd:
+                self._libc.inotify_rm_watch(self._fd, self._wd)
+            self._wd, self._watched = wd, directory
+            if directory == self.directory:
+                return True
+            step = os.path.relpath(self.directory, directory).split(os.sep)[0]
+            if not os.path.isdir(os.path.join(directory, step)):
+                return True  # its creation will be noticed
+            # Created just after the deeper watch failed: try again.
+
+    def _on_events(self) -> None:
+        if self._watched == self.directory:
+            name = os.path.basename(self.path)
+        else:  # the next missing directory on the way down
+            name = os.path.relpath(self.directory, self._watched).split(os.sep)[0]
+        name = os.fsencode(name)
+        relevant = moved = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                event_name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    relevant = moved = True
+                elif wd != self._wd:
+                    continue  # left over from a directory no longer watched
+                elif mask & IN_IGNORED or (event_name == name and self._watched != self.directory):
+                    relevant = moved = True
+                elif event_name == name:
+                    relevant = True
+        if moved and not self._watch():
+            # Nothing left to watch (unlikely); poll instead.
+            self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = self._wd = None
+            self._schedule_poll()
+        if relevant:
+            self.callback()
+
+    def _schedule_poll(self) -> None:
+        self._poll = self._loop.call_later(POLL_INTERVAL, self._on_poll)
+
+    def _on_poll(self) -> None:
+        self._schedule_poll()
+        self.callback()
@@ -1,37 +1,112 @@
+import asyncio
+
+from rich.markup import escape
 from textual.app import ComposeResult
-from textual.containers import VerticalScroll
+from textual.containers import Horizontal
 from textual.widget import Widget
-from textual.widgets import Button, Static, TextArea
+from textual.widgets import Button, OptionList, Static, TextArea
+from textual.widgets.option_list import Option
+
+from widgets.notes_store import Note, get_notes_store
+
+# Characters of a note's first line shown in the list.
+PREVIEW_WIDTH = 60
+
+
+def preview(note: Note) -> str:
+    title = note.title
+    if len(title) > PREVIEW_WIDTH:
+        title = title[: PREVIEW_WIDTH - 1] + "…"
+    return escape(title)
 
 
 class NoteItem(Widget):
-    """A single note widget with a text area and a delete button."""
+    """The editor for the selected note: a text area and a delete button."""
 
     DEFAULT_CLASSES = "note-item-container"
 
     def compose(self) -> ComposeResult:
         """Create the child widgets for a note."""
         yield TextArea(classes="note-pad")
-        # This line adds the delete button back to each note.
         yield Button("Delete Note", variant="error", classes="note-delete-button")
 
-    def on_button_pressed(self, event: Button.Pressed) -> None:
-        """When the delete button is pressed, remove this note."""
-        # This action removes the parent NoteItem widget.
-        self.remove()
-
 
 class NotesList(Static):
-    """The main notes widget with add functionality."""
+    """The main notes widget with add functionality.
+
+    Notes live in the shared NotesStore, which saves them to disk. The list
+    shows a one-line preview per note in an OptionList, which only renders
+    the lines on screen, and a single NoteItem edits whichever note is
+    highlighted, so hundreds of notes cost one editor's worth of widgets.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.store = get_notes_store()
+        self.current: str | None = None
 
     def compose(self) -> ComposeResult:
         yield Button("Add New Note", variant="success", id="add-note")
-        yield VerticalScroll(id="notes-list-items")
+        with Horizontal(id="notes-body"):
+            yield OptionList(id="notes-list-items")
+            yield NoteItem(id="note-editor")
 
     def on_mount(self) -> None:
-        # Start with one note by default
-        self.query_one("#notes-list-items").mount(NoteItem())
+        self.query_one(NoteItem).disabled = True
+        self.run_worker(self.load_notes, exclusive=True)
+
+    def on_unmount(self) -> None:
+        self.store.flush_sync()
+
+    async def load_notes(self) -> None:
+        """Replay the journal off the event loop, then fill the list."""
+        if not self.store.loaded:
+            await asyncio.to_thread(self.store.load)
+        if not self.store.notes:
+            # Start with one note by default
+            self.store.add()
+        options = self.query_one(OptionList)
+        options.add_options(
+            Option(preview(note), id=note.id) for note in self.store.notes.values()
+        )
+        options.highlighted = 0
+        self.open_note(options.highlighted_option.id)
+
+    def open_note(self, note_id: str | None) -> None:
+        """Load a note into the editor; it is disabled while there is none."""
+        note = self.store.notes.get(note_id) if note_id else None
+        self.current = note.id if note else None
+        self.query_one(TextArea).load_text(note.text if note else "")
+        self.query_one(NoteItem).disabled = note is None
+
+    def on_option_list_option_highlighted(
+        self, event: OptionList.OptionHighlighted
+    ) -> None:
+        if event.option.id != self.current:
+            self.open_note(event.option.id)
+
+    def on_text_area_changed(self, event: TextArea.Changed) -> None:
+        note_id = self.current
+        if note_id is None or note_id not in self.store.notes:
+            return
+        old_title = self.store.notes[note_id].title
+        self.store.put(note_id, event.text_area.text)
+        note = self.store.notes[note_id]
+        if note.title != old_title:
+            self.query_one(OptionList).replace_option_prompt(note_id, preview(note))
 
     def on_button_pressed(self, event: Button.Pressed) -> None:
+        options = self.query_one(OptionList)
         if event.button.id == "add-note":
-            self.query_one("#notes-list-items").mount(NoteItem())
+            note = self.store.add()
+            options.add_option(Option(preview(note), id=note.id))
+            options.highlighted = options.option_count - 1
+            self.open_note(note.id)
+            self.query_one(TextArea).focus()
+        elif event.button.has_class("note-delete-button") and self.current:
+            note_id, self.current = self.current, None
+            self.store.delete(note_id)
+            options.remove_option(note_id)
+            # The list moves its highlight, but not always with an event.
+            option = options.highlighted_option
+            self.open_note(option.id if option else None)
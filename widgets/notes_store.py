@@ -0,0 +1,197 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+
+from widgets.paths import data_path, write_atomic
+
+
+@dataclass(frozen=True)
+class Note:
+    id: str
+    text: str
+    updated: float = 0.0
+
+    @property
+    def title(self) -> str:
+        """The first non-blank line, for previews."""
+        for line in self.text.splitlines():
+            if line.strip():
+                return line.strip()
+        return "(empty note)"
+
+
+class NotesStore:
+    """Notes kept in memory and persisted to an append-only JSON-lines journal.
+
+    Every edit becomes a `put` or `delete` record. Edits are held for
+    `delay` seconds after the last keystroke (but never more than
+    `max_delay` seconds) and only the latest version of each note is
+    written, so typing costs one append per pause rather than one per key.
+    Appends run off the event loop; each batch is written with a single
+    write() and a torn last line from a crash is skipped on load. When the
+    journal holds many superseded records it is compacted into a fresh file
+    that atomically replaces the old one.
+    """
+
+    def __init__(
+        self, path: str | None = None, delay: float = 1.0, max_delay: float = 5.0
+    ) -> None:
+        self.path = path or data_path("notes.jsonl")
+        self.delay = delay
+        self.max_delay = max_delay
+        self.notes: dict[str, Note] = {}
+        self.loaded = False
+        self._records = 0  # records in the journal file
+        self._pending: dict[str, dict] = {}  # note id -> latest unwritten record
+        self._pending_since: float | None = None
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._io_lock = threading.Lock()
+        # Appends run in order, so a later version of a note is never
+        # overtaken by an earlier one.
+        self._write_lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    # --- Loading ---
+
+    def load(self) -> None:
+        """Replay the journal. Blocking; call it from a worker thread."""
+        notes: dict[str, Note] = {}
+        newest: dict[str, float] = {}  # note id -> timestamp of its newest record
+        records = 0
+        with self._io_lock:
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue  # torn write at the end of the file
+                        records += 1
+                        ts = record.get("ts", 0.0)
+                        if ts < newest.get(record["id"], 0.0):
+                            continue  # an older version written late
+                        newest[record["id"]] = ts
+                        if record.get("op") == "delete":
+                            notes.pop(record["id"], None)
+                        else:
+                            notes[record["id"]] = Note(record["id"], record["text"], ts)
+            except FileNotFoundError:
+                pass
+        # Edits made while loading win over what was on disk.
+        for note_id, record in self._pending.items():
+            if record["op"] == "delete":
+                notes.pop(note_id, None)
+            else:
+                notes[note_id] = self.notes[note_id]
+        self.notes, self._records, self.loaded = notes, records, True
+        if self._needs_compaction():
+            self.compact()
+
+    # --- Editing ---
+
+    def add(self, text: str = "") -> Note:
+        note = Note(uuid.uuid4().hex, text, time.time())
+        self.notes[note.id] = note
+        self._queue({"op": "put", "id": note.id, "text": text, "ts": note.updated})
+        return note
+
+    def put(self, note_id: str, text: str) -> None:
+        """Replace a note's text. Unchanged text is ignored."""
+        note = self.notes.get(note_id)
+        if note is None or note.text == text:
+            return
+        note = self.notes[note_id] = Note(note_id, text, time.time())
+        self._queue({"op": "put", "id": note_id, "text": text, "ts": note.updated})
+
+    def delete(self, note_id: str) -> None:
+        if self.notes.pop(note_id, None) is not None:
+            self._queue({"op": "delete", "id": note_id, "ts": time.time()})
+
+    # --- Persistence ---
+
+    def flush(self) -> None:
+        """Write pending edits now, off the event loop."""
+        records = self._take_pending()
+        if records:
+            self._spawn(self._write(records))
+
+    def flush_sync(self) -> None:
+        """Write pending edits now, blocking (e.g. on exit)."""
+        records = self._take_pending()
+        if records:
+            self._append(records)
+
+    def compact(self) -> None:
+        """Rewrite the journal with one record per live note. Blocking."""
+        with self._io_lock:
+            notes = list(self.notes.values())
+            write_atomic(
+                self.path,
+                "".join(
+                    json.dumps({"op": "put", "id": n.id, "text": n.text, "ts": n.updated})
+                    + "\n"
+                    for n in notes
+                ),
+            )
+            self._records = len(notes)
+
+    # --- Internals ---
+
+    def _queue(self, record: dict) -> None:
+        self._pending[record["id"]] = record
+        now = time.monotonic()
+        if self._pending_since is None:
+            self._pending_since = now
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        delay = min(self.delay, max(self._pending_since + self.max_delay - now, 0))
+        self._flush_handle = asyncio.get_running_loop().call_later(delay, self.flush)
+
+    def _take_pending(self) -> list[dict]:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        records, self._pending = list(self._pending.values()), {}
+        self._pending_since = None
+        return records
+
+    async def _write(self, records: list[dict]) -> None:
+        async with self._write_lock:
+            await asyncio.to_thread(self._append, records)
+
+    def _append(self, records: list[dict]) -> None:
+        data = "".join(json.dumps(record) + "\n" for record in records).encode()
+        with self._io_lock:
+            with open(self.path, "ab+") as f:
+                if f.tell() and (f.seek(-1, os.SEEK_END), f.read(1))[1] != b"\n":
+                    # Finish a line torn by a crash, so it can't swallow this one.
+                    data = b"\n" + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            self._records += len(records)
+        if self._needs_compaction():
+            self.compact()
+
+    def _needs_compaction(self) -> bool:
+        return self._records > 2 * len(self.notes) + 100
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+_store: NotesStore | None = None
+
+
+def get_notes_store() -> NotesStore:
+    """Return the notes store shared by every notes widget."""
+    global _store
+    if _store is None:
+        _store = NotesStore()
+    return _store
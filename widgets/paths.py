@@ -0,0 +1,44 @@
+import os
+import tempfile
+
+
+def _app_dir(env_var: str, fallback: str) -> str:
+    base = os.environ.get(env_var) or os.path.expanduser(fallback)
+    path = os.path.join(base, "dashboard")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def cache_path(name: str) -> str:
+    """Path of a cache file, under $XDG_CACHE_HOME/dashboard."""
+    return os.path.join(_app_dir("XDG_CACHE_HOME", "~/.cache"), name)
+
+
+def data_path(name: str) -> str:
+    """Path of a persistent data file, under $XDG_DATA_HOME/dashboard."""
+    return os.path.join(_app_dir("XDG_DATA_HOME", "~/.local/share"), name)
+
+
+def runtime_path(name: str) -> str:
+    """Path of a socket or other runtime file, under $XDG_RUNTIME_DIR/dashboard.
+
+    Falls back to the cache directory where there is no runtime directory.
+    """
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(_app_dir("XDG_RUNTIME_DIR", ""), name)
+    return cache_path(name)
+
+
+def write_atomic(path: str, text: str) -> None:
+    """Write `text` to `path` so readers see either the old or the new file."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -0,0 +1,141 @@
+import asyncio
+import functools
+import json
+import os
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Callable, TypeVar
+
+from widgets.config import get_config
+
+F = TypeVar("F", bound=Callable)
+
+# Timings kept per name for the rolling percentiles.
+WINDOW = 256
+
+
+class PerfRecorder:
+    """Opt-in timing of workers, subprocess spawns and event-loop lag.
+
+    Enabled with `DASHBOARD_PERF=1` or `[perf] enabled = true` in the config
+    file; `DASHBOARD_PERF_LOG` or `[perf] log` additionally streams every
+    measurement to a JSON-lines file. Whether it is enabled is decided once
+    at startup (the log file can be switched later with `set_log`): when
+    disabled, `timed` returns the function it decorates unchanged and
+    `span` returns a shared no-op context, so there is nothing to pay.
+    """
+
+    def __init__(self, enabled: bool = False, log_path: str | None = None) -> None:
+        self.enabled = enabled
+        self.samples: dict[str, deque[float]] = {}
+        self.counts: dict[str, int] = {}
+        self.log_path: str | None = None
+        self._log = None
+        self.set_log(log_path)
+
+    def set_log(self, log_path: str | None) -> None:
+        """Stream measurements to this JSON-lines file from now on (None: stop)."""
+        if not self.enabled or log_path == self.log_path:
+            return
+        if self._log is not None:
+            self._log.close()
+        self.log_path = log_path
+        self._log = open(log_path, "a", encoding="utf-8") if log_path else None
+
+    def record(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        self.samples.setdefault(name, deque(maxlen=WINDOW)).append(seconds)
+        self.counts[name] = self.counts.get(name, 0) + 1
+        if self._log is not None:
+            entry = {"ts": round(time.time(), 3), "name": name, "ms": round(seconds * 1000, 3)}
+            self._log.write(json.dumps(entry) + "\n")
+
+    def flush(self) -> None:
+        if self._log is not None:
+            self._log.flush()
+
+    def stats(self) -> dict[str, tuple[int, float, float, float]]:
+        """name -> (count, p50, p95, max) over the rolling window, in seconds."""
+        result = {}
+        for name, window in self.samples.items():
+            ordered = sorted(window)
+            last = len(ordered) - 1
+            result[name] = (
+                self.counts[name],
+                ordered[last // 2],
+                ordered[min(round(last * 0.95), last)],
+                ordered[last],
+            )
+        return result
+
+    @contextmanager
+    def _span(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def span(self, name: str):
+        """Context manager timing the enclosed block under `name`."""
+        if not self.enabled:
+            return nullcontext()
+        return self._span(name)
+
+    def timed(self, name: str) -> Callable[[F], F]:
+        """Decorator timing every call of a (sync or async) function."""
+
+        def decorate(fn: F) -> F:
+            if not self.enabled:
+                return fn
+            if asyncio.iscoroutinefunction(fn):
+
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self._span(name):
+                        return await fn(*args, **kwargs)
+
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self._span(name):
+                    return fn(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
+
+    async def monitor_lag(self, interval: float = 1.0, probe: float = 0.05) -> None:
+        """Record the worst event-loop stall seen in each `interval`."""
+        worst = 0.0
+        window_start = time.perf_counter()
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(probe)
+            now = time.perf_counter()
+            worst = max(worst, now - started - probe)
+            if now - window_start >= interval:
+                self.record("event loop lag", max(worst, 0.0))
+                self.flush()
+                worst, window_start = 0.0, now
+
+
+def log_path_from_config(config: dict | None = None) -> str | None:
+    """`DASHBOARD_PERF_LOG`, or else `[perf] log`."""
+    options = (config if config is not None else get_config()).get("perf", {})
+    log_path = os.environ.get("DASHBOARD_PERF_LOG") or options.get("log")
+    return os.path.expanduser(log_path) if log_path else None
+
+
+def _from_config() -> PerfRecorder:
+    options = get_config().get("perf", {})
+    enabled = os.environ.get("DASHBOARD_PERF", "") not in ("", "0") or bool(
+        options.get("enabled", False)
+    )
+    return PerfRecorder(enabled, log_path_from_config())
+
+
+PERF = _from_config()
@@ -0,0 +1,46 @@
+from textual.app import ComposeResult
+from textual.widgets import DataTable, Static
+
+from widgets.perf import PERF, log_path_from_config
+from widgets.scheduler import schedule_refresh
+
+COLUMNS = ("Name", "Count", "p50 ms", "p95 ms", "Max ms")
+
+
+class PerfPanel(Static):
+    """Rolling p50/p95/max of every instrumented worker, spawn and loop stall."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Rebuilt when `[perf]` changes; the log file follows the config.
+        PERF.set_log(log_path_from_config())
+
+    def compose(self) -> ComposeResult:
+        yield Static(
+            "Timings over the last 256 samples of each source.", classes="pane-title"
+        )
+        yield DataTable(id="perf-table", cursor_type="row")
+
+    def on_mount(self) -> None:
+        table = self.query_one(DataTable)
+        for label in COLUMNS:
+            table.add_column(label, key=label)
+        self.update_stats()
+        schedule_refresh(self, "perf", self.update_stats, 1, pause_when_hidden=True)
+
+    def update_stats(self) -> None:
+        table = self.query_one(DataTable)
+        stats = PERF.stats()
+        for name, (count, p50, p95, worst) in sorted(stats.items()):
+            cells = (
+                name,
+                str(count),
+                f"{p50 * 1000:.1f}",
+                f"{p95 * 1000:.1f}",
+                f"[red]{worst * 1000:.1f}[/]" if worst > 0.1 else f"{worst * 1000:.1f}",
+            )
+            if name not in table.rows:
+                table.add_row(*cells, key=name)
+                continue
+            for label, cell in zip(COLUMNS[1:], cells[1:]):
+                table.update_cell(name, label, cell)
@@ -0,0 +1,329 @@
+import asyncio
+import time
+from dataclasses import astuple, dataclass, replace
+
+import psutil
+from rich.markup import escape
+from textual.app import ComposeResult
+from textual.containers import Horizontal
+from textual.widgets import DataTable, Input, Label, Static
+from textual.widgets.data_table import CellDoesNotExist
+
+from widgets.collector_client import get_collector_client
+from widgets.disk_usage import format_bytes
+from widgets.perf import PERF
+from widgets.scheduler import schedule_refresh
+
+
+@dataclass(frozen=True)
+class ProcessInfo:
+    """One process as of the latest sample."""
+
+    pid: int
+    name: str
+    user: str
+    cpu: float
+    rss: int
+    memory_percent: float
+    io_rate: float | None  # bytes/s read + written; None if not readable
+
+    def to_row(self) -> list:
+        """The sample as a compact list of field values, for the collector."""
+        return list(astuple(self))
+
+
+def _username(proc: psutil.Process) -> str:
+    try:
+        return proc.username()
+    except (psutil.AccessDenied, KeyError):
+        return ""  # no permission, or a uid without a passwd entry
+
+
+class ProcessSampler:
+    """Samples every process with psutil, reusing Process objects across ticks.
+
+    Name and user are looked up once per process, inside `oneshot()` so they
+    share one read of its /proc files. After that each tick reads only CPU
+    times, and CPU% is the difference from the previous tick.
+    Most processes are idle, so when a process used no CPU since the last
+    tick its previous sample is reused as-is and its memory is not re-read.
+    I/O counters live in a separate file per process, so they are only read
+    every `io_every` ticks and the rate is averaged over that longer span.
+    """
+
+    def __init__(self, io_every: int = 5) -> None:
+        self.io_every = io_every
+        self._ticks = 0
+        self._procs: dict[int, psutil.Process] = {}
+        # pid -> (name, user), looked up when the process is first seen
+        self._static: dict[int, tuple[str, str]] = {}
+        # pid -> (read + written bytes, I/O rate) as of the last I/O tick
+        self._last_io: dict[int, tuple[int, float | None]] = {}
+        self._last_io_time: float | None = None
+        # pid -> (CPU seconds used, last sample)
+        self._last: dict[int, tuple[float, ProcessInfo]] = {}
+        self._last_time: float | None = None
+
+    def sample(self) -> dict[int, ProcessInfo]:
+        """Collect one sample. Blocking; call it from a worker thread."""
+        read_io = self._ticks % self.io_every == 0
+        self._ticks += 1
+        now = time.monotonic()
+        elapsed = now - self._last_time if self._last_time is not None else None
+        self._last_time = now
+        io_elapsed = None
+        if read_io:
+            if self._last_io_time is not None:
+                io_elapsed = now - self._last_io_time
+            self._last_io_time = now
+        pids = psutil.pids()
+        for pid in self._procs.keys() - set(pids):
+            self._forget(pid)
+        total_memory = psutil.virtual_memory().total or 1
+
+        result = {}
+        for pid in pids:
+            proc = self._procs.get(pid)
+            try:
+                if proc is None:
+                    proc = psutil.Process(pid)
+                    # Name, owner and CPU times share the cached /proc reads.
+                    with proc.oneshot():
+                        self._static[pid] = (proc.name(), _username(proc))
+                        times = proc.cpu_times()
+                    self._procs[pid] = proc
+                else:
+                    # A single field: oneshot() would cost more than it saves.
+                    times = proc.cpu_times()
+                used = times.user + times.system
+                last = self._last.get(pid)
+                if last is not None and last[0] == used and not read_io:
+                    info = last[1]
+                    if info.cpu:
+                        info = replace(info, cpu=0.0)
+                else:
+                    name, user = self._static[pid]
+                    cpu = 0.0
+                    if last is not None and elapsed:
+                        cpu = max(used - last[0], 0) / elapsed * 100
+                    rss = proc.memory_info().rss
+                    if read_io:
+                        io_rate = self._io_rate(proc, io_elapsed)
+                    else:
+                        io_rate = self._last_io.get(pid, (0, None))[1]
+                    info = ProcessInfo(
+                        pid, name, user, cpu, rss, rss / total_memory * 100, io_rate
+                    )
+            except psutil.NoSuchProcess:
+                self._forget(pid)
+                continue
+            except psutil.AccessDenied:
+                continue
+            self._last[pid] = (used, info)
+            result[pid] = info
+        return result
+
+    def _io_rate(self, proc: psutil.Process, elapsed: float | None) -> float | None:
+        try:
+            io = proc.io_counters()
+        except (psutil.AccessDenied, AttributeError, NotImplementedError):
+            rate = None  # other users' processes, or not supported here
+            total = 0
+        else:
+            total = io.read_bytes + io.write_bytes
+            previous = self._last_io.get(proc.pid)
+            if previous is None or not elapsed:
+                rate = 0.0
+            else:
+                rate = max(total - previous[0], 0) / elapsed
+        self._last_io[proc.pid] = (total, rate)
+        return rate
+
+    def _forget(self, pid: int) -> None:
+        self._procs.pop(pid, None)
+        self._static.pop(pid, None)
+        self._last_io.pop(pid, None)
+        self._last.pop(pid, None)
+
+
+# (column label, sort key, reverse by default)
+COLUMNS = (
+    ("PID", lambda p: p.pid, False),
+    ("Name", lambda p: p.name.lower(), False),
+    ("User", lambda p: p.user, False),
+    ("CPU%", lambda p: p.cpu, True),
+    ("Mem", lambda p: p.rss, True),
+    ("Mem%", lambda p: p.memory_percent, True),
+    ("IO/s", lambda p: p.io_rate or 0.0, True),
+)
+
+
+def process_cells(info: ProcessInfo) -> tuple[str, ...]:
+    return (
+        str(info.pid),
+        escape(info.name),
+        escape(info.user),
+        f"{info.cpu:.1f}",
+        format_bytes(info.rss),
+        f"{info.memory_percent:.1f}",
+        "-" if info.io_rate is None else f"{format_bytes(info.io_rate)}/s",
+    )
+
+
+class ProcessTable(Static):
+    """A live process list, sortable by column and filterable by name.
+
+    Sampling runs in a worker thread, and each refresh only applies the
+    differences to the table: new and exited processes are added and
+    removed, changed cells are updated, and rows are re-sorted only when
+    the order actually changed.
+
+    When a collector is running it does the sampling and streams only the
+    processes that changed; they are applied on the same schedule.
+    """
+
+    REFRESH_INTERVAL = 1
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.collector = get_collector_client()
+        self.sampler = ProcessSampler() if self.collector is None else None
+        self.processes: dict[int, ProcessInfo] = {}
+        # The collector's latest sample, and whether it changed since shown.
+        self._collected: dict[int, ProcessInfo] = {}
+        self._collected_changed = False
+        self.filter = ""
+        self.sort_column = 3  # CPU%
+        self.sort_reverse = True
+        # row key -> the cells currently shown for it, in table order
+        self._rows: dict[str, tuple[str, ...]] = {}
+        # pid -> (sample, its cells); idle processes keep the same sample
+        # object from tick to tick, so their cells are not re-formatted.
+        self._cells: dict[int, tuple[ProcessInfo, tuple[str, ...]]] = {}
+
+    def compose(self) -> ComposeResult:
+        with Horizontal(id="proc-controls"):
+            yield Input(placeholder="Filter by name...", id="proc-filter")
+            yield Label(id="proc-summary")
+        yield DataTable(id="proc-table", cursor_type="row")
+
+    def on_mount(self) -> None:
+        table = self.query_one(DataTable)
+        for label, _, _ in COLUMNS:
+            table.add_column(label, key=label)
+        if self.collector is not None:
+            self.collector.subscribe("processes", self.apply_collected)
+        else:
+            self.refresh_processes()
+        schedule_refresh(
+            self, "processes", self.refresh_processes, self.REFRESH_INTERVAL, pause_when_hidden=True
+        )
+
+    def on_unmount(self) -> None:
+        if self.collector is not None:
+            self.collector.unsubscribe("processes", self.apply_collected)
+
+    def refresh_processes(self) -> None:
+        if self.collector is None:
+            self.run_worker(self.fetch_processes, exclusive=True, group="processes")
+        elif self._collected_changed:
+            self._collected_changed = False
+            self.set_processes(dict(self._collected))
+
+    @PERF.timed("worker fetch_processes")
+    async def fetch_processes(self) -> None:
+        """Worker task that samples the process table off the event loop."""
+        self.set_processes(await asyncio.to_thread(self.sampler.sample))
+
+    def set_processes(self, processes: dict[int, ProcessInfo]) -> None:
+        self.processes = processes
+        self._cells = {
+            pid: cached for pid, cached in self._cells.items() if pid in self.processes
+        }
+        self.apply()
+
+    def apply_collected(self, message: dict) -> None:
+        """Take the collector's full sample ("d") or the processes that changed ("p")."""
+        if "d" in message:
+            self._collected = {row[0]: ProcessInfo(*row) for row in message["d"]}
+            self._collected_changed = False
+            self.set_processes(dict(self._collected))
+            return
+        for row in message["p"]["set"]:
+            self._collected[row[0]] = ProcessInfo(*row)
+        for pid in message["p"]["del"]:
+            self._collected.pop(pid, None)
+        self._collected_changed = True
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input.id == "proc-filter":
+            self.filter = event.value.strip().lower()
+            self.apply()
+
+    def on_data_table_header_selected(self, event: DataTable.HeaderSelected) -> None:
+        """Sort by the clicked column; clicking it again reverses the order."""
+        if event.column_index == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = event.column_index
+            self.sort_reverse = COLUMNS[event.column_index][2]
+        self.apply()
+
+    def apply(self) -> None:
+        """Bring the table in line with the latest sample, filter and sort."""
+        table = self.query_one(DataTable)
+        _, sort_key, _ = COLUMNS[self.sort_column]
+        shown = [
+            info for info in self.processes.values()
+            if not self.filter or self.filter in info.name.lower()
+        ]
+        shown.sort(key=sort_key, reverse=self.sort_reverse)
+        rows = {str(info.pid): self._cells_for(info) for info in shown}
+
+        cursor_key = self._cursor_key(table)
+        removed = self._rows.keys() - rows.keys()
+        if len(removed) > max(len(self._rows) // 4, 32):
+            # DataTable.remove_row is O(rows); past this point a rebuild is cheaper.
+            table.clear()
+            self._rows = {}
+        else:
+            for key in removed:
+                table.remove_row(key)
+                del self._rows[key]
+
+        for key, cells in rows.items():
+            old = self._rows.get(key)
+            if old is None:
+                table.add_row(*cells, key=key)
+                self._rows[key] = cells
+            elif old != cells:
+                for index, (label, _, _) in enumerate(COLUMNS):
+                    if old[index] != cells[index]:
+                        table.update_cell(key, label, cells[index])
+                self._rows[key] = cells
+
+        if list(self._rows) != list(rows):
+            rank = {key: index for index, key in enumerate(rows)}
+            table.sort("PID", key=lambda pid: rank[pid])
+        self._rows = rows
+
+        if cursor_key in rows:
+            table.move_cursor(row=table.get_row_index(cursor_key), scroll=False)
+        self.query_one("#proc-summary", Label).update(
+            f"{len(rows)} of {len(self.processes)} processes"
+        )
+
+    def _cells_for(self, info: ProcessInfo) -> tuple[str, ...]:
+        cached = self._cells.get(info.pid)
+        if cached is None or cached[0] is not info:
+            cached = self._cells[info.pid] = (info, process_cells(info))
+        return cached[1]
+
+    @staticmethod
+    def _cursor_key(table: DataTable) -> str | None:
+        if not table.row_count:
+            return None
+        try:
+            return table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value
+        except CellDoesNotExist:
+            return None
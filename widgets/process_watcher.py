@@ -0,0 +1,274 @@
+import os
+import select
+import threading
+from typing import Callable
+
+import psutil
+from textual.message import Message
+
+
+class ProcessWatcher:
+    """A background service that keeps an indexed snapshot of the process table.
+
+    Only PIDs that were not seen on a previous tick are inspected, so a tick
+    costs one listing of the PID table plus one lookup per *new* process.
+    Processes matching a watched name get a pidfd (Linux 5.3+) so their exit
+    is reported by the kernel instead of being discovered by a rescan; their
+    start time is checked against the snapshot first, so a PID reused
+    between two ticks isn't mistaken for the process that had it.
+    """
+
+    class StatusChanged(Message):
+        """Posted when a watched name starts or stops matching a process."""
+
+        def __init__(self, name: str, running: bool) -> None:
+            self.name = name
+            self.running = running
+            super().__init__()
+
+    def __init__(self, interval: float = 2.0) -> None:
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._stopping = threading.Event()
+        # Wakes the thread early; open while it runs.
+        self._wake_r: int | None = None
+        self._wake_w: int | None = None
+        self._scanned = False
+
+        # pid -> (create time, lowercased name, lowercased joined cmdline)
+        self._snapshot: dict[int, tuple[float, str, str]] = {}
+        # lowercased process name -> pids with that exact name
+        self._by_name: dict[str, set[int]] = {}
+        # watched (lowercased) substring -> pids currently matching it
+        self._matches: dict[str, set[int]] = {}
+        self._last_state: dict[str, bool | None] = {}
+        self._subscribers: list[Callable[[str, bool], None]] = []
+
+        self._poller = select.poll() if hasattr(select, "poll") else None
+        self._pidfds: dict[int, int] = {}  # fd -> pid
+        self._pidfd_by_pid: dict[int, int] = {}  # pid -> fd
+
+    # --- Public API ---
+
+    def watch(self, name: str) -> None:
+        """Start tracking processes whose name or cmdline contains `name`."""
+        key = name.lower()
+        with self._lock:
+            if key in self._matches:
+                return
+            matches = {
+                pid
+                for pid, (_, proc_name, cmdline) in self._snapshot.items()
+                if key in proc_name or key in cmdline
+            }
+            self._matches[key] = matches
+            # Unknown until the next tick reports it to subscribers.
+            self._last_state[key] = None
+        # Let the watcher thread pick the new name up (and open its pidfds)
+        # instead of waiting for the next tick.
+        if self._wake_w is not None:
+            os.write(self._wake_w, b"\0")
+
+    def unwatch(self, name: str) -> None:
+        """Stop tracking `name`."""
+        with self._lock:
+            self._matches.pop(name.lower(), None)
+            self._last_state.pop(name.lower(), None)
+
+    def is_running(self, name: str) -> bool:
+        """Return whether any process matches `name`, from the index."""
+        key = name.lower()
+        if key not in self._matches:
+            self.watch(key)
+        if not self._scanned and not self.is_alive:
+            self.refresh()
+        return bool(self._matches.get(key))
+
+    def reported_status(self, name: str) -> bool | None:
+        """The status last sent to subscribers for `name`; None if not yet sent."""
+        with self._lock:
+            return self._last_state.get(name.lower())
+
+    def has_process_named(self, name: str) -> bool:
+        """Return whether a process with exactly this name exists."""
+        return bool(self._by_name.get(name.lower()))
+
+    def subscribe(self, callback: Callable[[str, bool], None]) -> None:
+        """Call `callback(name, running)` from the watcher thread on changes."""
+        self._subscribers.append(callback)
+
+    @property
+    def is_alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the background thread, if it isn't already running."""
+        if self.is_alive:
+            return
+        self._stopping.clear()
+        self._wake_r, self._wake_w = os.pipe()
+        if self._poller is not None:
+            self._poller.register(self._wake_r, select.POLLIN)
+        self._thread = threading.Thread(
+            target=self._run, name="process-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and wait for it to exit.
+
+        Its pipe and pidfds are closed once it has; the snapshot is kept,
+        and the pidfds reopened on the next tick after a restart.
+        """
+        if self._thread is None:
+            return
+        self._stopping.set()
+        os.write(self._wake_w, b"\0")
+        self._thread.join(timeout=self.interval + 1)
+        if self._thread.is_alive():
+            return  # stuck in psutil; it exits at its next check
+        self._thread = None
+        with self._lock:
+            for pid in list(self._pidfd_by_pid):
+                self._close_pidfd(pid)
+        if self._poller is not None:
+            self._poller.unregister(self._wake_r)
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+        self._wake_r = self._wake_w = None
+
+    def refresh(self) -> None:
+        """Run a single tick synchronously: add new PIDs, drop exited ones."""
+        try:
+            current = set(psutil.pids())
+        except psutil.Error:
+            return
+        with self._lock:
+            for pid in self._snapshot.keys() - current:
+                self._forget(pid)
+            for pid in current - self._snapshot.keys():
+                self._inspect(pid)
+            for pid in {pid for pids in self._matches.values() for pid in pids}:
+                self._track(pid)
+            self._scanned = True
+        self._notify()
+
+    # --- Internals ---
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self.refresh()
+            self._wait(self.interval)
+
+    def _wait(self, timeout: float) -> None:
+        """Sleep until the next tick, reaping watched processes as they exit."""
+        if self._poller is None:
+            self._stopping.wait(timeout)
+            return
+        try:
+            events = self._poller.poll(timeout * 1000)
+        except InterruptedError:
+            return
+        exited = False
+        for fd, _ in events:
+            if fd == self._wake_r:
+                os.read(self._wake_r, 64)
+                continue
+            with self._lock:
+                pid = self._pidfds.get(fd)
+                if pid is not None:
+                    self._forget(pid)
+                    exited = True
+        if exited:
+            self._notify()
+
+    def _inspect(self, pid: int) -> None:
+        try:
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                created = proc.create_time()
+                name = proc.name().lower()
+                try:
+                    cmdline = " ".join(proc.cmdline()).lower()
+                except (psutil.AccessDenied, psutil.ZombieProcess):
+                    cmdline = ""
+        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+            return
+
+        self._snapshot[pid] = (created, name, cmdline)
+        self._by_name.setdefault(name, set()).add(pid)
+        for key, pids in self._matches.items():
+            if key in name or key in cmdline:
+                pids.add(pid)
+
+    def _forget(self, pid: int) -> None:
+        entry = self._snapshot.pop(pid, None)
+        if entry is not None:
+            pids = self._by_name.get(entry[1])
+            if pids is not None:
+                pids.discard(pid)
+                if not pids:
+                    del self._by_name[entry[1]]
+        for pids in self._matches.values():
+            pids.discard(pid)
+        self._close_pidfd(pid)
+
+    def _track(self, pid: int) -> None:
+        """Watch a matching process's exit, once sure it is still the one inspected."""
+        if pid in self._pidfd_by_pid:
+            return  # its exit would have been reported
+        self._open_pidfd(pid)  # before the check, so it can't refer to a newer process
+        try:
+            created = psutil.Process(pid).create_time()
+        except psutil.Error:
+            created = None
+        if created != self._snapshot[pid][0]:
+            # Gone, or its PID reused, since it was inspected: take another
+            # look; a process that still matches is tracked next tick.
+            self._forget(pid)
+            self._inspect(pid)
+
+    def _open_pidfd(self, pid: int) -> None:
+        """Ask the kernel to tell us when `pid` exits (Linux only)."""
+        if self._poller is None or not hasattr(os, "pidfd_open"):
+            return
+        if pid in self._pidfd_by_pid:
+            return
+        try:
+            fd = os.pidfd_open(pid)
+        except OSError:
+            return
+        self._pidfds[fd] = pid
+        self._pidfd_by_pid[pid] = fd
+        self._poller.register(fd, select.POLLIN)
+
+    def _close_pidfd(self, pid: int) -> None:
+        fd = self._pidfd_by_pid.pop(pid, None)
+        if fd is not None:
+            del self._pidfds[fd]
+            self._poller.unregister(fd)
+            os.close(fd)
+
+    def _notify(self) -> None:
+        changes = []
+        with self._lock:
+            for key, pids in self._matches.items():
+                running = bool(pids)
+                if self._last_state.get(key) != running:
+                    self._last_state[key] = running
+                    changes.append((key, running))
+        for key, running in changes:
+            for callback in self._subscribers:
+                callback(key, running)
+
+
+_watcher: ProcessWatcher | None = None
+
+
+def get_process_watcher() -> ProcessWatcher:
+    """Return the process watcher shared by the whole app."""
+    global _watcher
+    if _watcher is None:
+        _watcher = ProcessWatcher()
+    return _watcher
@@ -0,0 +1,206 @@
+import importlib
+from dataclasses import dataclass, replace
+
+from textual.widget import Widget
+
+from widgets.perf import PERF
+
+
+@dataclass(frozen=True)
+class WidgetSpec:
+    """Where a widget's class lives, and how it is placed in a tab.
+
+    Only the import path is kept here, so a widget's module (and whatever
+    it imports) is loaded the first time a tab holding it is built, and
+    never if no tab does.
+    """
+
+    target: str  # "package.module:ClassName"
+    title: str = ""  # heading above it in a grid tab
+    classes: str = ""
+    # Top-level config keys it reads when built; a change rebuilds it.
+    reload_on: tuple[str, ...] = ()
+
+    def build(self) -> Widget:
+        module_name, _, class_name = self.target.partition(":")
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)(classes=self.classes)
+
+
+# widget name -> where to find it
+WIDGETS: dict[str, WidgetSpec] = {
+    "calendar": WidgetSpec(
+        "widgets.calendar:CalendarPane",
+        "[b]🗓️ Calendar[/b]",
+        reload_on=("calendars", "calendars_concurrency"),
+    ),
+    "taskbook": WidgetSpec("widgets.taskbook:TaskbookPane", "[b]✔ Tasks & Notes[/b]"),
+    "taskbook-table": WidgetSpec(
+        "widgets.taskbook_interactive:InteractiveTaskbook", "[b]Taskbook[/b]"
+    ),
+    "services": WidgetSpec(
+        "widgets.services:ServicesPane",
+        "[b]Services[/b]",
+        "pane",
+        ("services", "services_concurrency", "logs"),
+    ),
+    "tools": WidgetSpec("widgets.tools:ToolLauncher", "[b]Tools[/b]", "pane", ("tools",)),
+    "disk": WidgetSpec(
+        "widgets.disk_usage:DufDisplay", "[b]Disks[/b]", "pane-content", ("disk_scan_workers",)
+    ),
+    "metrics": WidgetSpec(
+        "widgets.system_metrics:MetricsPane", "[b]System[/b]", "pane-content", ("metrics",)
+    ),
+    "network": WidgetSpec(
+        "widgets.network:NetworkPane", "[b]Network[/b]", "pane-content", ("services", "network")
+    ),
+    "processes": WidgetSpec(
+        "widgets.process_table:ProcessTable", "[b]Processes[/b]", "pane-content"
+    ),
+    "perf": WidgetSpec("widgets.perf_panel:PerfPanel", "[b]Perf[/b]", "pane-content", ("perf",)),
+    "clock": WidgetSpec("widgets.clock:Clock", "[b]🕒 Clock[/b]"),
+    "notes": WidgetSpec("widgets.notes:NotesList", "[b]📝 Notes[/b]"),
+    "todo": WidgetSpec("widgets.todo:TodoList", "[b]☑ To-Do[/b]"),
+}
+
+
+@dataclass(frozen=True)
+class TabSpec:
+    """One tab: its title, switch key and the widgets it holds."""
+
+    name: str
+    title: str
+    widgets: tuple[str, ...]
+    key: str = ""
+    # "stack" puts the widgets one under the other, "grid" boxes each
+    # with its title in a grid.
+    layout: str = "stack"
+
+    @property
+    def id(self) -> str:
+        return f"{self.name}-tab"
+
+
+# The layout used when the config has no [[tabs]]; same shape as the config.
+DEFAULT_TABS = [
+    {"name": "home", "title": "Home", "key": "h", "widgets": ["calendar", "taskbook"], "layout": "grid"},
+    {"name": "taskbook", "title": "Taskbook", "key": "b", "widgets": ["taskbook-table"]},
+    {"name": "services", "title": "Services", "key": "s", "widgets": ["services"]},
+    {"name": "tools", "title": "Launch Tools", "key": "l", "widgets": ["tools"]},
+    {"name": "disk-management", "title": "Disk Management", "key": "f", "widgets": ["disk"]},
+    {"name": "metrics", "title": "System", "key": "m", "widgets": ["metrics"]},
+    {"name": "network", "title": "Network", "key": "n", "widgets": ["network"]},
+    {"name": "processes", "title": "Processes", "key": "t", "widgets": ["processes"]},
+]
+
+# The Perf tab only exists when instrumentation is switched on.
+PERF_TAB = {"name": "perf", "title": "Perf", "key": "p", "widgets": ["perf"]}
+
+# action -> (default key, description) for the bindings that aren't tabs
+APP_KEYS = {
+    "toggle_dark": ("d", "Toggle dark mode"),
+    "quit": ("q", "Quit"),
+}
+
+
+@dataclass(frozen=True)
+class Layout:
+    """Everything the config says about which tabs exist and their keys."""
+
+    tabs: tuple[TabSpec, ...]
+    widgets: dict[str, WidgetSpec]
+    keys: tuple[tuple[str, str, str], ...]  # (key, action, description)
+    problems: tuple[str, ...] = ()
+
+    def build_tab(self, tab: TabSpec) -> list[Widget]:
+        """Import and create a tab's widgets."""
+        from textual.containers import Container
+        from textual.widgets import Label
+
+        with PERF.span(f"build {tab.id}"):
+            if tab.layout != "grid":
+                return [self.widgets[name].build() for name in tab.widgets]
+            cells = []
+            for name in tab.widgets:
+                spec = self.widgets[name]
+                cells.append(
+                    Container(Label(spec.title or name), spec.build(), id=name, classes="grid-cell")
+                )
+            return [Container(*cells, id=f"{tab.name}-grid", classes="widget-grid")]
+
+    def tabs_reading(self, keys: set[str]) -> set[str]:
+        """Ids of tabs with a widget that reads any of these config keys."""
+        return {
+            tab.id
+            for tab in self.tabs
+            if any(keys.intersection(self.widgets[name].reload_on) for name in tab.widgets)
+        }
+
+
+def load_layout(config: dict) -> Layout:
+    """Read `[widgets]`, `[[tabs]]` and `[keys]` from the config.
+
+    Mistakes (an unknown widget, a tab without widgets) are skipped and
+    listed in `problems` rather than stopping the app. Each widget can be
+    placed once: its refreshes and DOM id are per widget, not per tab.
+    """
+    problems = []
+    widgets = dict(WIDGETS)
+    for name, entry in config.get("widgets", {}).items():
+        # `name = "module:Class"`, or a table with a target and a title
+        entry = {"target": entry} if isinstance(entry, str) else entry
+        if not isinstance(entry, dict) or ":" not in str(entry.get("target", "")):
+            problems.append(f"widget {name!r} needs a target like 'module:Class'")
+            continue
+        widgets[name] = WidgetSpec(
+            str(entry["target"]),
+            str(entry.get("title", "")),
+            str(entry.get("classes", "")),
+            tuple(entry.get("reload_on", ())),
+        )
+
+    entries = config.get("tabs") or DEFAULT_TABS + ([PERF_TAB] if PERF.enabled else [])
+    tabs = []
+    seen = set()
+    placed: dict[str, str] = {}  # widget -> the tab it is in
+    for entry in entries:
+        name = str(entry.get("name", ""))
+        if not name or name in seen or not entry.get("enabled", True):
+            continue
+        names = []
+        for widget in entry.get("widgets", ()):
+            if widget not in widgets:
+                problems.append(f"tab {name!r}: unknown widget {widget!r}")
+            elif widget in placed or widget in names:
+                problems.append(
+                    f"tab {name!r}: widget {widget!r} is already in tab"
+                    f" {placed.get(widget, name)!r}"
+                )
+            else:
+                names.append(widget)
+        if not names:
+            problems.append(f"tab {name!r} has no widgets")
+            continue
+        seen.add(name)
+        placed.update(dict.fromkeys(names, name))
+        tabs.append(
+            TabSpec(
+                name,
+                str(entry.get("title", name.title())),
+                tuple(names),
+                str(entry.get("key", "")),
+                "grid" if entry.get("layout") == "grid" else "stack",
+            )
+        )
+    if not tabs:
+        problems.append("no usable tabs; using the default layout")
+        fallback = load_layout({**config, "tabs": None})
+        return replace(fallback, problems=tuple(problems) + fallback.problems)
+
+    overrides = config.get("keys", {})
+    keys = [
+        (str(overrides.get(action, key)), action, description)
+        for action, (key, description) in APP_KEYS.items()
+    ]
+    keys += [(tab.key, f"switch_tab('{tab.id}')", tab.title) for tab in tabs if tab.key]
+    return Layout(tuple(tabs), widgets, tuple(keys), tuple(problems))
@@ -0,0 +1,245 @@
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from textual.app import App
+from textual.timer import Timer
+from textual.widget import Widget
+
+from widgets.config import get_config
+
+
+@dataclass
+class RefreshSource:
+    """A data source owned by the scheduler."""
+
+    name: str
+    callback: Callable[[], object]
+    interval: float
+    widget: Widget | None = None
+    # Hidden sources run every `interval * hidden_multiplier` seconds, or
+    # not at all when this is set.
+    pause_when_hidden: bool = False
+    errors: int = 0
+    last_run: float = 0.0
+    next_due: float | None = field(default=None, repr=False)
+    visible: bool = True
+
+
+class RefreshScheduler:
+    """Owns the refresh timing of every data source in the app.
+
+    A single timer is armed for the next due source, rather than one
+    interval timer per widget, so an idle dashboard wakes up only when
+    something actually needs refreshing. Sources whose widgets are hidden
+    (e.g. on another tab) or that run while the terminal is unfocused are
+    slowed down or paused; repeated errors back off exponentially, and
+    every delay gets some jitter so sources drift out of lockstep.
+
+    Intervals can be overridden per source in the `[refresh]` table of the
+    config file, e.g. `calendar = 900`.
+    """
+
+    def __init__(self, app: App, config: dict | None = None) -> None:
+        self.app = app
+        self.sources: dict[str, RefreshSource] = {}
+        self.focused = True
+        self._timer: Timer | None = None
+        self.configure(get_config() if config is None else config)
+
+    def configure(self, config: dict) -> None:
+        """Apply the `[refresh]` and `[scheduler]` config tables.
+
+        Can be called again at any time (the config was reloaded); every
+        source's next run is then rescheduled with the new intervals.
+        """
+        self.overrides = {
+            name: float(value)
+            for name, value in config.get("refresh", {}).items()
+            if isinstance(value, (int, float))
+        }
+        options = config.get("scheduler", {})
+        self.hidden_multiplier = float(options.get("hidden_multiplier", 10))
+        self.unfocused_multiplier = float(options.get("unfocused_multiplier", 4))
+        self.max_backoff = float(options.get("max_backoff", 3600))
+        self.jitter = float(options.get("jitter", 0.1))
+        for source in self.sources.values():
+            source.next_due = self._next_due(source)
+        self._rearm()
+
+    # --- Registration ---
+
+    def register(
+        self,
+        name: str,
+        callback: Callable[[], object],
+        interval: float,
+        widget: Widget | None = None,
+        pause_when_hidden: bool = False,
+        run_now: bool = False,
+    ) -> RefreshSource:
+        """Take over the periodic refresh of a data source."""
+        source = RefreshSource(
+            name, callback, interval, widget, pause_when_hidden=pause_when_hidden
+        )
+        source.visible = self._is_visible(source)
+        now = time.monotonic()
+        self.sources[name] = source
+        if run_now:
+            self._run(source, now)
+        else:
+            source.last_run = now
+            source.next_due = now + self._delay(source)
+        self._rearm()
+        return source
+
+    def unregister(self, name: str) -> None:
+        self.sources.pop(name, None)
+        self._rearm()
+
+    def base_interval(self, source: RefreshSource) -> float:
+        return self.overrides.get(source.name, source.interval)
+
+    # --- Feedback from sources ---
+
+    def report(self, name: str, ok: bool) -> None:
+        """Record a refresh's outcome; failures back off exponentially."""
+        source = self.sources.get(name)
+        if source is None:
+            return
+        errors = 0 if ok else source.errors + 1
+        if errors == source.errors:
+            return
+        source.errors = errors
+        source.next_due = source.last_run + self._delay(source)
+        self._rearm()
+
+    def refresh_now(self, name: str) -> None:
+        """Run a source immediately, e.g. after a user action."""
+        source = self.sources.get(name)
+        if source is not None:
+            self._run(source, time.monotonic())
+            self._rearm()
+
+    # --- Visibility and focus ---
+
+    def update_visibility(self) -> None:
+        """Re-check which sources are visible, e.g. after a tab switch.
+
+        A source that just became visible and has missed its normal
+        interval while hidden is refreshed straight away.
+        """
+        now = time.monotonic()
+        for source in list(self.sources.values()):
+            if source.widget is not None and not source.widget.is_attached:
+                del self.sources[source.name]  # e.g. its tab was removed
+                continue
+            was_visible = source.visible
+            source.visible = self._is_visible(source)
+            if source.visible and not was_visible and self._is_stale(source, now):
+                self._run(source, now)
+            elif source.visible != was_visible or source.next_due is None:
+                source.next_due = self._next_due(source)
+        self._rearm()
+
+    def set_focused(self, focused: bool) -> None:
+        """Slow everything down while the terminal doesn't have focus."""
+        if focused == self.focused:
+            return
+        self.focused = focused
+        now = time.monotonic()
+        for source in self.sources.values():
+            if focused and source.visible and self._is_stale(source, now):
+                self._run(source, now)
+            else:
+                source.next_due = self._next_due(source)
+        self._rearm()
+
+    # --- Internals ---
+
+    def _is_visible(self, source: RefreshSource) -> bool:
+        widget = source.widget
+        if widget is None:
+            return True
+        if not widget.is_attached:
+            return False
+        return all(
+            node.display for node in widget.ancestors_with_self if isinstance(node, Widget)
+        )
+
+    def _is_stale(self, source: RefreshSource, now: float) -> bool:
+        return now - source.last_run >= self.base_interval(source)
+
+    def _delay(self, source: RefreshSource) -> float | None:
+        """Seconds until the source should run again, or None to pause it."""
+        delay = self.base_interval(source)
+        if not source.visible:
+            if source.pause_when_hidden:
+                return None
+            delay *= self.hidden_multiplier
+        if not self.focused:
+            delay *= self.unfocused_multiplier
+        if source.errors:
+            delay = min(delay * 2**source.errors, max(self.max_backoff, delay))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _next_due(self, source: RefreshSource) -> float | None:
+        delay = self._delay(source)
+        return None if delay is None else source.last_run + delay
+
+    def _run(self, source: RefreshSource, now: float) -> None:
+        source.last_run = now
+        source.next_due = self._next_due(source)
+        source.callback()
+
+    def _rearm(self) -> None:
+        if self._timer is not None:
+            self._timer.stop()
+            self._timer = None
+        due = [s.next_due for s in self.sources.values() if s.next_due is not None]
+        if not due:
+            return
+        # Textual timers divide by their delay, so never arm one for zero.
+        delay = max(min(due) - time.monotonic(), 0.001)
+        self._timer = self.app.set_timer(delay, self._tick, name="refresh-scheduler")
+
+    def _tick(self) -> None:
+        self._timer = None
+        now = time.monotonic()
+        for source in list(self.sources.values()):
+            if source.widget is not None and not source.widget.is_attached:
+                # The widget was removed without unregistering.
+                del self.sources[source.name]
+                continue
+            if source.next_due is not None and source.next_due <= now:
+                self._run(source, now)
+        self._rearm()
+
+
+def schedule_refresh(
+    widget: Widget,
+    name: str,
+    callback: Callable[[], object],
+    interval: float,
+    pause_when_hidden: bool = False,
+) -> None:
+    """Register a widget's periodic refresh with the app's scheduler.
+
+    Falls back to a plain `set_interval` when the widget runs in an app
+    without a scheduler.
+    """
+    scheduler = getattr(widget.app, "scheduler", None)
+    if scheduler is None:
+        widget.set_interval(interval, callback)
+        return
+    scheduler.register(
+        name, callback, interval, widget=widget, pause_when_hidden=pause_when_hidden
+    )
+
+
+def report_refresh(widget: Widget, name: str, ok: bool) -> None:
+    """Tell the app's scheduler (if any) whether a refresh succeeded."""
+    scheduler = getattr(widget.app, "scheduler", None)
+    if scheduler is not None:
+        scheduler.report(name, ok)
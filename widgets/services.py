@@ -0,0 +1,403 @@
+import asyncio
+import ssl
+import time
+from dataclasses import astuple, dataclass
+from datetime import datetime
+from functools import partial
+from urllib.parse import urlsplit
+
+from rich.markup import escape
+from textual.app import ComposeResult
+from textual.widgets import DataTable, Static
+
+from widgets.collector_client import get_collector_client
+from widgets.config import get_config
+from widgets.log_pane import LogPane
+from widgets.perf import PERF
+from widgets.scheduler import report_refresh, schedule_refresh
+from widgets.uptime_store import WINDOWS, get_uptime_store
+
+# Probe kinds, in the order they are looked up in a [[services]] entry.
+PROBE_KINDS = ("process", "http", "tcp", "unix")
+
+
+@dataclass(frozen=True)
+class ServiceSpec:
+    """One entry of the `[[services]]` config list."""
+
+    name: str
+    kind: str  # one of PROBE_KINDS
+    target: str
+    timeout: float = 3.0
+    expect_status: int | None = None  # http: exact status, else any 2xx/3xx
+    log: str | None = None  # a log file to tail in the Services tab
+
+    @classmethod
+    def from_config(cls, entry: dict) -> "ServiceSpec":
+        for kind in PROBE_KINDS:
+            if kind in entry:
+                return cls(
+                    name=str(entry.get("name", entry[kind])),
+                    kind=kind,
+                    target=str(entry[kind]),
+                    timeout=float(entry.get("timeout", 3.0)),
+                    expect_status=entry.get("status"),
+                    log=entry.get("log"),
+                )
+        raise ValueError(f"service entry has no probe ({', '.join(PROBE_KINDS)}): {entry}")
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    name: str
+    ok: bool
+    latency: float | None  # seconds; None when not measured (process probes)
+    detail: str = ""
+
+    def to_row(self) -> list:
+        """The result as a compact list of field values, for the collector."""
+        return list(astuple(self))
+
+
+# What the Services tab showed before services were configurable.
+DEFAULT_SERVICES = [ServiceSpec("copyparty", "process", "copyparty")]
+
+
+def load_services(config: dict | None = None) -> tuple[list[ServiceSpec], list[str]]:
+    """Parse `[[services]]` from the config; returns (specs, errors)."""
+    entries = (config if config is not None else get_config()).get("services")
+    if not entries:
+        return list(DEFAULT_SERVICES), []
+    specs, errors, names = [], [], set()
+    for entry in entries:
+        try:
+            spec = ServiceSpec.from_config(entry)
+        except (TypeError, ValueError) as e:
+            errors.append(str(e))
+            continue
+        if spec.name in names:
+            errors.append(f"duplicate service name: {spec.name}")
+            continue
+        names.add(spec.name)
+        specs.append(spec)
+    return specs, errors
+
+
+class _HTTPPool:
+    """Keep-alive HTTP/1.1 connections, up to `per_origin` idle ones per origin.
+
+    Health checks hit the same few origins every interval; reusing the
+    connection skips the TCP (and TLS) handshake on every probe after the
+    first. Only responses whose length is known are kept for reuse.
+    """
+
+    def __init__(self, per_origin: int = 4) -> None:
+        self.per_origin = per_origin
+        self._idle: dict[tuple[str, str, int], list[tuple[asyncio.StreamReader, asyncio.StreamWriter]]] = {}
+        self._ssl: ssl.SSLContext | None = None
+
+    async def get(self, url: str) -> int:
+        """GET `url` and return the status code."""
+        parts = urlsplit(url)
+        secure = parts.scheme == "https"
+        origin = (parts.scheme, parts.hostname or "localhost", parts.port or (443 if secure else 80))
+        host = parts.netloc.rpartition("@")[2] or "localhost"  # keeps IPv6 brackets
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        idle = self._idle.get(origin)
+        if idle:
+            connection = idle.pop()
+            try:
+                return await self._request(origin, connection, host, path)
+            except (OSError, ValueError, asyncio.IncompleteReadError):
+                pass  # the server closed the idle connection; reconnect once
+        if secure and self._ssl is None:
+            self._ssl = ssl.create_default_context()
+        connection = await asyncio.open_connection(
+            origin[1], origin[2], ssl=self._ssl if secure else None
+        )
+        return await self._request(origin, connection, host, path)
+
+    async def _request(self, origin, connection, host: str, path: str) -> int:
+        reader, writer = connection
+        try:
+            writer.write(
+                f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+                "User-Agent: dashboard-probe\r\nConnection: keep-alive\r\n\r\n".encode()
+            )
+            await writer.drain()
+            status_line = await reader.readuntil(b"\r\n")
+            if not status_line:
+                raise ValueError("connection closed")
+            status = int(status_line.split()[1])
+            headers = {}
+            while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+                key, _, value = line.decode("latin-1").partition(":")
+                headers[key.strip().lower()] = value.strip().lower()
+
+            reusable = headers.get("connection") != "close"
+            if "content-length" in headers:
+                await reader.readexactly(int(headers["content-length"]))
+            elif headers.get("transfer-encoding") == "chunked":
+                while size := int((await reader.readuntil(b"\r\n")).split(b";")[0], 16):
+                    await reader.readexactly(size + 2)
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass  # trailers
+            elif status not in (204, 304):
+                reusable = False  # body runs until the server closes
+        except BaseException:
+            writer.close()
+            raise
+        idle = self._idle.setdefault(origin, [])
+        if reusable and len(idle) < self.per_origin:
+            idle.append(connection)
+        else:
+            writer.close()
+        return status
+
+    def close(self) -> None:
+        for idle in self._idle.values():
+            for _, writer in idle:
+                writer.close()
+        self._idle.clear()
+
+
+class ServiceProber:
+    """Runs every service probe concurrently, bounded by a semaphore.
+
+    Each probe has its own timeout, so a round takes about as long as the
+    slowest probe rather than the sum of them.
+    """
+
+    def __init__(self, services: list[ServiceSpec], concurrency: int = 8) -> None:
+        self.services = services
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._http = _HTTPPool()
+
+    async def probe_all(self) -> list[ProbeResult]:
+        return await asyncio.gather(
+            *(self.probe(spec) for spec in self.services if spec.kind != "process")
+        )
+
+    async def probe(self, spec: ServiceSpec) -> ProbeResult:
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                detail = await asyncio.wait_for(self._check(spec), spec.timeout)
+            except asyncio.TimeoutError:
+                return ProbeResult(spec.name, False, None, f"timed out after {spec.timeout:g}s")
+            except (
+                OSError, ValueError, asyncio.IncompleteReadError, asyncio.LimitOverrunError
+            ) as e:
+                return ProbeResult(spec.name, False, None, str(e) or type(e).__name__)
+            latency = time.perf_counter() - started
+            PERF.record(f"probe {spec.name}", latency)
+            if detail is not None:
+                return ProbeResult(spec.name, False, latency, detail)
+            return ProbeResult(spec.name, True, latency)
+
+    async def _check(self, spec: ServiceSpec) -> str | None:
+        """Run one probe; returns an error detail, or None if healthy."""
+        if spec.kind == "http":
+            status = await self._http.get(spec.target)
+            healthy = (
+                status == spec.expect_status
+                if spec.expect_status is not None
+                else 200 <= status < 400
+            )
+            return None if healthy else f"HTTP {status}"
+        if spec.kind == "tcp":
+            # "host:port", "[::1]:port" or ":port"
+            address = urlsplit("//" + spec.target)
+            if address.port is None:
+                raise ValueError(f"expected host:port, got {spec.target!r}")
+            _, writer = await asyncio.open_connection(address.hostname or "localhost", address.port)
+        else:
+            _, writer = await asyncio.open_unix_connection(spec.target)
+        writer.close()
+        return None
+
+    def close(self) -> None:
+        self._http.close()
+
+
+COLUMNS = ("Service", "Probe", "Status", "Latency", *(label for label, _, _ in WINDOWS), "Detail")
+
+
+def format_uptime(fraction: float | None) -> str:
+    if fraction is None:
+        return "[dim]–[/]"
+    color = "green" if fraction >= 0.999 else "yellow" if fraction >= 0.99 else "red"
+    return f"[{color}]{fraction * 100:.2f}%[/]"
+
+
+def hour_bar(hours: list[float | None]) -> str:
+    """One cell per hour, oldest first: green all up, yellow partly, red down."""
+    cells = []
+    for fraction in hours:
+        if fraction is None:
+            cells.append("[dim]·[/]")
+        else:
+            color = "green" if fraction >= 0.999 else "yellow" if fraction > 0 else "red"
+            cells.append(f"[{color}]█[/]")
+    return "".join(cells)
+
+
+class ServicesPane(Static):
+    """Health of every configured service, one row per service.
+
+    Network probes run on the refresh schedule; process probes are pushed
+    by the shared ProcessWatcher as soon as a process starts or exits.
+    When a collector is running, it runs both and pushes the results here.
+    Every result is recorded in the UptimeStore (by the collector, when
+    there is one), which the uptime columns and the history line read.
+    Selecting a service with a `log` shows that log in the LogPane below.
+    """
+
+    REFRESH_INTERVAL = 10
+    UPTIME_INTERVAL = 60
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.services, self.errors = load_services()
+        self.collector = get_collector_client()
+        self.uptime = get_uptime_store()
+        self.history_shown: str | None = None
+        self.prober = None
+        if self.collector is None:
+            self.prober = ServiceProber(
+                self.services, get_config().get("services_concurrency", 8)
+            )
+
+    def compose(self) -> ComposeResult:
+        yield Static("Services Status", classes="pane-title")
+        yield DataTable(id="services-table", cursor_type="row")
+        yield Static(
+            "\n".join(f"[red]Config error: {escape(e)}[/]" for e in self.errors),
+            id="services-errors",
+        )
+        yield Static(id="service-history")
+        yield LogPane(id="service-log")
+
+    def on_mount(self) -> None:
+        table = self.query_one(DataTable)
+        for label in COLUMNS:
+            table.add_column(label, key=label)
+        for spec in self.services:
+            table.add_row(
+                escape(spec.name),
+                spec.kind,
+                "[dim]…[/]",
+                "",
+                *("" for _ in WINDOWS),
+                escape(spec.target),
+                key=spec.name,
+            )
+        logged = next((spec for spec in self.services if spec.log), None)
+        if logged is not None:
+            self.query_one(LogPane).follow(logged.name, logged.log)
+        if self.collector is not None:
+            self.collector.subscribe("services", self.apply_collected)
+        elif any(spec.kind != "process" for spec in self.services):
+            self.refresh_probes()
+            # Slowed down but not paused when hidden, so the uptime history
+            # keeps being recorded.
+            schedule_refresh(self, "services", self.refresh_probes, self.REFRESH_INTERVAL)
+        self.refresh_uptime()
+        schedule_refresh(
+            self, "uptime", self.refresh_uptime, self.UPTIME_INTERVAL, pause_when_hidden=True
+        )
+
+    def on_unmount(self) -> None:
+        if self.collector is not None:
+            self.collector.unsubscribe("services", self.apply_collected)
+        else:
+            self.prober.close()
+            self.uptime.close()
+
+    def apply_collected(self, message: dict) -> None:
+        """Show probe results pushed by the collector."""
+        for row in message["d"]:
+            # Rows of services this config doesn't have (the collector may
+            # have read an older one) are skipped by show_result().
+            self.show_result(ProbeResult(*row))
+
+    def refresh_uptime(self) -> None:
+        self.run_worker(self.load_uptime, exclusive=True, group="uptime")
+
+    async def load_uptime(self) -> None:
+        """Worker task that fills the uptime columns and the history line."""
+        uptimes = await self.uptime.uptimes([spec.name for spec in self.services])
+        table = self.query_one(DataTable)
+        for name, fractions in uptimes.items():
+            for (label, _, _), fraction in zip(WINDOWS, fractions):
+                table.update_cell(name, label, format_uptime(fraction))
+        if self.history_shown is not None:
+            await self.load_history(self.history_shown)
+
+    async def load_history(self, name: str) -> None:
+        hours, transitions = await self.uptime.timeline(name, limit=6)
+        changes = " · ".join(
+            f"{'[green]UP[/]' if up else '[red]DOWN[/]'} {datetime.fromtimestamp(at):%m-%d %H:%M}"
+            for at, up in transitions
+        )
+        self.query_one("#service-history", Static).update(
+            f"[b]{escape(name)}[/] last 24h {hour_bar(hours)}  "
+            f"{changes or '[dim]no changes recorded[/]'}"
+        )
+
+    def on_data_table_row_highlighted(self, event: DataTable.RowHighlighted) -> None:
+        if event.data_table.id == "services-table" and event.row_key is not None:
+            self.history_shown = event.row_key.value
+            self.run_worker(
+                partial(self.load_history, self.history_shown), exclusive=True, group="history"
+            )
+
+    def on_data_table_row_selected(self, event: DataTable.RowSelected) -> None:
+        spec = next((spec for spec in self.services if spec.name == event.row_key.value), None)
+        if spec is None:
+            return
+        if spec.log:
+            self.query_one(LogPane).follow(spec.name, spec.log)
+        else:
+            self.notify(f"No log configured for {spec.name}.", severity="warning")
+
+    def process_names(self) -> list[str]:
+        """Names the ProcessWatcher should watch for this pane."""
+        return [spec.target for spec in self.services if spec.kind == "process"]
+
+    def refresh_probes(self) -> None:
+        self.run_worker(self.run_probes, exclusive=True, group="services")
+
+    @PERF.timed("worker run_probes")
+    async def run_probes(self) -> None:
+        """Worker task that runs one round of network probes."""
+        results = await self.prober.probe_all()
+        for result in results:
+            self.show_result(result)
+        report_refresh(self, "services", True)
+
+    def update_process_status(self, name: str, running: bool) -> None:
+        """Apply a ProcessWatcher status change to the matching rows."""
+        for spec in self.services:
+            if spec.kind == "process" and spec.target.lower() == name.lower():
+                self.show_result(
+                    ProbeResult(spec.name, running, None, "" if running else "not running")
+                )
+
+    def show_result(self, result: ProbeResult) -> None:
+        # None for a service that is no longer (or not yet) in this pane's config.
+        spec = next((spec for spec in self.services if spec.name == result.name), None)
+        if spec is None:
+            return
+        if self.collector is None:
+            self.uptime.record(result.name, result.ok)
+        table = self.query_one(DataTable)
+        status = "[bold green]UP[/]" if result.ok else "[bold red]DOWN[/]"
+        latency = f"{result.latency * 1000:.1f} ms" if result.latency is not None else ""
+        detail = escape(result.detail) if result.detail else escape(spec.target)
+        table.update_cell(result.name, "Status", status)
+        table.update_cell(result.name, "Latency", latency)
+        table.update_cell(result.name, "Detail", detail)
@@ -0,0 +1,336 @@
+import os
+import threading
+import time
+from array import array
+
+import psutil
+from rich.markup import escape
+from textual.app import ComposeResult
+from textual.containers import Horizontal, Vertical, VerticalScroll
+from textual.widgets import Button, Label, Sparkline, Static
+
+from widgets.collector_client import get_collector_client
+from widgets.config import get_config
+from widgets.disk_usage import format_bytes
+from widgets.scheduler import schedule_refresh
+
+# Window label -> seconds of history shown.
+WINDOWS = {"1m": 60, "15m": 900, "1h": 3600}
+
+
+class RingBuffer:
+    """A fixed-capacity series of floats backed by a preallocated array.
+
+    Memory is allocated once, so a series costs the same after a week as
+    after a minute.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._data = array("d", bytes(8 * capacity))
+        self._head = 0  # next write position
+        self.count = 0
+
+    def append(self, value: float) -> None:
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def last(self, n: int | None = None) -> array:
+        """The newest `n` values (all by default), oldest first."""
+        n = self.count if n is None else min(n, self.count)
+        start = self._head - n
+        if start >= 0:
+            return self._data[start : self._head]
+        return self._data[start:] + self._data[: self._head]
+
+    @property
+    def latest(self) -> float:
+        return self._data[self._head - 1] if self.count else 0.0
+
+
+def lttb(values, threshold: int) -> list[float]:
+    """Downsample to `threshold` points with Largest-Triangle-Three-Buckets.
+
+    Unlike plain averaging, LTTB keeps the peaks and dips that make a
+    sparkline worth looking at.
+    """
+    length = len(values)
+    if threshold >= length or threshold < 3:
+        return list(values)
+    sampled = [values[0]]
+    bucket = (length - 2) / (threshold - 2)
+    previous = 0
+    for index in range(threshold - 2):
+        # Average of the next bucket is the third triangle corner.
+        next_start = int((index + 1) * bucket) + 1
+        next_end = min(int((index + 2) * bucket) + 1, length)
+        span = next_end - next_start
+        avg_x = (next_start + next_end - 1) / 2
+        avg_y = sum(values[next_start:next_end]) / span
+
+        start = int(index * bucket) + 1
+        end = int((index + 1) * bucket) + 1
+        prev_y = values[previous]
+        best, best_area = start, -1.0
+        for x in range(start, end):
+            area = abs(
+                (previous - avg_x) * (values[x] - prev_y)
+                - (previous - x) * (avg_y - prev_y)
+            )
+            if area > best_area:
+                best, best_area = x, area
+        sampled.append(values[best])
+        previous = best
+    sampled.append(values[-1])
+    return sampled
+
+
+class SystemSampler:
+    """Samples CPU, memory, swap, load and network on a background thread.
+
+    Each metric is a RingBuffer holding `history` seconds at one sample
+    per `interval`. Network counters are turned into per-second rates from
+    the difference between consecutive samples.
+
+    The collector daemon runs one of these for every dashboard; its clients
+    fill their own sampler with `apply_collected()` instead of sampling.
+    """
+
+    def __init__(self, interval: float = 1.0, history: float = 3600) -> None:
+        self.interval = interval
+        self.capacity = max(int(history / interval), 1)
+        self.series: dict[str, RingBuffer] = {}
+        self.version = 0
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_net: dict[str, tuple[int, int]] = {}
+        self._last_time: float | None = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self.prime()
+        self._thread = threading.Thread(
+            target=self._run, name="system-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stopping.wait(self.interval):
+            self.sample()
+
+    def prime(self) -> None:
+        """Start the CPU counters, so the first sample measures a real interval."""
+        psutil.cpu_percent(percpu=True)
+
+    def sample(self) -> dict[str, float]:
+        """Take and record one sample of every metric. Blocking, but cheap."""
+        values = self.measure()
+        self.record(values)
+        return values
+
+    def measure(self) -> dict[str, float]:
+        """Read every metric's current value."""
+        values: dict[str, float] = {}
+        per_core = psutil.cpu_percent(percpu=True)
+        values["CPU"] = sum(per_core) / len(per_core) if per_core else 0.0
+        for index, percent in enumerate(per_core):
+            values[f"CPU {index}"] = percent
+        values["Memory"] = psutil.virtual_memory().percent
+        values["Swap"] = psutil.swap_memory().percent
+        if hasattr(os, "getloadavg"):
+            values["Load"] = os.getloadavg()[0]
+
+        now = time.monotonic()
+        try:
+            counters = psutil.net_io_counters(pernic=True)
+        except (OSError, RuntimeError):
+            counters = {}
+        if self._last_time is not None:
+            elapsed = max(now - self._last_time, 1e-6)
+            for nic, io in counters.items():
+                previous = self._last_net.get(nic)
+                if previous is not None:
+                    values[f"{nic} rx"] = max(io.bytes_recv - previous[0], 0) / elapsed
+                    values[f"{nic} tx"] = max(io.bytes_sent - previous[1], 0) / elapsed
+        self._last_net = {nic: (io.bytes_recv, io.bytes_sent) for nic, io in counters.items()}
+        self._last_time = now
+        return values
+
+    def record(self, values: dict[str, float]) -> None:
+        """Append one sample to each metric's series."""
+        with self._lock:
+            for name, value in values.items():
+                series = self.series.get(name)
+                if series is None:
+                    series = self.series[name] = RingBuffer(self.capacity)
+                series.append(value)
+            self.version += 1
+
+    def snapshot(self, name: str, n: int) -> tuple[array, float]:
+        """The newest `n` samples of a series and its latest value."""
+        with self._lock:
+            series = self.series[name]
+            return series.last(n), series.latest
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return list(self.series)
+
+    def history(self) -> dict:
+        """The sampling interval and every series in full, oldest first."""
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "capacity": self.capacity,
+                "series": {name: series.last().tolist() for name, series in self.series.items()},
+            }
+
+    def apply_collected(self, message: dict) -> None:
+        """Take the collector's history ("d") or its latest sample ("p")."""
+        if "p" in message:
+            self.record(message["p"])
+            return
+        data = message["d"]
+        with self._lock:
+            self.interval, self.capacity = data["interval"], data["capacity"]
+            self.series = {}
+            for name, values in data["series"].items():
+                series = self.series[name] = RingBuffer(self.capacity)
+                for value in values:
+                    series.append(value)
+            self.version += 1
+
+
+_sampler: SystemSampler | None = None
+_sampler_options: tuple[float, float] | None = None
+
+
+def get_system_sampler() -> SystemSampler:
+    """Return the sampler shared by the app, configured from `[metrics]`.
+
+    A new one (with an empty history) replaces it once `[metrics]` has
+    changed, so a reloaded config applies when the System tab is rebuilt.
+    """
+    global _sampler, _sampler_options
+    metrics = get_config().get("metrics", {})
+    options = (float(metrics.get("interval", 1.0)), float(metrics.get("history", 3600)))
+    if _sampler is None or options != _sampler_options:
+        if _sampler is not None:
+            _sampler.stop()
+        _sampler = SystemSampler(*options)
+        _sampler_options = options
+    return _sampler
+
+
+def format_value(name: str, value: float) -> str:
+    if name.endswith((" rx", " tx")):
+        return f"{format_bytes(value)}/s"
+    if name == "Load":
+        return f"{value:.2f}"
+    return f"{value:.0f}%"
+
+
+class MetricRow(Horizontal):
+    """One metric: its name and latest value, and a sparkline of its history."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(classes="metric-row")
+        self.metric = name
+        self.shown: tuple[float, ...] | None = None
+
+    def compose(self) -> ComposeResult:
+        yield Label(escape(self.metric), classes="metric-label")
+        yield Sparkline([], summary_function=max)
+
+
+class MetricsPane(Static):
+    """Sparklines of system metrics over a selectable time window.
+
+    Once the tab has been opened, the shared SystemSampler keeps collecting
+    while it is hidden; this pane only redraws rows that are on screen, whose
+    data changed, and no more often than one column of the window is worth.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.sampler = get_system_sampler()
+        self.collector = get_collector_client()
+        self.window = "1m"
+        self.rows: dict[str, MetricRow] = {}
+        self._drawn_at: float = 0.0
+        self._drawn_version = -1
+
+    def compose(self) -> ComposeResult:
+        with Horizontal(id="metrics-windows"):
+            for label in WINDOWS:
+                variant = "primary" if label == self.window else "default"
+                yield Button(label, id=f"metrics-{label}", variant=variant)
+        yield VerticalScroll(id="metrics-rows")
+
+    def on_mount(self) -> None:
+        if self.collector is not None:
+            # Comes with the collector's history, so the sparklines start full.
+            self.collector.subscribe("metrics", self.sampler.apply_collected)
+        else:
+            self.sampler.start()
+        schedule_refresh(
+            self, "metrics", self.update_metrics, self.sampler.interval, pause_when_hidden=True
+        )
+
+    def on_unmount(self) -> None:
+        if self.collector is not None:
+            self.collector.unsubscribe("metrics", self.sampler.apply_collected)
+        self.sampler.stop()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        label = (event.button.id or "").removeprefix("metrics-")
+        if label not in WINDOWS:
+            return
+        event.stop()
+        for button in self.query(Button):
+            button.variant = "primary" if button is event.button else "default"
+        self.window = label
+        self._drawn_version = -1
+        self.update_metrics()
+
+    def update_metrics(self) -> None:
+        """Add rows for new series and redraw the visible ones that changed."""
+        version = self.sampler.version
+        seconds = WINDOWS[self.window]
+        # Each sparkline column of a wide window covers many samples, so it
+        # only changes every `seconds / width` seconds.
+        width = max(self.size.width - 20, 10)
+        now = time.monotonic()
+        if version == self._drawn_version or (
+            self._drawn_version >= 0 and now - self._drawn_at < seconds / width
+        ):
+            return
+        self._drawn_version, self._drawn_at = version, now
+
+        container = self.query_one("#metrics-rows")
+        new_rows = [MetricRow(name) for name in self.sampler.names() if name not in self.rows]
+        if new_rows:
+            self.rows.update((row.metric, row) for row in new_rows)
+            container.mount_all(new_rows)
+            self._drawn_version = -1  # draw them once they are laid out
+
+        count = int(seconds / self.sampler.interval)
+        for name, row in self.rows.items():
+            if not row.is_mounted or not row.region:
+                continue  # scrolled out of view
+            samples, latest = self.sampler.snapshot(name, count)
+            data = tuple(lttb(samples, width))
+            row.query_one(Label).update(f"{escape(name)} {format_value(name, latest)}")
+            if data != row.shown:
+                row.shown = data
+                row.query_one(Sparkline).data = data
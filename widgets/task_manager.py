@@ -1,18 +1,15 @@
-import subprocess
+from rich.markup import escape
 from textual.app import ComposeResult
 from textual.containers import Vertical
-from textual.message import Message
 from textual.widget import Widget
 from textual.widgets import Button, Input, Label, Static
 
+from widgets.taskbook_mutations import get_mutation_queue
+
 
 class TaskbookManager(Static):
     """A widget to add tasks or notes to taskbook."""
 
-    # A custom message to tell the app to refresh the home screen view
-    class RefreshData(Message):
-        pass
-
     def __init__(self, item_type: str = "task"):
         super().__init__()
         self.item_type = item_type  # "task" or "note"
@@ -34,25 +31,19 @@ class TaskbookManager(Static):
             if description:
                 # Clear the output message before running the worker
                 self.query_one("#tb-output", Static).update("")
-                self.run_worker(self.add_item(description))
+                self.add_item(description)
                 input_widget.value = ""
                 input_widget.focus()
 
-    async def add_item(self, description: str) -> None:
-        """Runs the taskbook command to add a new item."""
+    def add_item(self, description: str) -> None:
+        """Queues the new item; it shows up in the taskbook panes immediately."""
+        get_mutation_queue().add(description, self.item_type, on_done=self.show_result)
+
+    def show_result(self, ok: bool, message: str) -> None:
+        """Reports the outcome of the background `tb` command."""
         # FIX: Ensure we query for a Static widget.
         output_widget = self.query_one("#tb-output", Static)
-        try:
-            # Construct the command, e.g., `tb -t "My new task"`
-            command = f'tb {self.command_flag} "{description}"'
-            process = subprocess.run(
-                command, shell=True, capture_output=True, text=True
-            )
-            if process.returncode == 0:
-                output_widget.update("[green]Success![/]")
-                # Post a message to tell the main app to refresh the home screen
-                self.post_message(self.RefreshData())
-            else:
-                output_widget.update(f"[red]Error:\n{process.stderr}[/]")
-        except FileNotFoundError:
-            output_widget.update("[red]Error: 'tb' command not found.[/]")
+        if ok:
+            output_widget.update("[green]Success![/]")
+        else:
+            output_widget.update(f"[red]Error:\n{escape(message)}[/]")
@@ -1,10 +1,59 @@
 import asyncio
+from rich.markup import escape
 from textual.message import Message
 from textual.widgets import Static
 
+from widgets.collector_client import get_collector_client
+from widgets.perf import PERF
+from widgets.scheduler import report_refresh, schedule_refresh
+from widgets.taskbook_store import TaskbookItem, TaskbookStore, get_taskbook_store
+
+
+def render_boards(items: list[TaskbookItem], limit: int = 200) -> str:
+    """Render items grouped by board, in the same layout as `tb`.
+
+    At most `limit` item lines are rendered: the pane is a summary, and a
+    Static with thousands of lines takes seconds to lay out.
+    """
+    boards: dict[str, list[TaskbookItem]] = {}
+    for item in items:
+        for board in item.boards:
+            boards.setdefault(board, []).append(item)
+
+    lines = []
+    shown = hidden = 0
+    for board, board_items in boards.items():
+        tasks = [item for item in board_items if item.type == "task"]
+        done = sum(1 for item in tasks if item.checked)
+        if shown >= limit:
+            hidden += len(board_items)
+            continue
+        lines.append(f"\n [b u]{escape(board)}[/] [dim]\\[{done}/{len(tasks)}][/]")
+        for item in board_items:
+            if shown >= limit:
+                hidden += 1
+                continue
+            shown += 1
+            if item.type == "note":
+                mark = "[blue]●[/]"
+            elif item.checked:
+                mark = "[green]✔[/]"
+            elif item.in_progress:
+                mark = "[magenta]…[/]"
+            else:
+                mark = "[magenta]☐[/]"
+            description = escape(item.description)
+            if item.checked:
+                description = f"[dim]{description}[/]"
+            star = " [yellow]★[/]" if item.starred else ""
+            lines.append(f"   [dim]{item.id}.[/] {mark} {description}{star}")
+    if hidden:
+        lines.append(f"\n [dim]… and {hidden} more (see the Taskbook tab)[/]")
+    return "\n".join(lines).lstrip("\n") or "[dim]No tasks or notes.[/]"
+
 
 class TaskbookPane(Static):
-    """A widget to display the output of the taskbook command."""
+    """A widget to display the items in taskbook's storage."""
 
     class UpdateTaskbook(Message):
         """A message to update the taskbook content."""
@@ -13,49 +62,58 @@ class TaskbookPane(Static):
             self.content = content
             super().__init__()
 
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.store = get_taskbook_store()
+        self.collector = get_collector_client()
+
     def on_mount(self) -> None:
-        """Event handler that sets up a recurring update for the taskbook list."""
-        self.update_taskbook()
-        self.set_interval(300, self.update_taskbook)  # Refresh every 5 minutes
+        """Event handler that sets up a recurring check of the taskbook storage."""
+        self.store.subscribe(self._on_store_changed)
+        if self.store.version:
+            # Already loaded by another pane.
+            self.render_store()
+        if self.collector is not None:
+            # The collector watches the storage file and pushes its contents.
+            self.collector.subscribe("taskbook", self.store.apply_collected)
+            return
+        # Let the first frame go out before touching the storage file.
+        self.call_after_refresh(self.update_taskbook)
+        # Cheap: the store only re-reads the file when its stat() changes.
+        schedule_refresh(self, "taskbook", self.update_taskbook, 2)
+
+    def on_unmount(self) -> None:
+        self.store.unsubscribe(self._on_store_changed)
+        if self.collector is not None:
+            self.collector.unsubscribe("taskbook", self.store.apply_collected)
+
+    def _on_store_changed(self) -> None:
+        # May be called from a worker thread; post_message is thread-safe.
+        self.post_message(TaskbookStore.Changed())
 
     def update_taskbook(self) -> None:
         """Worker method to fetch data from taskbook."""
         self.run_worker(self.fetch_taskbook_data, exclusive=True)
 
+    @PERF.timed("worker fetch_taskbook_data")
     async def fetch_taskbook_data(self) -> None:
-        """Asynchronously runs the taskbook command and updates the widget."""
-        try:
-            # FIX: The correct command to list all items is simply 'tb'.
-            command = "tb"
-            process = await asyncio.create_subprocess_shell(
-                command,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await process.communicate()
-            if process.returncode == 0:
-                self.post_message(self.UpdateTaskbook(stdout.decode()))
-            else:
-                stdout_output = stdout.decode().strip()
-                stderr_output = stderr.decode().strip()
-
-                error_parts = [
-                    f"[red]Error running taskbook (Exit Code: {process.returncode})[/]",
-                    f"\n[b]Standard Output:[/]\n{stdout_output}",
-                    f"\n[b]Standard Error:[/]\n{stderr_output}",
-                ]
-
-                full_error_message = "\n".join(
-                    part for part in error_parts if part.splitlines()[-1]
-                )
-                self.post_message(self.UpdateTaskbook(full_error_message))
-
-        except FileNotFoundError:
-            self.post_message(
-                self.UpdateTaskbook(
-                    "[red]Error: 'tb' not found.\nPlease ensure taskbook is installed (`npm install -g taskbook`) and in your PATH.[/]"
-                )
-            )
+        """Re-read the storage file off the event loop if it has changed.
+
+        Changes come back through the store's subscription as a Changed message.
+        """
+        await asyncio.to_thread(self.store.refresh)
+        report_refresh(self, "taskbook", self.store.error is None)
+
+    def render_store(self) -> None:
+        """Render the current model into the pane."""
+        if self.store.error:
+            content = f"[red]Error: {escape(self.store.error)}[/]"
+        else:
+            content = render_boards(list(self.store.items.values()))
+        self.post_message(self.UpdateTaskbook(content))
+
+    def on_taskbook_store_changed(self, message: TaskbookStore.Changed) -> None:
+        self.render_store()
 
     def on_taskbook_pane_update_taskbook(self, message: UpdateTaskbook) -> None:
         """Message handler to update the taskbook widget content."""
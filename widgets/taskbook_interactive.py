@@ -1,24 +1,103 @@
 import asyncio
-import re
-import subprocess
+from functools import lru_cache
+from rich.markup import escape
+from rich.text import Text
 from textual.app import ComposeResult
 from textual.containers import Vertical, Horizontal
-from textual.message import Message
 from textual.widgets import Button, DataTable, Input, Static, Label
+from textual.widgets.data_table import CellDoesNotExist
+
+from widgets.collector_client import get_collector_client
+from widgets.perf import PERF
+from widgets.scheduler import schedule_refresh
+from widgets.taskbook_mutations import get_mutation_queue
+from widgets.taskbook_search import TaskbookSearchIndex
+from widgets.taskbook_store import TaskbookItem, TaskbookStore, get_taskbook_store
+
+COLUMNS = ("ID", "Type", "Description", "Status")
+
+
+# Rows added per event-loop turn when filling the table.
+INSERT_CHUNK = 500
+
+
+def _sort_key(row_key: str) -> int:
+    return int(row_key) if row_key.isdigit() else -1
+
+
+@lru_cache(maxsize=64)
+def _markup(text: str) -> Text:
+    """Parsed markup for the few distinct Type/Status values."""
+    return Text.from_markup(text)
+
+
+def _cells(values: tuple[str, ...]) -> tuple[Text, ...]:
+    """Table cells for a row's values, skipping markup parsing of free text."""
+    item_id, item_type, description, status = values
+    return (Text(item_id), _markup(item_type), Text(description), _markup(status))
+
+
+def item_status(item: TaskbookItem) -> str:
+    """The Status column markup for an item."""
+    if item.type == "note":
+        return "[blue]Note[/]"
+    if item.checked:
+        return "[green]Done[/]"
+    if item.starred:
+        return "[cyan]Starred[/]"
+    if item.in_progress:
+        return "[magenta]In Progress[/]"
+    return "[yellow]Pending[/]"
 
 
 class InteractiveTaskbook(Static):
     """An interactive widget to manage tasks and notes from taskbook."""
 
-    class RefreshData(Message):
-        """A custom message to tell the app to refresh the home screen view."""
-
-        pass
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.store = get_taskbook_store()
+        self.mutations = get_mutation_queue()
+        self.collector = get_collector_client()
+        # row key -> the cell values currently shown for it
+        self._rows: dict[str, tuple[str, ...]] = {}
+        # Set when rows were appended out of id order and not yet sorted.
+        self._unsorted = False
+        self.index = TaskbookSearchIndex()
+        self.filter_text = ""
+        # Row values for every item, and the store version they were built from.
+        self._all_rows: dict[str, tuple[str, ...]] = {}
+        self._all_version = -1
 
     def on_mount(self) -> None:
         """Set up the widget and load initial data."""
+        self.store.subscribe(self._on_store_changed)
+        if self.store.version:
+            # Already loaded by another pane.
+            self.post_message(TaskbookStore.Changed())
+        if self.collector is not None:
+            # The collector watches the storage file and pushes its contents;
+            # subscribed here too, so this works without the Home tab's pane.
+            self.collector.subscribe("taskbook", self.store.apply_collected)
+            return
+        self.refresh_data()
+        # Pick up edits made with `tb` outside the dashboard; a stat() per tick.
+        # While hidden, the Home tab's pane keeps the shared store fresh.
+        schedule_refresh(
+            self, "taskbook-table", self.refresh_data, 2, pause_when_hidden=True
+        )
+
+    def refresh_data(self) -> None:
         self.run_worker(self.load_data, exclusive=True)
 
+    def on_unmount(self) -> None:
+        self.store.unsubscribe(self._on_store_changed)
+        if self.collector is not None:
+            self.collector.unsubscribe("taskbook", self.store.apply_collected)
+
+    def _on_store_changed(self) -> None:
+        # May be called from a worker thread; post_message is thread-safe.
+        self.post_message(TaskbookStore.Changed())
+
     def compose(self) -> ComposeResult:
         """Create the child widgets for the interactive taskbook."""
         with Vertical(id="add-controls"):
@@ -28,6 +107,10 @@ class InteractiveTaskbook(Static):
                 yield Button("Add Task", variant="primary", id="tb-add-task")
                 yield Button("Add Note", variant="success", id="tb-add-note")
 
+        yield Input(
+            placeholder="Filter... (words, status:pending, type:note, board:name)",
+            id="tb-filter",
+        )
         yield DataTable(id="tb-datatable")
 
         with Horizontal(id="manage-controls"):
@@ -36,102 +119,167 @@ class InteractiveTaskbook(Static):
 
         yield Static(id="tb-output")
 
+    @PERF.timed("worker load_data")
     async def load_data(self) -> None:
-        """Fetch data from taskbook and populate the DataTable."""
-        datatable = self.query_one(DataTable)
-        datatable.clear()
+        """Refresh the shared taskbook model off the event loop.
 
-        if not datatable.columns:
-            datatable.add_columns("ID", "Type", "Description", "Status")
+        If it changed, the store's subscription repopulates the DataTable.
+        """
+        await asyncio.to_thread(self.store.refresh)
 
+    def on_taskbook_store_changed(self, message: TaskbookStore.Changed) -> None:
+        self.refresh_table()
+
+    def on_input_changed(self, event: Input.Changed) -> None:
+        """Narrow the table to the items matching the filter box."""
+        if event.input.id == "tb-filter":
+            self.filter_text = event.value
+            self.refresh_table()
+
+    def refresh_table(self) -> None:
+        # A newer keystroke or store change cancels a populate still in progress.
+        self.run_worker(self._populate_table, group="tb-table", exclusive=True)
+
+    async def _populate_table(self) -> None:
+        # A function rather than a coroutine, which would never be awaited
+        # if a newer request cancelled the worker before it started.
+        await self.populate(self.query_one(DataTable))
+
+    async def populate(self, table: DataTable) -> None:
+        """Bring the table in line with the taskbook model, keyed by item id.
+
+        Items that don't match the filter box are left out. Matching is done
+        against a search index that is only updated for items that changed.
+
+        Only rows that were added or removed are inserted or deleted, and
+        only cells whose text changed are updated, so the cursor and scroll
+        position survive a refresh. Large insertions are made in chunks,
+        yielding to the event loop in between, so loading a board with
+        thousands of items never freezes input. Cancelling part way leaves
+        `_rows` describing what the table holds, for the next call to finish.
+        """
+        if not table.columns:
+            for label in COLUMNS:
+                table.add_column(label, key=label.lower())
+
+        if self.store.error:
+            rows = {"error": ("Error", "", self.store.error, "[red]Error[/]")}
+        else:
+            rows = self._all_rows_for_store()
+            matches = self.index.search(self.filter_text)
+            if matches is not None:
+                keys = {str(item_id) for item_id in matches}
+                rows = {key: values for key, values in rows.items() if key in keys}
+
+        cursor_key = self._cursor_key(table)
+        removed = self._rows.keys() - rows.keys()
+        if len(removed) > max(len(self._rows) // 4, 32):
+            # DataTable.remove_row is O(rows); past this point a rebuild is cheaper.
+            table.clear()
+            self._rows = {}
+        else:
+            for key in removed:
+                table.remove_row(key)
+                del self._rows[key]
+
+        last_key = next(reversed(self._rows), None)
+        added = 0
+        for key, values in rows.items():
+            old = self._rows.get(key)
+            if old is None:
+                table.add_row(*_cells(values), key=key)
+                self._rows[key] = values
+                if last_key is not None and _sort_key(key) < _sort_key(last_key):
+                    self._unsorted = True
+                last_key = key
+                added += 1
+                if added % INSERT_CHUNK == 0:
+                    # Let the table measure and draw this chunk, and input through.
+                    await asyncio.sleep(0)
+            elif old != values:
+                cells = _cells(values)
+                for index, label in enumerate(COLUMNS):
+                    if old[index] != values[index]:
+                        table.update_cell(
+                            key,
+                            label.lower(),
+                            cells[index],
+                            update_width=label == "Description",
+                        )
+        if self._unsorted:
+            table.sort("id", key=lambda cell: _sort_key(cell.plain))
+            self._unsorted = False
+        self._rows = dict(rows)  # `rows` may be the shared _all_rows cache
+
+        if cursor_key in rows:
+            table.move_cursor(row=table.get_row_index(cursor_key), scroll=False)
+
+    def _all_rows_for_store(self) -> dict[str, tuple[str, ...]]:
+        """Row values for every item, rebuilt (and re-indexed) per store version."""
+        if self._all_version != self.store.version:
+            # Only items that changed since the last version are re-indexed.
+            self.index.update(self.store.items)
+            self._all_rows = {
+                str(item.id): (
+                    str(item.id),
+                    item.type.capitalize(),
+                    item.description,
+                    item_status(item),
+                )
+                for item in self.store.items.values()
+            }
+            self._all_version = self.store.version
+        return self._all_rows
+
+    @staticmethod
+    def _cursor_key(table: DataTable) -> str | None:
+        if not table.row_count:
+            return None
         try:
-            command = "tb"
-            process = await asyncio.create_subprocess_shell(
-                command, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-
-            if process.returncode == 0:
-                self.parse_and_populate(stdout.decode(), datatable)
-            else:
-                datatable.add_row("[red]Error", "Could not load data.", stderr.decode())
-        except FileNotFoundError:
-            datatable.add_row("[red]Error", "Command 'tb' not found.", "")
-
-    def parse_and_populate(self, text: str, table: DataTable) -> None:
-        """Parse the raw text output from taskbook into table rows."""
-        # FIX: New regex to match the format '1. V description' or '2. * description' etc.
-        item_regex = re.compile(r"^\s*(\d+)\.\s+([V*]|\[ \]|-)\s+(.+)")
-
-        for line in text.splitlines():
-            # Strip ANSI color codes which can interfere with matching
-            line = re.sub(r"\x1b\[[0-9;]*m", "", line)
-
-            match = item_regex.search(line)
-
-            if match:
-                item_id, status_char, desc = match.groups()
-                item_type = "Note"
-                status = "[blue]Note[/]"
-
-                if status_char == "-":
-                    # It's a note
-                    pass
-                else:  # It's a task
-                    item_type = "Task"
-                    if status_char == "V":
-                        status = "[green]Done[/]"
-                    elif status_char == "*":
-                        status = "[cyan]Starred[/]"
-                    else:  # Assuming '[ ]'
-                        status = "[yellow]Pending[/]"
-
-                table.add_row(item_id, item_type, desc.strip(), status)
-
-    async def run_tb_command(self, command: str) -> None:
-        """Run a taskbook command and refresh the table on success."""
+            return table.coordinate_to_cell_key(table.cursor_coordinate).row_key.value
+        except CellDoesNotExist:
+            return None
+
+    def show_result(self, ok: bool, message: str) -> None:
+        """Report the outcome of a batch of taskbook commands."""
         output_widget = self.query_one("#tb-output", Static)
-        process = subprocess.run(
-            command, shell=True, capture_output=True, text=True, encoding="utf-8"
-        )
-        if process.returncode == 0:
+        if ok:
             output_widget.update("[green]Success![/]")
-            await self.load_data()
-            self.post_message(self.RefreshData())
         else:
-            output_widget.update(f"[red]Error:\n{process.stderr}[/]")
-
+            output_widget.update(f"[red]Error (changes rolled back):\n{escape(message)}[/]")
         self.set_timer(3, lambda: output_widget.update(""))
 
-    async def on_button_pressed(self, event: Button.Pressed) -> None:
+    def on_button_pressed(self, event: Button.Pressed) -> None:
         """Handle button presses for all actions."""
         input_widget = self.query_one("#tb-input", Input)
         description = input_widget.value
         output_widget = self.query_one("#tb-output", Static)
 
         if event.button.id in ("tb-add-task", "tb-add-note") and description:
-            flag = "-t" if event.button.id == "tb-add-task" else "-n"
-            await self.run_tb_command(f'tb {flag} "{description}"')
+            item_type = "task" if event.button.id == "tb-add-task" else "note"
+            self.mutations.add(description, item_type, on_done=self.show_result)
             input_widget.value = ""
             input_widget.focus()
             return
 
         table = self.query_one(DataTable)
-        if table.cursor_row < 0:
+        if table.cursor_row < 0 or not table.row_count:
             output_widget.update(
                 "[yellow]Please select an item from the table first.[/]"
             )
             self.set_timer(3, lambda: output_widget.update(""))
             return
 
-        # Use get_row_at to be safe
-        selected_row = table.get_row_at(table.cursor_row)
-        if not selected_row:
+        # The row key is the item id; cells hold rich Text, not str.
+        selected_key = self._cursor_key(table)
+        if not selected_key or not selected_key.isdigit():
             return
 
-        selected_id = selected_row[0]
+        selected_id = int(selected_key)
 
+        # The row changes immediately; `tb` runs in the background, batched
+        # with any other clicks made in quick succession.
         if event.button.id == "tb-check":
-            await self.run_tb_command(f"tb -c {selected_id}")
+            self.mutations.check(selected_id, on_done=self.show_result)
         elif event.button.id == "tb-delete":
-            await self.run_tb_command(f"tb -d {selected_id}")
+            self.mutations.delete(selected_id, on_done=self.show_result)
@@ -0,0 +1,171 @@
+import asyncio
+from typing import Callable
+
+from widgets.command_runner import get_command_runner
+from widgets.perf import PERF
+from widgets.taskbook_store import TaskbookItem, TaskbookStore, get_taskbook_store
+
+# Called once per batch with (success, message).
+DoneCallback = Callable[[bool, str], None]
+
+# The `tb` flag for each batchable operation.
+BATCH_FLAGS = {"check": "-c", "star": "-s", "delete": "-d"}
+
+# Seconds after which a `tb` command is killed.
+TB_TIMEOUT = 30
+
+
+class TaskbookMutationQueue:
+    """Applies taskbook edits optimistically and runs `tb` in coalesced batches.
+
+    Each edit is shown in the shared TaskbookStore straight away. Edits of
+    the same kind that arrive within `delay` seconds of each other are sent
+    as one `tb -c 1 2 3` style invocation; on failure their overlays are
+    dropped, which rolls the rows back. Commands run one at a time, since
+    each `tb` process rewrites the whole storage file.
+    """
+
+    def __init__(self, store: TaskbookStore | None = None, delay: float = 0.3) -> None:
+        self.store = store or get_taskbook_store()
+        self.delay = delay
+        # op -> {item id: overlay token}
+        self._pending: dict[str, dict[int, int]] = {op: {} for op in BATCH_FLAGS}
+        self._callbacks: list[DoneCallback] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._run_lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    # --- Public API ---
+
+    def check(self, item_id: int, on_done: DoneCallback | None = None) -> None:
+        """Toggle a task's checked state. Notes can't be checked."""
+        item = self.store.items.get(item_id)
+        if item is None or item.type != "task":
+            return
+        self._toggle("check", item_id, "checked", on_done)
+
+    def star(self, item_id: int, on_done: DoneCallback | None = None) -> None:
+        """Toggle an item's starred state."""
+        self._toggle("star", item_id, "starred", on_done)
+
+    def delete(self, item_id: int, on_done: DoneCallback | None = None) -> None:
+        """Delete an item."""
+        if item_id not in self.store.items:
+            return
+        # A delete supersedes any pending toggles of the same item.
+        for op in ("check", "star"):
+            token = self._pending[op].pop(item_id, None)
+            if token is not None:
+                self.store.drop_overlays([token])
+        self._pending["delete"][item_id] = self.store.push_overlay("delete", item_id)
+        self._schedule(on_done)
+
+    def add(
+        self, description: str, item_type: str = "task", on_done: DoneCallback | None = None
+    ) -> None:
+        """Add a task or note. Adds can't be batched, but still run off the UI."""
+        provisional = TaskbookItem(
+            id=self.store.next_id(),
+            type=item_type,
+            board="My Board",
+            description=description,
+            boards=("My Board",),
+        )
+        token = self.store.push_overlay("add", provisional)
+        flag = "-t" if item_type == "task" else "-n"
+        commands = [([flag, description], [token])]
+        self._spawn(self._run(commands, [on_done] if on_done else []))
+
+    async def drain(self) -> None:
+        """Flush pending edits now and wait for every running command."""
+        self._flush()
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    # --- Internals ---
+
+    def _toggle(
+        self, op: str, item_id: int, field: str, on_done: DoneCallback | None
+    ) -> None:
+        item = self.store.items.get(item_id)
+        if item is None or item_id in self._pending["delete"]:
+            return
+        token = self._pending[op].pop(item_id, None)
+        if token is not None:
+            # Toggled twice before the batch ran: the two cancel out.
+            self.store.drop_overlays([token])
+        else:
+            value = not getattr(item, field)
+            self._pending[op][item_id] = self.store.push_overlay(op, (item_id, value))
+        self._schedule(on_done)
+
+    def _schedule(self, on_done: DoneCallback | None) -> None:
+        if on_done is not None and on_done not in self._callbacks:
+            self._callbacks.append(on_done)
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush_handle = asyncio.get_running_loop().call_later(
+            self.delay, self._flush
+        )
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        callbacks, self._callbacks = self._callbacks, []
+        commands = []
+        for op, flag in BATCH_FLAGS.items():
+            batch, self._pending[op] = self._pending[op], {}
+            if batch:
+                args = [flag, *(str(item_id) for item_id in batch)]
+                commands.append((args, list(batch.values())))
+        if commands:
+            self._spawn(self._run(commands, callbacks))
+        else:
+            # Everything cancelled out; nothing to run.
+            for callback in callbacks:
+                callback(True, "")
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(
+        self, commands: list[tuple[list[str], list[int]]], callbacks: list[DoneCallback]
+    ) -> None:
+        errors = []
+        async with self._run_lock:
+            for args, tokens in commands:
+                ok, message = await self._exec(args)
+                if not ok:
+                    errors.append(message)
+                # On success re-read the file the command just wrote; on
+                # failure dropping the overlays rolls the optimistic change back.
+                await asyncio.to_thread(self.store.drop_overlays, tokens, ok)
+        for callback in callbacks:
+            callback(not errors, "\n".join(errors))
+
+    @PERF.timed("worker run_tb_command")
+    async def _exec(self, args: list[str]) -> tuple[bool, str]:
+        """Run `tb` with argv directly (no shell) and report (success, error)."""
+        # A write: never shared with, or answered from, another run.
+        result = await get_command_runner().run(["tb", *args], timeout=TB_TIMEOUT, share=False)
+        if result.error == "not found":
+            return False, "'tb' command not found."
+        if result.error is not None:
+            return False, f"'tb' {result.error}."
+        if result.ok:
+            return True, ""
+        return False, (result.stderr or result.stdout).strip()
+
+
+_queue: TaskbookMutationQueue | None = None
+
+
+def get_mutation_queue() -> TaskbookMutationQueue:
+    """Return the mutation queue shared by every taskbook pane."""
+    global _queue
+    if _queue is None:
+        _queue = TaskbookMutationQueue()
+    return _queue
@@ -0,0 +1,134 @@
+import math
+from collections import Counter
+
+from widgets.taskbook_store import TaskbookItem
+
+# Share of a term's trigrams an item must contain to count as a fuzzy match.
+FUZZY_THRESHOLD = 0.6
+
+
+def status_name(item: TaskbookItem) -> str:
+    """The plain status word matching the Status column."""
+    if item.type == "note":
+        return "note"
+    if item.checked:
+        return "done"
+    if item.starred:
+        return "starred"
+    if item.in_progress:
+        return "progress"
+    return "pending"
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def parse_query(query: str) -> tuple[dict[str, str], list[str]]:
+    """Split a query into `key:value` filters and free-text terms."""
+    filters: dict[str, str] = {}
+    terms: list[str] = []
+    for word in query.lower().split():
+        key, sep, value = word.partition(":")
+        if sep and key in ("status", "type", "board") and value:
+            filters[key] = value
+        else:
+            terms.append(word)
+    return filters, terms
+
+
+class TaskbookSearchIndex:
+    """A trigram index over taskbook items for as-you-type filtering.
+
+    Each item's description, boards and status are lowercased into one
+    search string whose trigrams map back to the item id. `update()` diffs
+    against the previous items and only re-indexes the ones that changed,
+    so a refresh of a 10k-item board after one edit costs one item's work.
+
+    A term matches an item whose search string contains it. If no item
+    does, the term falls back to fuzzy matching: items sharing at least
+    FUZZY_THRESHOLD of its trigrams, which tolerates typos.
+    """
+
+    def __init__(self) -> None:
+        self.items: dict[int, TaskbookItem] = {}
+        self.text: dict[int, str] = {}
+        self.postings: dict[str, set[int]] = {}
+
+    def update(self, items: dict[int, TaskbookItem]) -> None:
+        """Bring the index in line with `items`, re-indexing only changes."""
+        for item_id in self.items.keys() - items.keys():
+            self._remove(item_id)
+        for item_id, item in items.items():
+            old = self.items.get(item_id)
+            if old is item or old == item:
+                continue
+            if old is not None:
+                self._remove(item_id)
+            self._add(item)
+
+    def search(self, query: str) -> set[int] | None:
+        """Ids of the items matching `query`, or None if it filters nothing."""
+        filters, terms = parse_query(query)
+        if not filters and not terms:
+            return None
+        matches: set[int] | None = None
+        for term in sorted(terms, key=len, reverse=True):  # most selective first
+            matches = self._match_term(term, matches)
+            if not matches:
+                return set()
+        if matches is None:
+            matches = set(self.items)
+        for key, value in filters.items():
+            matches = {i for i in matches if self._field_matches(self.items[i], key, value)}
+        return matches
+
+    # --- Internals ---
+
+    def _add(self, item: TaskbookItem) -> None:
+        text = " ".join(
+            (item.description, *item.boards, status_name(item), item.type)
+        ).lower()
+        self.items[item.id] = item
+        self.text[item.id] = text
+        for gram in trigrams(text):
+            self.postings.setdefault(gram, set()).add(item.id)
+
+    def _remove(self, item_id: int) -> None:
+        self.items.pop(item_id, None)
+        text = self.text.pop(item_id, "")
+        for gram in trigrams(text):
+            ids = self.postings.get(gram)
+            if ids is not None:
+                ids.discard(item_id)
+                if not ids:
+                    del self.postings[gram]
+
+    def _match_term(self, term: str, within: set[int] | None) -> set[int]:
+        grams = trigrams(term)
+        if not grams:
+            # Too short for trigrams; a substring scan of the candidates.
+            pool = within if within is not None else self.text.keys()
+            return {i for i in pool if term in self.text[i]}
+
+        postings = sorted((self.postings.get(g, set()) for g in grams), key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        if within is not None:
+            candidates &= within
+        exact = {i for i in candidates if term in self.text[i]}
+        if exact:
+            return exact
+
+        counts: Counter[int] = Counter()
+        for ids in postings:
+            counts.update(ids if within is None else ids & within)
+        needed = max(math.ceil(len(grams) * FUZZY_THRESHOLD), 1)
+        return {i for i, count in counts.items() if count >= needed}
+
+    @staticmethod
+    def _field_matches(item: TaskbookItem, key: str, value: str) -> bool:
+        if key == "type":
+            return item.type.startswith(value)
+        if key == "status":
+            return status_name(item).startswith(value)
+        return any(value in board.lower() for board in item.boards)
@@ -0,0 +1,227 @@
+import itertools
+import json
+import os
+import threading
+from dataclasses import astuple, dataclass, replace
+from typing import Callable
+
+from textual.message import Message
+
+
+@dataclass(frozen=True)
+class TaskbookItem:
+    """A single task or note, as stored by taskbook."""
+
+    id: int
+    type: str  # "task" or "note"
+    board: str
+    description: str
+    checked: bool = False
+    starred: bool = False
+    in_progress: bool = False
+    priority: int = 1
+    boards: tuple[str, ...] = ()
+
+    @classmethod
+    def from_json(cls, data: dict) -> "TaskbookItem":
+        boards = tuple(data.get("boards") or ("My Board",))
+        is_task = data.get("_isTask", False)
+        return cls(
+            id=int(data["_id"]),
+            type="task" if is_task else "note",
+            board=boards[0],
+            description=data.get("description", ""),
+            checked=bool(data.get("isComplete", False)) if is_task else False,
+            starred=bool(data.get("isStarred", False)),
+            in_progress=bool(data.get("inProgress", False)) if is_task else False,
+            priority=int(data.get("priority", 1) or 1),
+            boards=boards,
+        )
+
+    def to_row(self) -> list:
+        """The item as a compact list of field values, for the collector."""
+        return list(astuple(self))
+
+    @classmethod
+    def from_row(cls, row: list) -> "TaskbookItem":
+        return cls(*row[:-1], boards=tuple(row[-1]))
+
+
+def default_storage_path() -> str:
+    """Locate taskbook's storage.json, honouring `taskbookDirectory` in ~/.taskbook.json."""
+    directory = "~"
+    try:
+        with open(os.path.expanduser("~/.taskbook.json"), encoding="utf-8") as f:
+            directory = json.load(f).get("taskbookDirectory") or directory
+    except (OSError, ValueError):
+        pass
+    return os.path.join(
+        os.path.expanduser(directory), ".taskbook", "storage", "storage.json"
+    )
+
+
+class TaskbookStore:
+    """An in-memory model of taskbook's JSON storage.
+
+    The file is only re-read when its inode, size or mtime changes, so
+    calling `refresh()` on a timer costs a single `stat()` in the common case.
+
+    Pending mutations can be layered on top of the file's contents as
+    optimistic overlays, which are dropped again once the `tb` command that
+    applies them has either succeeded (and the file is re-read) or failed.
+    """
+
+    class Changed(Message, bubble=False):
+        """Posted to subscribed widgets when the model has changed."""
+
+    def __init__(self, path: str | None = None) -> None:
+        self.path = path or default_storage_path()
+        self.items: dict[int, TaskbookItem] = {}
+        self.version = 0
+        self._disk_items: dict[int, TaskbookItem] = {}
+        # token -> (op, payload); applied in insertion order
+        self._overlays: dict[int, tuple[str, object]] = {}
+        self._tokens = itertools.count(1)
+        self.error: str | None = None
+        self._signature: tuple[int, int, int] | None = None
+        self._lock = threading.Lock()
+        self._subscribers: list[Callable[[], None]] = []
+
+    def subscribe(self, callback: Callable[[], None]) -> None:
+        """Call `callback()` (from any thread) whenever the model changes."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[], None]) -> None:
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def refresh(self) -> bool:
+        """Re-read the storage file if it changed. Returns True if the model changed."""
+        with self._lock:
+            changed = self._reload()
+        if changed:
+            self._notify()
+        return changed
+
+    def apply_collected(self, message: dict) -> None:
+        """Take the file's contents from a snapshot pushed by the collector."""
+        data = message["d"]
+        with self._lock:
+            if data["error"]:
+                changed = self._set_error(data["error"])
+            else:
+                items = {row[0]: TaskbookItem.from_row(row) for row in data["items"]}
+                changed = self.error is not None or items != self._disk_items
+                if changed:
+                    # A local re-read (after a mutation) must not be skipped.
+                    self._signature = None
+                    self.error = None
+                    self._disk_items = items
+                    self._apply_overlays()
+        if changed:
+            self._notify()
+
+    def _reload(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return self._set_error(
+                f"Taskbook storage not found at {self.path}.\n"
+                "Add an item with `tb` to create it."
+            )
+        except OSError as e:
+            return self._set_error(f"Could not read taskbook storage: {e}")
+
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if signature == self._signature:
+            return False
+
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                raw = json.load(f)
+            items = [TaskbookItem.from_json(entry) for entry in raw.values()]
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            # Most likely caught mid-write: keep the last good model and retry
+            # on the next refresh, since the signature was not recorded.
+            if self.items:
+                return False
+            return self._set_error(f"Could not parse taskbook storage: {e}")
+
+        self._signature = signature
+        self.error = None
+        self._disk_items = {item.id: item for item in sorted(items, key=lambda i: i.id)}
+        self._apply_overlays()
+        return True
+
+    def _set_error(self, message: str) -> bool:
+        if self.error == message:
+            return False
+        self.error = message
+        self._signature = None
+        self._disk_items = {}
+        self._apply_overlays()
+        return True
+
+    # --- Optimistic overlays ---
+
+    def push_overlay(self, op: str, payload: object) -> int:
+        """Show a pending mutation immediately. Returns a token to settle it with.
+
+        `op` is "delete" with an item id as payload, "check" or "star" with an
+        `(id, new_value)` pair, or "add" with a provisional TaskbookItem.
+        Values are absolute rather than toggles, so an overlay that is still
+        in place when the file is re-read does not flip the item back.
+        """
+        with self._lock:
+            token = next(self._tokens)
+            self._overlays[token] = (op, payload)
+            self._apply_overlays()
+        self._notify()
+        return token
+
+    def drop_overlays(self, tokens: list[int], reload: bool = False) -> None:
+        """Remove overlays, re-reading the file first if the mutation succeeded."""
+        with self._lock:
+            for token in tokens:
+                self._overlays.pop(token, None)
+            if not (reload and self._reload()):
+                self._apply_overlays()
+        self._notify()
+
+    def next_id(self) -> int:
+        """The id taskbook will most likely give the next item."""
+        return max(self.items, default=0) + 1
+
+    def _apply_overlays(self) -> None:
+        items = dict(self._disk_items)
+        for op, payload in self._overlays.values():
+            if op == "add":
+                items[payload.id] = payload
+            elif op == "delete":
+                items.pop(payload, None)
+            elif op in ("check", "star"):
+                item_id, value = payload
+                item = items.get(item_id)
+                if item is None:
+                    continue
+                if op == "check" and item.type == "task":
+                    items[item_id] = replace(item, checked=value)
+                elif op == "star":
+                    items[item_id] = replace(item, starred=value)
+        self.items = items
+        self.version += 1
+
+    def _notify(self) -> None:
+        for callback in list(self._subscribers):
+            callback()
+
+
+_store: TaskbookStore | None = None
+
+
+def get_taskbook_store() -> TaskbookStore:
+    """Return the taskbook model shared by every taskbook pane."""
+    global _store
+    if _store is None:
+        _store = TaskbookStore()
+    return _store
@@ -1,27 +1,113 @@
+import asyncio
+from datetime import date
+
+from rich.markup import escape
+from textual import events
 from textual.app import ComposeResult
-from textual.containers import VerticalScroll, Horizontal
+from textual.containers import Horizontal
 from textual.widget import Widget
-from textual.widgets import Button, Checkbox, Input, Static
+from textual.widgets import Button, Checkbox, Input, Label, Static
+
+from widgets.todo_store import Todo, get_todo_store
+
+# Rows of the terminal each TodoItem takes up.
+ROW_HEIGHT = 3
+
+# view id -> button label
+VIEWS = {"all": "All", "open": "Open", "today": "Due Today", "overdue": "Overdue"}
 
 
 class TodoItem(Widget):
-    """A single to-do item with a checkbox and due date."""
+    """A single to-do item with a checkbox and due date.
+
+    Items are recycled by TodoListView: `show()` rebinds one to another
+    to-do as the list scrolls.
+    """
 
     # FIX: Applying the class directly to the widget is a cleaner way
     # to ensure the entire component is styled correctly.
     DEFAULT_CLASSES = "todo-item"
 
-    def __init__(self, text: str) -> None:
-        self.text = text
+    def __init__(self) -> None:
+        self.todo_id: int | None = None
         super().__init__()
 
     def compose(self) -> ComposeResult:
-        yield Checkbox(self.text)
+        yield Checkbox()
         yield Input(placeholder="Due Date (e.g., YYYY-MM-DD)")
 
+    def show(self, todo: Todo) -> None:
+        """Bind this row to `todo` without echoing change events back."""
+        self.todo_id = todo.id
+        checkbox = self.query_one(Checkbox)
+        due = self.query_one(Input)
+        with checkbox.prevent(Checkbox.Changed), due.prevent(Input.Changed):
+            checkbox.label = escape(todo.text)
+            checkbox.value = todo.done
+            due.value = todo.due.isoformat() if todo.due else ""
+
+
+class TodoListView(Widget, can_focus=True):
+    """Shows a window of to-dos using only as many TodoItems as fit on screen."""
+
+    BINDINGS = [
+        ("up", "scroll_rows(-1)", "Up"),
+        ("down", "scroll_rows(1)", "Down"),
+        ("pageup", "scroll_rows(-10)", "Page up"),
+        ("pagedown", "scroll_rows(10)", "Page down"),
+    ]
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.store = get_todo_store()
+        self.ids: list[int] = []
+        self.top = 0
+
+    def set_ids(self, ids: list[int]) -> None:
+        self.ids = ids
+        self.top = min(self.top, max(len(ids) - len(self.children), 0))
+        self.render_window()
+
+    async def on_resize(self, event: events.Resize) -> None:
+        wanted = max(event.size.height // ROW_HEIGHT, 1)
+        rows = list(self.query(TodoItem))
+        if len(rows) < wanted:
+            await self.mount_all(TodoItem() for _ in range(wanted - len(rows)))
+        elif len(rows) > wanted:
+            await self.remove_children(rows[wanted:])
+        self.render_window()
+
+    def render_window(self) -> None:
+        for index, row in enumerate(self.query(TodoItem)):
+            position = self.top + index
+            row.display = position < len(self.ids)
+            if row.display:
+                row.show(self.store.todos[self.ids[position]])
+
+    def action_scroll_rows(self, delta: int) -> None:
+        top = min(max(self.top + delta, 0), max(len(self.ids) - len(self.children), 0))
+        if top != self.top:
+            self.top = top
+            self.render_window()
+
+    def on_mouse_scroll_down(self, event: events.MouseScrollDown) -> None:
+        self.action_scroll_rows(1)
+
+    def on_mouse_scroll_up(self, event: events.MouseScrollUp) -> None:
+        self.action_scroll_rows(-1)
+
 
 class TodoList(Static):
-    """The main to-do list widget with add/remove functionality."""
+    """The main to-do list widget with add/remove functionality.
+
+    To-dos live in the shared TodoStore, which indexes and persists them;
+    this widget only renders the current view of it.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.store = get_todo_store()
+        self.view = "all"
 
     def compose(self) -> ComposeResult:
         yield Horizontal(
@@ -29,21 +115,84 @@ class TodoList(Static):
             Button("Add Task", variant="primary", id="add-todo"),
             classes="add-bar",
         )
-        yield VerticalScroll(id="todo-list-items")
+        with Horizontal(id="todo-views"):
+            for view, label in VIEWS.items():
+                variant = "primary" if view == self.view else "default"
+                yield Button(label, id=f"todo-view-{view}", variant=variant)
+            yield Label(id="todo-summary")
+        yield TodoListView(id="todo-list-items")
         yield Button("Remove Completed Tasks", variant="error", id="remove-completed")
 
+    def on_mount(self) -> None:
+        self.run_worker(self.load_todos, exclusive=True)
+
+    def on_unmount(self) -> None:
+        self.store.flush_sync()
+
+    async def load_todos(self) -> None:
+        """Read the database off the event loop, then show the list."""
+        if not self.store.loaded:
+            rows = await asyncio.to_thread(self.store.read)
+            self.store.apply(rows)
+        self.refresh_view()
+
+    def visible_ids(self) -> list[int]:
+        today = date.today()
+        if self.view == "open":
+            return self.store.open_ids()
+        if self.view == "today":
+            return self.store.due_today(today)
+        if self.view == "overdue":
+            return self.store.overdue(today)
+        return list(self.store.todos)
+
+    def refresh_view(self) -> None:
+        ids = self.visible_ids()
+        self.query_one(TodoListView).set_ids(ids)
+        self.query_one("#todo-summary", Label).update(
+            f"{len(ids)} shown, {len(self.store.completed)} of {len(self.store.todos)} done"
+        )
+
+    def on_checkbox_changed(self, event: Checkbox.Changed) -> None:
+        item = event.checkbox.parent
+        if isinstance(item, TodoItem) and item.todo_id is not None:
+            self.store.set_done(item.todo_id, event.value)
+            self.refresh_view()
+
+    def on_input_submitted(self, event: Input.Submitted) -> None:
+        item = event.input.parent
+        if isinstance(item, TodoItem) and item.todo_id is not None:
+            try:
+                due = date.fromisoformat(event.value.strip()) if event.value.strip() else None
+            except ValueError:
+                event.input.add_class("-invalid")
+                return
+            event.input.remove_class("-invalid")
+            self.store.set_due(item.todo_id, due)
+            self.refresh_view()
+        elif event.input.id == "new-todo-input":
+            self.add_todo()
+
+    def add_todo(self) -> None:
+        input_widget = self.query_one("#new-todo-input", Input)
+        task_text = input_widget.value
+        if task_text:
+            self.store.add(task_text)
+            view = self.query_one(TodoListView)
+            self.refresh_view()
+            view.action_scroll_rows(len(view.ids))  # show the new task
+            input_widget.value = ""
+            input_widget.focus()
+
     def on_button_pressed(self, event: Button.Pressed) -> None:
-        if event.button.id == "add-todo":
-            input_widget = self.query_one("#new-todo-input", Input)
-            task_text = input_widget.value
-            if task_text:
-                new_task = TodoItem(task_text)
-                self.query_one("#todo-list-items").mount(new_task)
-                input_widget.value = ""
-                input_widget.focus()
-        elif event.button.id == "remove-completed":
-            completed_items = [
-                item for item in self.query(TodoItem) if item.query_one(Checkbox).value
-            ]
-            for item in completed_items:
-                item.remove()
+        button_id = event.button.id or ""
+        if button_id == "add-todo":
+            self.add_todo()
+        elif button_id == "remove-completed":
+            self.store.remove_completed()
+            self.refresh_view()
+        elif button_id.startswith("todo-view-"):
+            self.view = button_id.removeprefix("todo-view-")
+            for button in self.query("#todo-views Button"):
+                button.variant = "primary" if button is event.button else "default"
+            self.refresh_view()
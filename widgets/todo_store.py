@@ -0,0 +1,226 @@
+import asyncio
+import bisect
+import sqlite3
+import threading
+from dataclasses import dataclass, replace
+from datetime import date
+
+from widgets.paths import data_path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    done INTEGER NOT NULL DEFAULT 0,
+    due TEXT
+)
+"""
+
+
+@dataclass(frozen=True)
+class Todo:
+    id: int
+    text: str
+    done: bool = False
+    due: date | None = None
+
+
+class TodoStore:
+    """To-dos held in memory, indexed, and persisted to SQLite in batches.
+
+    `completed` holds the ids of finished to-dos and `by_due` keeps
+    (due date, id) pairs sorted, so "remove completed", "due today" and
+    "overdue" are answered from the indexes instead of by scanning. Edits
+    update memory immediately; the changed rows are written `delay`
+    seconds later in one transaction on a worker thread.
+    """
+
+    def __init__(self, path: str | None = None, delay: float = 0.5) -> None:
+        self.path = path or data_path("todo.sqlite3")
+        self.delay = delay
+        self.todos: dict[int, Todo] = {}
+        self.completed: set[int] = set()
+        self.by_due: list[tuple[date, int]] = []
+        self.loaded = False
+        self._next_id = 1
+        self._pending: dict[int, Todo | None] = {}  # id -> row to write, None to delete
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._write_lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    # --- Loading ---
+
+    def read(self) -> list[tuple]:
+        """Open the database and read every row. Blocking; use a worker thread."""
+        with self._db_lock:
+            if self._db is None:
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.execute(SCHEMA)
+            return self._db.execute("SELECT id, text, done, due FROM todos ORDER BY id").fetchall()
+
+    def apply(self, rows: list[tuple]) -> None:
+        """Take the rows `read()` returned; call it on the event loop.
+
+        To-dos added before the database was read got ids that may be
+        taken already, so they are given the next free ones, and they
+        stay queued for writing.
+        """
+        if self.loaded:
+            return
+        todos = {}
+        for todo_id, text, done, due in rows:
+            try:
+                due_date = date.fromisoformat(due) if due else None
+            except ValueError:
+                due_date = None
+            todos[todo_id] = Todo(todo_id, text, bool(done), due_date)
+        next_id = max(todos, default=0) + 1
+        self._pending = {}
+        for todo in sorted(self.todos.values(), key=lambda todo: todo.id):
+            todos[next_id] = self._pending[next_id] = replace(todo, id=next_id)
+            next_id += 1
+        self.todos = todos
+        self.completed = {todo.id for todo in todos.values() if todo.done}
+        self.by_due = sorted((todo.due, todo.id) for todo in todos.values() if todo.due)
+        self._next_id = next_id
+        self.loaded = True
+        if self._pending:
+            self._schedule_flush()
+
+    def load(self) -> None:
+        """`read()` and `apply()` in one go. Blocking."""
+        self.apply(self.read())
+
+    # --- Queries ---
+
+    def open_ids(self) -> list[int]:
+        return [todo_id for todo_id in self.todos if todo_id not in self.completed]
+
+    def due_between(self, start: date | None, end: date) -> list[int]:
+        """Open to-dos due in [start, end], or up to `end` without a start."""
+        low = 0 if start is None else bisect.bisect_left(self.by_due, (start, 0))
+        high = bisect.bisect_right(self.by_due, (end, float("inf")))
+        return [
+            todo_id for _, todo_id in self.by_due[low:high] if todo_id not in self.completed
+        ]
+
+    def due_today(self, today: date) -> list[int]:
+        return self.due_between(today, today)
+
+    def overdue(self, today: date) -> list[int]:
+        return self.due_between(None, date.fromordinal(today.toordinal() - 1))
+
+    # --- Editing ---
+
+    def add(self, text: str, due: date | None = None) -> Todo:
+        todo = Todo(self._next_id, text, False, due)
+        self._next_id += 1
+        self._store(None, todo)
+        return todo
+
+    def set_done(self, todo_id: int, done: bool) -> None:
+        todo = self.todos.get(todo_id)
+        if todo is not None and todo.done != done:
+            self._store(todo, replace(todo, done=done))
+
+    def set_due(self, todo_id: int, due: date | None) -> None:
+        todo = self.todos.get(todo_id)
+        if todo is not None and todo.due != due:
+            self._store(todo, replace(todo, due=due))
+
+    def remove_completed(self) -> list[int]:
+        """Delete every completed to-do; returns their ids."""
+        removed = list(self.completed)
+        for todo_id in removed:
+            self._store(self.todos[todo_id], None)
+        return removed
+
+    # --- Persistence ---
+
+    def flush(self) -> None:
+        """Write pending changes now, off the event loop."""
+        if not self.loaded:
+            self._flush_handle = None
+            return  # kept until apply() has merged them with the database
+        rows = self._take_pending()
+        if rows:
+            self._spawn(self._write(rows))
+
+    def flush_sync(self) -> None:
+        """Write pending changes now, blocking (e.g. on exit)."""
+        if not self.loaded and self._pending:
+            self.load()
+        rows = self._take_pending()
+        if rows:
+            self._commit(rows)
+
+    # --- Internals ---
+
+    def _store(self, old: Todo | None, new: Todo | None) -> None:
+        """Replace `old` with `new` in memory and the indexes, and queue the write."""
+        if old is not None:
+            self.completed.discard(old.id)
+            if old.due is not None:
+                index = bisect.bisect_left(self.by_due, (old.due, old.id))
+                del self.by_due[index]
+        if new is None:
+            del self.todos[old.id]
+            self._pending[old.id] = None
+        else:
+            self.todos[new.id] = new
+            if new.done:
+                self.completed.add(new.id)
+            if new.due is not None:
+                bisect.insort(self.by_due, (new.due, new.id))
+            self._pending[new.id] = new
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.delay, self.flush
+            )
+
+    def _take_pending(self) -> dict[int, Todo | None]:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        rows, self._pending = self._pending, {}
+        return rows
+
+    async def _write(self, rows: dict[int, Todo | None]) -> None:
+        async with self._write_lock:
+            await asyncio.to_thread(self._commit, rows)
+
+    def _commit(self, rows: dict[int, Todo | None]) -> None:
+        upserts = [
+            (todo.id, todo.text, int(todo.done), todo.due.isoformat() if todo.due else None)
+            for todo in rows.values()
+            if todo is not None
+        ]
+        deletes = [(todo_id,) for todo_id, todo in rows.items() if todo is None]
+        with self._db_lock:
+            with self._db:  # one transaction
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO todos (id, text, done, due) VALUES (?, ?, ?, ?)",
+                    upserts,
+                )
+                self._db.executemany("DELETE FROM todos WHERE id = ?", deletes)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+
+_store: TodoStore | None = None
+
+
+def get_todo_store() -> TodoStore:
+    """Return the to-do store shared by every to-do widget."""
+    global _store
+    if _store is None:
+        _store = TodoStore()
+    return _store
@@ -0,0 +1,79 @@
+import shlex
+import subprocess
+from dataclasses import dataclass
+
+from textual.app import ComposeResult
+from textual.widgets import Button, Static
+
+from widgets.config import get_config
+from widgets.perf import PERF
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """One button of the Launch Tools tab."""
+
+    label: str
+    argv: tuple[str, ...]
+    variant: str = "default"
+
+
+DEFAULT_TOOLS = [
+    {"label": "Task Manager (btop)", "command": "btop4win", "variant": "primary"},
+    {"label": "File Explorer (superfile)", "command": "spf", "variant": "success"},
+]
+
+VARIANTS = ("default", "primary", "success", "warning", "error")
+
+
+def tools_from_config(config: dict | None = None) -> list[ToolSpec]:
+    """The `[[tools]]` entries, or the default btop and superfile buttons."""
+    entries = (config if config is not None else get_config()).get("tools") or DEFAULT_TOOLS
+    tools = []
+    for entry in entries:
+        command = entry.get("command")
+        argv = shlex.split(command) if isinstance(command, str) else list(command or ())
+        if not argv:
+            continue
+        variant = entry.get("variant", "default")
+        tools.append(
+            ToolSpec(
+                str(entry.get("label") or argv[0]),
+                tuple(str(arg) for arg in argv),
+                variant if variant in VARIANTS else "default",
+            )
+        )
+    return tools
+
+
+class ToolLauncher(Static):
+    """Buttons that hand the terminal over to an interactive tool."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.tools = tools_from_config()
+
+    def compose(self) -> ComposeResult:
+        yield Static("Launch External Tools", classes="pane-title")
+        yield Static(id="tool-status", classes="status-message")
+        for index, tool in enumerate(self.tools):
+            yield Button(tool.label, id=f"tool-{index}", variant=tool.variant)
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        index = (event.button.id or "").removeprefix("tool-")
+        if not index.isdigit():
+            return
+        event.stop()
+        argv = list(self.tools[int(index)].argv)
+        status_widget = self.query_one("#tool-status", Static)
+        status_widget.update()
+        try:
+            # Interactive tools need the terminal, so they run in the
+            # foreground rather than through the CommandRunner; still
+            # exec'd directly, without a shell.
+            with self.app.suspend(), PERF.span(f"spawn {argv[0]}"):
+                subprocess.run(argv, check=True)
+        except FileNotFoundError:
+            status_widget.update(f"[bold red]Error: Command '{argv[0]}' not found.[/]")
+        except Exception as e:
+            status_widget.update(f"[bold red]An error occurred: {e}[/bold red]")
@@ -0,0 +1,273 @@
+import asyncio
+import sqlite3
+import threading
+import time
+
+from widgets.paths import data_path
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transitions (
+    service TEXT NOT NULL,
+    at REAL NOT NULL,
+    up INTEGER NOT NULL,
+    PRIMARY KEY (service, at)
+);
+CREATE TABLE IF NOT EXISTS rollups (
+    service TEXT NOT NULL,
+    span INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    up_seconds REAL NOT NULL,
+    known_seconds REAL NOT NULL,
+    PRIMARY KEY (service, span, bucket)
+);
+"""
+
+# The uptime windows shown in the Services tab: (label, span, buckets).
+WINDOWS = (("24h", HOUR, 24), ("7d", DAY, 7), ("30d", DAY, 30))
+
+
+class UptimeStore:
+    """Service up/down history: state transitions plus hourly and daily rollups.
+
+    Only changes of state are stored as rows. The time between them is
+    added to per-hour and per-day buckets of "seconds up" and "seconds
+    monitored", so an uptime percentage over any window is a sum over at
+    most 30 rows, however long the history. Time only counts while
+    something is monitoring the service; gaps (the dashboard was closed)
+    count as neither up nor down.
+
+    Changes collect in memory and are written `delay` seconds later in one
+    transaction on a worker thread; while any service is monitored, that
+    repeats every `delay` seconds, so a service that never changes state
+    still has its time saved. `close()` ends monitoring.
+    """
+
+    def __init__(self, path: str | None = None, delay: float = 30.0) -> None:
+        self.path = path or data_path("uptime.sqlite3")
+        self.delay = delay
+        # service -> (up, time accounted up to); only services seen this run
+        self.state: dict[str, tuple[bool, float]] = {}
+        self._pending_rollups: dict[tuple[str, int, int], list[float]] = {}
+        self._pending_transitions: list[tuple[str, float, int]] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._db: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._write_lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    # --- Recording ---
+
+    def record(self, service: str, up: bool, now: float | None = None) -> None:
+        """Note a check result. Cheap; nothing is written until the next flush."""
+        now = time.time() if now is None else now
+        previous = self.state.get(service)
+        if previous is not None:
+            self._account(service, previous[0], previous[1], now)
+        # The first result of a run is queued too; the commit drops it if
+        # it only repeats the last stored state.
+        if previous is None or previous[0] != up:
+            self._pending_transitions.append((service, now, int(up)))
+        self.state[service] = (up, now)
+        self._schedule_flush()
+
+    def account_all(self, now: float | None = None) -> None:
+        """Add the time since the last result to every service's buckets."""
+        now = time.time() if now is None else now
+        for service, (up, since) in self.state.items():
+            self._account(service, up, since, now)
+            self.state[service] = (up, now)
+
+    # --- Queries ---
+
+    async def uptimes(self, services: list[str]) -> dict[str, list[float | None]]:
+        """Uptime fractions per WINDOWS entry, None where nothing was monitored."""
+        self.account_all()
+        now = time.time()
+        pending = {key: tuple(value) for key, value in self._pending_rollups.items()}
+        return await asyncio.to_thread(self._query, self._uptimes, services, now, pending)
+
+    async def timeline(
+        self, service: str, limit: int = 10
+    ) -> tuple[list[float | None], list[tuple[float, bool]]]:
+        """The last 24 hours' uptime per hour, and the latest transitions (newest first)."""
+        self.account_all()
+        now = time.time()
+        pending = {
+            key: tuple(value)
+            for key, value in self._pending_rollups.items()
+            if key[0] == service
+        }
+        transitions = [
+            (at, bool(up)) for name, at, up in self._pending_transitions if name == service
+        ]
+        hours, stored = await asyncio.to_thread(
+            self._query, self._timeline, service, now, pending, limit
+        )
+        merged = []
+        # Stored rows come newest first; the unflushed ones are newer still.
+        for at, up in stored[::-1] + transitions:  # oldest first
+            if not merged or merged[-1][1] != up:
+                merged.append((at, up))
+        return hours, merged[::-1][:limit]
+
+    # --- Persistence ---
+
+    def flush(self) -> None:
+        """Write pending changes now, off the event loop."""
+        self.account_all()
+        batch = self._take_pending()
+        if batch[0] or batch[1]:
+            task = asyncio.get_running_loop().create_task(self._write(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if self.state:
+            self._schedule_flush()
+
+    def flush_sync(self) -> None:
+        """Write pending changes now, blocking (e.g. on exit)."""
+        self.account_all()
+        batch = self._take_pending()
+        if batch[0] or batch[1]:
+            self._query(self._commit, batch)
+
+    def close(self) -> None:
+        """Stop monitoring: write everything now, blocking, and forget the states.
+
+        The time until the next `record()` then counts as unmonitored.
+        """
+        self.flush_sync()
+        self.state.clear()
+
+    # --- Internals ---
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                self.delay, self.flush
+            )
+
+    def _account(self, service: str, up: bool, start: float, end: float) -> None:
+        """Split [start, end) over the hour and day buckets it touches."""
+        for span in (HOUR, DAY):
+            t = start
+            while t < end:
+                bucket = int(t // span) * span
+                stop = min(end, bucket + span)
+                totals = self._pending_rollups.setdefault((service, span, bucket), [0.0, 0.0])
+                if up:
+                    totals[0] += stop - t
+                totals[1] += stop - t
+                t = stop
+
+    def _take_pending(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        rollups, self._pending_rollups = self._pending_rollups, {}
+        transitions, self._pending_transitions = self._pending_transitions, []
+        return rollups, transitions
+
+    async def _write(self, batch) -> None:
+        async with self._write_lock:
+            await asyncio.to_thread(self._query, self._commit, batch)
+
+    def _query(self, fn, *args):
+        """Run `fn(db, *args)` on the shared connection, opening it first if needed."""
+        with self._db_lock:
+            if self._db is None:
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.executescript(SCHEMA)
+            return fn(self._db, *args)
+
+    @staticmethod
+    def _commit(db: sqlite3.Connection, batch) -> None:
+        rollups, queued = batch
+        last = UptimeStore._load_last_states(db)
+        transitions = []
+        for service, at, up in queued:
+            if last.get(service) != bool(up):
+                transitions.append((service, at, up))
+                last[service] = bool(up)
+        with db:  # one transaction
+            db.executemany(
+                "INSERT INTO rollups VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (service, span, bucket) DO UPDATE SET "
+                "up_seconds = up_seconds + excluded.up_seconds, "
+                "known_seconds = known_seconds + excluded.known_seconds",
+                [(*key, up, known) for key, (up, known) in rollups.items()],
+            )
+            db.executemany("INSERT OR REPLACE INTO transitions VALUES (?, ?, ?)", transitions)
+
+    @staticmethod
+    def _load_last_states(db: sqlite3.Connection) -> dict[str, bool]:
+        # SQLite returns the other columns from the row holding the MAX().
+        rows = db.execute("SELECT service, up, MAX(at) FROM transitions GROUP BY service")
+        return {service: bool(up) for service, up, _ in rows}
+
+    @staticmethod
+    def _sum(db, service: str, span: int, first: int, pending) -> tuple[float, float]:
+        up, known = db.execute(
+            "SELECT TOTAL(up_seconds), TOTAL(known_seconds) FROM rollups "
+            "WHERE service = ? AND span = ? AND bucket >= ?",
+            (service, span, first),
+        ).fetchone()
+        for (name, pending_span, bucket), (extra_up, extra_known) in pending.items():
+            if name == service and pending_span == span and bucket >= first:
+                up += extra_up
+                known += extra_known
+        return up, known
+
+    @classmethod
+    def _uptimes(cls, db, services: list[str], now: float, pending) -> dict[str, list[float | None]]:
+        result = {}
+        for service in services:
+            fractions = []
+            for _, span, buckets in WINDOWS:
+                first = (int(now // span) - buckets + 1) * span
+                up, known = cls._sum(db, service, span, first, pending)
+                fractions.append(up / known if known else None)
+            result[service] = fractions
+        return result
+
+    @staticmethod
+    def _timeline(db, service: str, now: float, pending, limit: int):
+        first = (int(now // HOUR) - 23) * HOUR
+        totals = {
+            bucket: [up, known]
+            for bucket, up, known in db.execute(
+                "SELECT bucket, up_seconds, known_seconds FROM rollups "
+                "WHERE service = ? AND span = ? AND bucket >= ?",
+                (service, HOUR, first),
+            )
+        }
+        for (_, span, bucket), (up, known) in pending.items():
+            if span == HOUR and bucket >= first:
+                entry = totals.setdefault(bucket, [0.0, 0.0])
+                entry[0] += up
+                entry[1] += known
+        hours = []
+        for bucket in range(first, first + 24 * HOUR, HOUR):
+            up, known = totals.get(bucket, (0.0, 0.0))
+            hours.append(up / known if known else None)
+        transitions = [
+            (at, bool(up))
+            for at, up in db.execute(
+                "SELECT at, up FROM transitions WHERE service = ? ORDER BY at DESC LIMIT ?",
+                (service, limit),
+            )
+        ]
+        return hours, transitions
+
+
+_store: UptimeStore | None = None
+
+
+def get_uptime_store() -> UptimeStore:
+    """Return the uptime store shared by the Services tab and the collector."""
+    global _store
+    if _store is None:
+        _store = UptimeStore()
+    return _store